@@ -0,0 +1,145 @@
+import numpy as np
+
+from game_engine import (
+    EMPTY, VILLAGER, WOLF, OBSTACLE,
+    MOVE_OK, MOVE_COLLISION, MOVE_DIAGONAL, MOVE_OUT_OF_BOARD,
+    MOVE_OBSTACLE, MOVE_OCCUPIED, MOVE_GAME_OVER,
+)
+
+
+class BatchGame:
+    def __init__(self, n_games, rows, cols, num_obstacles, max_turns, seed=None):
+        """
+        Initialise n_games plateaux de même dimension, stockés dans un tableau
+        NumPy (n_games, rows, cols) de uint8, et place les obstacles.
+
+        :param n_games: Nombre de parties simulées simultanément.
+        :param rows: Nombre de lignes de chaque plateau.
+        :param cols: Nombre de colonnes de chaque plateau.
+        :param num_obstacles: Nombre d'obstacles à placer sur chaque plateau.
+        :param max_turns: Nombre maximum de tours (entier ou tableau de n_games entiers).
+        :param seed: Graine du générateur aléatoire (reproductibilité).
+        """
+        self.n_games = n_games
+        self.rows = rows
+        self.cols = cols
+        self.rng = np.random.default_rng(seed)
+        self.boards = np.zeros((n_games, rows, cols), dtype=np.uint8)
+        self.turn = np.zeros(n_games, dtype=np.int32)
+        self.max_turns = np.broadcast_to(np.asarray(max_turns, dtype=np.int32), (n_games,)).copy()
+        self.game_over = np.zeros(n_games, dtype=bool)
+        # Rôle vainqueur par collision (EMPTY si aucune collision)
+        self.winner = np.zeros(n_games, dtype=np.uint8)
+        # Pièce suivie par step() : une position et un rôle par partie
+        self.positions = np.zeros((n_games, 2), dtype=np.intp)
+        self.roles = np.zeros(n_games, dtype=np.uint8)
+        self.place_obstacles(num_obstacles)
+
+    @classmethod
+    def from_games(cls, games):
+        """
+        Construit un lot à partir de parties game_engine.Game existantes
+        (mêmes dimensions), en copiant plateaux, tours et états de fin.
+        """
+        first = games[0]
+        batch = cls(len(games), first.rows, first.cols, 0, [g.max_turns for g in games])
+        for i, game in enumerate(games):
+            if (game.rows, game.cols) != (first.rows, first.cols):
+                raise ValueError("Toutes les parties d'un lot doivent avoir les mêmes dimensions")
+            batch.boards[i] = np.frombuffer(bytes(game.cells), dtype=np.uint8).reshape(game.rows, game.cols)
+            batch.turn[i] = game.turn
+            batch.game_over[i] = game.game_over
+        return batch
+
+    def place_obstacles(self, num_obstacles):
+        """
+        Place num_obstacles obstacles sur les cases vides de chaque plateau,
+        par tirage sans remise vectorisé (clés aléatoires + argpartition).
+        """
+        if num_obstacles <= 0:
+            return
+        flat = self.boards.reshape(self.n_games, -1)
+        free = flat == EMPTY
+        if (free.sum(axis=1) < num_obstacles).any():
+            raise ValueError("Nombre d'obstacles supérieur au nombre de cases libres")
+        keys = self.rng.random(flat.shape)
+        keys[~free] = 2.0  # Les cases occupées ne sont jamais tirées
+        chosen = np.argpartition(keys, num_obstacles - 1, axis=1)[:, :num_obstacles]
+        flat[np.arange(self.n_games)[:, None], chosen] = OBSTACLE
+
+    def place_players(self, positions, player_roles):
+        """
+        Place la pièce suivie par step() dans chaque partie.
+
+        :param positions: tableau (n_games, 2) de positions (row, col).
+        :param player_roles: tableau de n_games rôles (VILLAGER ou WOLF) ou un rôle unique.
+        """
+        positions = np.asarray(positions, dtype=np.intp)
+        roles = np.broadcast_to(np.asarray(player_roles, dtype=np.uint8), (self.n_games,))
+        idx = np.arange(self.n_games)
+        self.boards[idx, positions[:, 0], positions[:, 1]] = roles
+        self.positions = positions.copy()
+        self.roles = roles.copy()
+
+    def move_players(self, positions, move_vectors, player_roles):
+        """
+        Applique un déplacement par partie, en une seule étape vectorisée, avec les
+        mêmes règles que Game.is_valid_move / Game.move_player :
+          - déplacements diagonaux interdits, sortie du plateau et obstacles refusés ;
+          - une case occupée par le même type refuse le déplacement ;
+          - une case occupée par le rôle opposé : collision, fin de partie ;
+          - le tour n'est incrémenté que si le déplacement est effectué, et la partie
+            se termine lorsque max_turns est atteint.
+        Contrairement à Game, une partie déjà terminée n'est plus modifiée.
+
+        :param positions: tableau (n_games, 2) des positions actuelles.
+        :param move_vectors: tableau (n_games, 2) des vecteurs (dr, dc).
+        :param player_roles: tableau de n_games rôles (VILLAGER ou WOLF) ou un rôle unique.
+        :return: (nouvelles positions (n_games, 2), codes MOVE_* (n_games,) en uint8).
+        """
+        positions = np.asarray(positions, dtype=np.intp)
+        move_vectors = np.asarray(move_vectors, dtype=np.intp)
+        roles = np.broadcast_to(np.asarray(player_roles, dtype=np.uint8), (self.n_games,))
+        idx = np.arange(self.n_games)
+        dr = move_vectors[:, 0]
+        dc = move_vectors[:, 1]
+        new_r = positions[:, 0] + dr
+        new_c = positions[:, 1] + dc
+
+        diagonal = (dr != 0) & (dc != 0)
+        out = (new_r < 0) | (new_r >= self.rows) | (new_c < 0) | (new_c >= self.cols)
+        target = self.boards[idx, np.clip(new_r, 0, self.rows - 1), np.clip(new_c, 0, self.cols - 1)]
+        piece = (target == VILLAGER) | (target == WOLF)
+
+        # Les règles sont appliquées de la moins prioritaire à la plus prioritaire
+        status = np.full(self.n_games, MOVE_OK, dtype=np.uint8)
+        status[piece & (target != roles)] = MOVE_COLLISION
+        status[piece & (target == roles)] = MOVE_OCCUPIED
+        status[target == OBSTACLE] = MOVE_OBSTACLE
+        status[out] = MOVE_OUT_OF_BOARD
+        status[diagonal] = MOVE_DIAGONAL
+        status[self.game_over] = MOVE_GAME_OVER
+
+        applied = idx[status <= MOVE_COLLISION]
+        self.boards[applied, positions[applied, 0], positions[applied, 1]] = EMPTY
+        self.boards[applied, new_r[applied], new_c[applied]] = roles[applied]
+        self.turn[applied] += 1
+        collided = status[applied] == MOVE_COLLISION
+        self.winner[applied[collided]] = roles[applied[collided]]
+        self.game_over[applied] = collided | (self.turn[applied] >= self.max_turns[applied])
+
+        new_positions = positions.copy()
+        new_positions[applied, 0] = new_r[applied]
+        new_positions[applied, 1] = new_c[applied]
+        return new_positions, status
+
+    def step(self, move_vectors):
+        """
+        Déplace la pièce suivie de chaque partie (voir place_players) et met à jour
+        sa position.
+
+        :param move_vectors: tableau (n_games, 2) des vecteurs (dr, dc).
+        :return: codes MOVE_* (n_games,) en uint8.
+        """
+        self.positions, status = self.move_players(self.positions, move_vectors, self.roles)
+        return status
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Comparaison mémoire / débit entre l'ancien plateau en liste de listes
+et le plateau compact (bytearray + index des pièces) de game_engine.Game.
+
+Usage : python bench_board.py [nb_parties] [nb_deplacements]
+"""
+import random
+import sys
+import time
+import tracemalloc
+
+from game_engine import Game, EMPTY, VILLAGER, WOLF, OBSTACLE
+
+
+class LegacyGame:
+    """
+    Reproduction de l'ancien moteur (plateau en liste de listes d'entiers),
+    conservée uniquement comme point de comparaison.
+    """
+    def __init__(self, rows, cols, num_obstacles, max_turns):
+        self.rows = rows
+        self.cols = cols
+        self.board = [[EMPTY for _ in range(cols)] for _ in range(rows)]
+        count = 0
+        while count < num_obstacles:
+            r = random.randrange(rows)
+            c = random.randrange(cols)
+            if self.board[r][c] == EMPTY:
+                self.board[r][c] = OBSTACLE
+                count += 1
+        self.game_over = False
+        self.turn = 0
+        self.max_turns = max_turns
+
+    def is_valid_move(self, current_position, move_vector):
+        if isinstance(move_vector, str):
+            if len(move_vector) != 2:
+                raise ValueError("Le vecteur de déplacement doit être une chaîne de 2 caractères")
+            try:
+                dr = int(move_vector[0])
+                dc = int(move_vector[1])
+            except ValueError:
+                raise ValueError("Les composantes du vecteur doivent être des nombres entiers")
+        elif isinstance(move_vector, tuple) and len(move_vector) == 2:
+            dr, dc = move_vector
+        else:
+            raise ValueError("Le vecteur de déplacement doit être une chaîne de 2 caractères ou un tuple de 2 entiers")
+        if dr == 0 and dc == 0:
+            return current_position
+        if dr != 0 and dc != 0:
+            raise ValueError("Déplacement invalide : déplacements diagonaux interdits")
+        new_r = current_position[0] + dr
+        new_c = current_position[1] + dc
+        if new_r < 0 or new_r >= self.rows or new_c < 0 or new_c >= self.cols:
+            raise ValueError("Déplacement invalide : Hors du plateau")
+        if self.board[new_r][new_c] == OBSTACLE:
+            raise ValueError("Déplacement invalide : La case destination contient un obstacle")
+        return (new_r, new_c)
+
+    def move_player(self, current_position, move_vector, player_role):
+        try:
+            new_position = self.is_valid_move(current_position, move_vector)
+        except ValueError as e:
+            raise ValueError(f"Déplacement invalide, tour perdu: {e}")
+        r_old, c_old = current_position
+        r_new, c_new = new_position
+        expected_value = VILLAGER if player_role == "villager" else WOLF
+        if self.board[r_new][c_new] in (VILLAGER, WOLF):
+            if self.board[r_new][c_new] != expected_value:
+                self.board[r_old][c_old] = EMPTY
+                self.board[r_new][c_new] = expected_value
+                self.turn += 1
+                self.game_over = True
+                return new_position
+            raise ValueError("Déplacement impossible : la case est déjà occupée par le même type.")
+        self.board[r_old][c_old] = EMPTY
+        self.board[r_new][c_new] = expected_value
+        self.turn += 1
+        if self.turn >= self.max_turns:
+            self.game_over = True
+        return new_position
+
+    def pieces(self, player_role):
+        value = VILLAGER if player_role == "villager" else WOLF
+        return [(r, c) for r in range(self.rows) for c in range(self.cols) if self.board[r][c] == value]
+
+
+def measure_memory(game_class, nb_games, rows=10, cols=10, num_obstacles=10):
+    """Retourne le nombre moyen d'octets alloués par partie."""
+    random.seed(0)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    games = [game_class(rows, cols, num_obstacles, max_turns=10**9) for _ in range(nb_games)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del games
+    return (after - before) / nb_games
+
+
+def _free_corridor(game):
+    """Vide la première ligne pour permettre des allers-retours sans obstacle."""
+    for c in range(game.cols):
+        game.board[0][c] = EMPTY
+
+
+def measure_moves(game_class, nb_moves, rows=10, cols=10):
+    """Retourne le nombre de déplacements effectués par seconde."""
+    random.seed(0)
+    game = game_class(rows, cols, 10, max_turns=10**9)
+    _free_corridor(game)
+    game.board[0][0] = WOLF
+    position = (0, 0)
+    moves = ((0, 1), (0, -1))
+    start = time.perf_counter()
+    for i in range(nb_moves):
+        position = game.move_player(position, moves[i & 1], "wolf")
+    return nb_moves / (time.perf_counter() - start)
+
+
+def measure_lookups(game_class, nb_lookups, rows=10, cols=10):
+    """Retourne le nombre de recherches « où sont les loups ? » par seconde."""
+    random.seed(0)
+    game = game_class(rows, cols, 10, max_turns=10**9)
+    _free_corridor(game)
+    if isinstance(game, Game):
+        game.place_player(1, (0, 0), "wolf")
+        game.place_player(2, (0, cols - 1), "villager")
+    else:
+        game.board[0][0] = WOLF
+        game.board[0][cols - 1] = VILLAGER
+    start = time.perf_counter()
+    for _ in range(nb_lookups):
+        game.pieces("wolf")
+    return nb_lookups / (time.perf_counter() - start)
+
+
+def main():
+    nb_games = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    nb_moves = int(sys.argv[2]) if len(sys.argv) > 2 else 200000
+    print(f"{'Mesure':<32}{'liste de listes':>18}{'bytearray':>18}")
+    for label, func, arg in (
+        ("Octets par partie 10x10", measure_memory, nb_games),
+        ("Déplacements / s", measure_moves, nb_moves),
+        ("Recherches de pièces / s", measure_lookups, nb_moves // 10),
+    ):
+        legacy = func(LegacyGame, arg)
+        compact = func(Game, arg)
+        print(f"{label:<32}{legacy:>18,.0f}{compact:>18,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Charge en boucle locale des deux serveurs HTTP du jeu : server_http (Flask, un thread
+par requête) et server_asgi (uvicorn). Chaque serveur tourne dans son propre processus ;
+des clients à connexion persistante enchaînent /list, /status/<id_party> et /move
+pendant une durée fixe. La mesure est refaite avec des long-polls /wait en attente,
+qui occupent chacun un thread côté Flask.
+
+Usage : python bench_http.py [nb_clients] [durée_s] [nb_long_polls]
+"""
+import asyncio
+import io
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+
+from game_manager import GameManager
+
+SERVERS = ("flask", "asgi")
+
+
+def _prepare_manager(nb_parties=8):
+    """GameManager avec des parties commencées ; retourne aussi (id_party, id_player, move) d'un joueur mobile."""
+    manager = GameManager()
+    players = []
+    for i in range(nb_parties):
+        id_party = manager.create_party(f"bench {i}", rows=10, cols=10, num_obstacles=10,
+                                        max_turns=10**9, seed=i)
+        for j in range(4):
+            players.append((id_party, manager.subscribe(id_party, f"joueur {j}")["id_player"]))
+    manager.create_party("ouverte", seed=0)
+    # Coup unitaire valide : il reste en attente (les autres joueurs ne jouent pas), donc répétable
+    for id_party, id_player in players:
+        game = manager.get_party(id_party).game
+        for move in ("01", "10"):
+            try:
+                game.is_valid_move(game.find_player(id_player), move)
+                return manager, (id_party, id_player, move)
+            except ValueError:
+                continue
+    raise ValueError("Aucun joueur ne peut se déplacer")
+
+
+def _serve(kind, pipe):
+    """Processus serveur : sert l'application kind sur un port libre jusqu'à un message du parent."""
+    sys.stdout = io.StringIO()
+    logging.getLogger().setLevel(logging.CRITICAL)
+    manager, movable = _prepare_manager()
+    # IPPROTO_TCP explicite : sans lui, asyncio n'active pas TCP_NODELAY (attentes d'ACK retardé)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    if kind == "flask":
+        from werkzeug.serving import make_server, WSGIRequestHandler
+        import server_http
+        logging.getLogger("werkzeug").setLevel(logging.CRITICAL)
+        server_http.manager = manager
+        WSGIRequestHandler.protocol_version = "HTTP/1.1"  # Connexions persistantes
+        sock.close()
+        server = make_server("127.0.0.1", port, server_http.app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        stop = server.shutdown
+    else:
+        import uvicorn
+        from server_asgi import GameASGIApp
+        server = uvicorn.Server(uvicorn.Config(GameASGIApp(manager), log_level="critical",
+                                               access_log=False, lifespan="off"))
+        thread = threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True)
+        thread.start()
+        while not server.started:
+            time.sleep(0.01)
+
+        def stop():
+            server.should_exit = True
+            thread.join(5)
+    pipe.send((port, movable))
+    pipe.recv()
+    stop()
+
+
+def _requests(movable):
+    """Requêtes HTTP/1.1 brutes du mélange mesuré."""
+    id_party, id_player, move = movable
+    body = json.dumps({"player_id": id_player, "game_id": id_party, "move": move}).encode()
+    return [
+        b"GET /list HTTP/1.1\r\nHost: bench\r\n\r\n",
+        f"GET /status/{id_party} HTTP/1.1\r\nHost: bench\r\n\r\n".encode(),
+        b"POST /move HTTP/1.1\r\nHost: bench\r\nContent-Type: application/json\r\n"
+        + f"Content-Length: {len(body)}\r\n\r\n".encode() + body,
+    ]
+
+
+async def _read_response(reader):
+    """Lit une réponse ; retourne False si le serveur ferme la connexion après elle."""
+    head = await reader.readuntil(b"\r\n\r\n")
+    length = 0
+    keep_alive = True
+    for line in head.split(b"\r\n")[1:]:
+        name, _, value = line.partition(b":")
+        name = name.strip().lower()
+        if name == b"content-length":
+            length = int(value)
+        elif name == b"connection" and value.strip().lower() == b"close":
+            keep_alive = False
+    if length:
+        await reader.readexactly(length)
+    return keep_alive
+
+
+async def _load(port, requests, nb_clients, duration, waiters):
+    """nb_clients clients en boucle pendant duration secondes, après ouverture de waiters long-polls."""
+    parked = []
+    for request in waiters:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(request)
+        parked.append(writer)
+    await asyncio.sleep(0.2)
+    samples = []
+    deadline = time.perf_counter() + duration
+
+    async def client(i):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        n = i
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            writer.write(requests[n % len(requests)])
+            if not await _read_response(reader):
+                # Le serveur de développement de werkzeug ferme chaque connexion : reconnexion comprise
+                writer.close()
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            samples.append(time.perf_counter() - start)
+            n += 1
+        writer.close()
+
+    await asyncio.gather(*(client(i) for i in range(nb_clients)))
+    for writer in parked:
+        writer.close()
+    return samples
+
+
+def measure_http(kind, nb_clients=50, duration=3.0, nb_long_polls=200):
+    """
+    Débit et latences du serveur kind ("flask" ou "asgi"), sans puis avec nb_long_polls
+    requêtes /wait en attente.
+
+    :return: {"requests_per_s", "p50_us", "p99_us", et les mêmes suffixées "_with_long_polls"}.
+    """
+    parent_pipe, child_pipe = multiprocessing.Pipe()
+    process = multiprocessing.Process(target=_serve, args=(kind, child_pipe), daemon=True)
+    process.start()
+    result = {}
+    try:
+        port, movable = parent_pipe.recv()
+        requests = _requests(movable)
+        id_party = movable[0]
+        # Long-polls sur la version courante : ils restent en attente toute la mesure
+        # (le /move mesuré reste en attente des autres joueurs, la version ne change pas)
+        wait_request = f"GET /wait?id_party={id_party}&since={{}}&timeout=60 HTTP/1.1\r\nHost: bench\r\n\r\n"
+        for suffix, nb_waiters in (("", 0), ("_with_long_polls", nb_long_polls)):
+            version = _current_version(port, id_party)
+            waiters = [wait_request.format(version).encode()] * nb_waiters
+            samples = sorted(asyncio.run(_load(port, requests, nb_clients, duration, waiters)))
+            result[f"requests_per_s{suffix}"] = len(samples) / duration
+            result[f"p50_us{suffix}"] = samples[len(samples) // 2] * 1e6
+            result[f"p99_us{suffix}"] = samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1e6
+            result[f"mean_us{suffix}"] = statistics.fmean(samples) * 1e6
+    finally:
+        parent_pipe.send("stop")
+        process.join(10)
+        if process.is_alive():
+            process.terminate()
+    return result
+
+
+def _current_version(port, id_party):
+    with socket.create_connection(("127.0.0.1", port)) as conn:
+        conn.sendall(f"GET /wait?id_party={id_party}&since=0&timeout=0 HTTP/1.1\r\nHost: bench\r\n"
+                     f"Connection: close\r\n\r\n".encode())
+        data = b""
+        while True:
+            chunk = conn.recv(65536)
+            if not chunk:
+                break
+            data += chunk
+    return json.loads(data.split(b"\r\n\r\n", 1)[1])["response"]["version"]
+
+
+def main():
+    nb_clients = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    duration = float(sys.argv[2]) if len(sys.argv) > 2 else 3.0
+    nb_long_polls = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+    results = {kind: measure_http(kind, nb_clients, duration, nb_long_polls) for kind in SERVERS}
+    print(f"{nb_clients} clients, {duration:g} s, {nb_long_polls} long-polls ({os.cpu_count()} CPU)")
+    print(f"{'Mesure':<36}{'flask':>14}{'asgi':>14}")
+    for key in results["flask"]:
+        print(f"{key:<36}{results['flask'][key]:>14.0f}{results['asgi'][key]:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
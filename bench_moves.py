@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Débit de validation des déplacements (Game.is_valid_move) avant / après
+la table de déplacements précalculée, et débit de la validation par lot
+sans exception (Game.validate_moves).
+
+Usage : python bench_moves.py [nb_validations]
+"""
+import random
+import sys
+import time
+
+from game_engine import Game
+from bench_board import LegacyGame
+
+# Vecteurs unitaires (chaîne et tuple), et mélange incluant des vecteurs invalides
+UNIT_VECTORS = ("01", "10", (0, 1), (1, 0), (0, -1), (-1, 0))
+MIXED_VECTORS = UNIT_VECTORS + ("11", "-1", (0, 0))
+# Vecteurs toujours refusés (bots envoyant des coups invalides en rafale)
+INVALID_VECTORS = ("11", "-1", "ab", (1, 1), (1, -1))
+
+
+def measure_validations(game_class, nb_validations, move_vectors, rows=10, cols=10, num_obstacles=20):
+    """Retourne le nombre de validations (réussies ou refusées) par seconde."""
+    random.seed(0)
+    game = game_class(rows, cols, num_obstacles, max_turns=10**9)
+    requests = [((random.randrange(1, rows - 1), random.randrange(1, cols - 1)), random.choice(move_vectors))
+                for _ in range(1024)]
+    is_valid_move = game.is_valid_move
+    start = time.perf_counter()
+    for i in range(nb_validations):
+        position, move_vector = requests[i & 1023]
+        try:
+            is_valid_move(position, move_vector)
+        except ValueError:
+            pass
+    return nb_validations / (time.perf_counter() - start)
+
+
+def measure_bulk_validations(nb_validations, move_vectors, rows=10, cols=10, num_obstacles=20, batch_size=1024):
+    """Retourne le nombre de validations par seconde avec Game.validate_moves, par lots."""
+    random.seed(0)
+    game = Game(rows, cols, num_obstacles, max_turns=10**9)
+    batch = [((random.randrange(1, rows - 1), random.randrange(1, cols - 1)), random.choice(move_vectors), None)
+             for _ in range(batch_size)]
+    nb_batches = max(1, nb_validations // batch_size)
+    start = time.perf_counter()
+    for _ in range(nb_batches):
+        game.validate_moves(batch)
+    return nb_batches * batch_size / (time.perf_counter() - start)
+
+
+def main():
+    nb_validations = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    print(f"{'Validations / s':<28}{'avant':>14}{'après':>14}{'accélération':>14}")
+    for label, move_vectors in (("vecteurs unitaires", UNIT_VECTORS), ("mélange avec invalides", MIXED_VECTORS)):
+        before = measure_validations(LegacyGame, nb_validations, move_vectors)
+        after = measure_validations(Game, nb_validations, move_vectors)
+        print(f"{label:<28}{before:>14,.0f}{after:>14,.0f}{after / before:>13.2f}x")
+    print(f"{'Validations / s':<28}{'exceptions':>14}{'par lot':>14}{'accélération':>14}")
+    for label, move_vectors in (("vecteurs unitaires", UNIT_VECTORS), ("mélange avec invalides", MIXED_VECTORS),
+                                ("invalides uniquement", INVALID_VECTORS)):
+        before = measure_validations(Game, nb_validations, move_vectors)
+        after = measure_bulk_validations(nb_validations, move_vectors)
+        print(f"{label:<28}{before:>14,.0f}{after:>14,.0f}{after / before:>13.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,760 @@
+#!/usr/bin/env python3
+"""
+Suite de benchmarks (moteur, serveurs, routines SQL) avec résultats JSON,
+pour comparer deux versions du code.
+
+Usage :
+    python bench_runner.py                          # tous les benchmarks, JSON sur la sortie standard
+    python bench_runner.py --only engine tcp        # préfixes de noms de benchmarks
+    python bench_runner.py --quick --output new.json --compare baseline.json
+
+Chaque benchmark retourne un dictionnaire de mesures ; les débits sont en
+opérations par seconde, les durées en microsecondes.
+"""
+import argparse
+import asyncio
+import contextlib
+import http.client
+import io
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import random
+import socket
+import sqlite3
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+from game_engine import Game
+from game_manager import GameManager
+from governance import Limits
+from bench_board import measure_moves
+from bench_moves import measure_validations, MIXED_VECTORS
+from bench_http import SERVERS as HTTP_SERVERS, measure_http
+
+# Registre des benchmarks : nom -> fonction(quick) -> {mesure: valeur}
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """Décorateur enregistrant un benchmark sous un nom hiérarchique ("engine.init")."""
+    def decorator(func):
+        BENCHMARKS[name] = func
+        return func
+    return decorator
+
+
+def _per_call_us(func, nb_calls):
+    """Durée moyenne d'un appel de func, en microsecondes."""
+    start = time.perf_counter()
+    for _ in range(nb_calls):
+        func()
+    return (time.perf_counter() - start) / nb_calls * 1e6
+
+
+def _latency_summary(samples):
+    """Résumé d'une liste de latences (secondes) en microsecondes : moyenne et percentiles."""
+    samples = sorted(samples)
+    return {
+        "requests": len(samples),
+        "mean_us": statistics.fmean(samples) * 1e6,
+        "p50_us": samples[len(samples) // 2] * 1e6,
+        "p99_us": samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1e6,
+    }
+
+
+@contextlib.contextmanager
+def _quiet():
+    """Coupe les print() et les journaux des serveurs pendant un benchmark."""
+    root = logging.getLogger()
+    level = root.level
+    root.setLevel(logging.CRITICAL)
+    logging.getLogger("werkzeug").setLevel(logging.CRITICAL)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+    finally:
+        root.setLevel(level)
+
+
+# --- Moteur ---
+
+@benchmark("engine.init")
+def bench_engine_init(quick):
+    """Game.__init__ (dont place_obstacles) selon la taille du plateau et la densité d'obstacles."""
+    sizes = (10, 50) if quick else (10, 50, 200)
+    results = {}
+    for size in sizes:
+        for density in (0.0, 0.1, 0.3):
+            num_obstacles = int(size * size * density)
+            nb_calls = max(3, 20000 // (size * size))
+            for connected in (False, True):
+                label = f"{size}x{size}_d{density}" + ("_connected" if connected else "")
+                results[label + "_us"] = _per_call_us(
+                    lambda: Game(size, size, num_obstacles, 100, connected=connected), nb_calls)
+    return results
+
+
+@benchmark("engine.place_obstacles")
+def bench_place_obstacles(quick):
+    """Game.place_obstacles seul, sur un plateau déjà construit."""
+    sizes = (10, 50) if quick else (10, 50, 200)
+    results = {}
+    for size in sizes:
+        for density in (0.1, 0.3):
+            num_obstacles = int(size * size * density)
+            nb_calls = max(3, 20000 // (size * size))
+
+            def place():
+                game = Game(size, size, 0, 100)
+                start = time.perf_counter()
+                game.place_obstacles(num_obstacles)
+                return time.perf_counter() - start
+            results[f"{size}x{size}_d{density}_us"] = statistics.fmean(place() for _ in range(nb_calls)) * 1e6
+    return results
+
+
+@benchmark("engine.move_player")
+def bench_move_player(quick):
+    """Débit de Game.move_player (déplacements valides)."""
+    return {"moves_per_s": measure_moves(Game, 50000 if quick else 500000)}
+
+
+@benchmark("engine.is_valid_move")
+def bench_is_valid_move(quick):
+    """Débit de Game.is_valid_move sur un mélange de vecteurs valides et invalides."""
+    return {"validations_per_s": measure_validations(Game, 50000 if quick else 500000, MIXED_VECTORS)}
+
+
+@benchmark("manager.listing")
+def bench_listing(quick):
+    """Liste des parties ouvertes : en cache, reconstruite après une inscription, et filtrée / paginée."""
+    manager = GameManager()
+    nb_open = 1000 if quick else 10000
+    for i in range(nb_open):
+        manager.create_party(f"ouverte {i}", rows=8 + i % 3, cols=10, num_obstacles=10, seed=i)
+    listing = manager.listing
+    nb_calls = 200 if quick else 1000
+    results = {"open_parties": nb_open, "cached_us": _per_call_us(listing.query, nb_calls * 10)}
+    page = {"offset": 100, "limit": 50, "min_free": 4, "rows": 9}
+    results["cached_page_us"] = _per_call_us(lambda: listing.query(**page), nb_calls * 10)
+    parties = iter(range(1, nb_open + 1))
+
+    def invalidate_then_query():
+        # Une inscription par appel : le cache est vidé, la réponse reconstruite puis sérialisée
+        manager.subscribe(next(parties), "bench")
+        listing.query()
+
+    results["rebuilt_us"] = _per_call_us(invalidate_then_query, min(nb_calls, nb_open))
+    return results
+
+
+# --- Serveur TCP ---
+
+def _prepared_manager(nb_parties=8):
+    """GameManager avec des parties commencées, et les (id_party, id_player) de leurs joueurs."""
+    manager = GameManager()
+    players = []
+    for i in range(nb_parties):
+        id_party = manager.create_party(f"bench {i}", rows=10, cols=10, num_obstacles=10,
+                                        max_turns=10**9, seed=i)
+        for j in range(4):
+            players.append((id_party, manager.subscribe(id_party, f"joueur {j}")["id_player"]))
+    manager.create_party("ouverte", seed=0)
+    return manager, players
+
+
+def _movable_player(manager, players):
+    """
+    Retourne (id_party, id_player, vecteur) d'un joueur pouvant jouer "01" ou "10"
+    (seuls vecteurs unitaires exprimables dans le protocole) : le coup reste en attente
+    tant que les autres joueurs n'ont pas joué, il peut donc être répété.
+    """
+    for id_party, id_player in players:
+        game = manager.get_party(id_party).game
+        position = game.find_player(id_player)
+        for move in ("01", "10"):
+            try:
+                game.is_valid_move(position, move)
+                return id_party, id_player, move
+            except ValueError:
+                continue
+    raise ValueError("Aucun joueur ne peut se déplacer")
+
+
+def _action_requests(manager, players):
+    """Une requête représentative par action du protocole."""
+    id_party, id_player, move = _movable_player(manager, players)
+    return {
+        "list": {"action": "list", "parameters": []},
+        # Inscription refusée (partie commencée) : mesurable en boucle sans remplir de partie
+        "subscribe": {"action": "subscribe", "parameters": [{"player": "bench"}, {"id_party": id_party}]},
+        "party_status": {"action": "party_status",
+                         "parameters": [{"id_party": id_party}, {"id_player": id_player}]},
+        "gameboard_status": {"action": "gameboard_status",
+                             "parameters": [{"id_party": id_party}, {"id_player": id_player}]},
+        "move": {"action": "move",
+                 "parameters": [{"id_party": id_party}, {"id_player": id_player}, {"move": move}]},
+        "unknown": {"action": "unknown", "parameters": []},
+    }
+
+
+@benchmark("tcp.process_request")
+def bench_process_request(quick):
+    """TCPServer.process_request pour chaque action (sans réseau)."""
+    from server_tcp import TCPServer
+    manager, players = _prepared_manager()
+    server = TCPServer.__new__(TCPServer)  # Sans socket : seul le traitement est mesuré
+    server.manager = manager
+    nb_calls = 2000 if quick else 20000
+    results = {}
+    for action, request in _action_requests(manager, players).items():
+        results[f"{action}_us"] = _per_call_us(lambda: server.process_request(request), nb_calls)
+    # Coût de la limite par joueur (seau jamais vide : la requête est toujours acceptée)
+    from governance import Governor
+    server.governor = Governor(Limits(player_rate=1e9, player_burst=1e9))
+    move = _action_requests(manager, players)["move"]
+    results["move_with_limits_us"] = _per_call_us(lambda: server.process_request(move), nb_calls)
+    return results
+
+
+def _tcp_round_trips(port, requests, nb_requests):
+    """Envoie les requêtes une à une sur une connexion et retourne les latences."""
+    samples = []
+    with socket.create_connection(("127.0.0.1", port)) as conn:
+        reader = conn.makefile("rb")
+        for i in range(nb_requests):
+            payload = (json.dumps(requests[i % len(requests)]) + "\n").encode("utf-8")
+            start = time.perf_counter()
+            conn.sendall(payload)
+            reader.readline()
+            samples.append(time.perf_counter() - start)
+    return samples
+
+
+@benchmark("tcp.loopback")
+def bench_tcp_loopback(quick):
+    """Latence de bout en bout du serveur TCP (thread par connexion) via un client local."""
+    from server_tcp import TCPServer
+    manager, players = _prepared_manager()
+    requests = list(_action_requests(manager, players).values())
+    server = TCPServer("127.0.0.1", 0, manager=manager, limits=Limits.unlimited())
+    port = server.server_socket.getsockname()[1]
+    threading.Thread(target=server.run, daemon=True).start()
+    samples = _tcp_round_trips(port, requests, 1000 if quick else 10000)
+    server.server_socket.close()
+    return _latency_summary(samples)
+
+
+@benchmark("tcp.pipelined")
+def bench_tcp_pipelined(quick):
+    """Débit d'une connexion : requêtes une à une, pipelinées (champ "id") et regroupées (action batch)."""
+    from server_tcp import TCPServer
+    manager, players = _prepared_manager()
+    requests = list(_action_requests(manager, players).values())
+    server = TCPServer("127.0.0.1", 0, manager=manager, limits=Limits.unlimited())
+    port = server.server_socket.getsockname()[1]
+    threading.Thread(target=server.run, daemon=True).start()
+    nb_requests = 1000 if quick else 10000
+    batch_size = 50
+    results = {}
+    try:
+        samples = _tcp_round_trips(port, requests, nb_requests)
+        results["sequential_per_s"] = nb_requests / sum(samples)
+        with socket.create_connection(("127.0.0.1", port)) as conn:
+            reader = conn.makefile("rb")
+            payload = b"".join((json.dumps(dict(requests[i % len(requests)], id=i)) + "\n").encode("utf-8")
+                               for i in range(nb_requests))
+            start = time.perf_counter()
+            # Envoi dans un thread : le serveur répond pendant que le client écrit encore
+            sender = threading.Thread(target=conn.sendall, args=(payload,))
+            sender.start()
+            for _ in range(nb_requests):
+                reader.readline()
+            results["pipelined_per_s"] = nb_requests / (time.perf_counter() - start)
+            sender.join()
+            batch = {"action": "batch", "requests": [requests[i % len(requests)] for i in range(batch_size)]}
+            payload = (json.dumps(batch) + "\n").encode("utf-8")
+            start = time.perf_counter()
+            for _ in range(nb_requests // batch_size):
+                conn.sendall(payload)
+                reader.readline()
+            results["batch_per_s"] = nb_requests / (time.perf_counter() - start)
+    finally:
+        server.server_socket.close()
+    return results
+
+
+def _legacy_split(chunks):
+    """Découpage historique des lignes (str += puis split), pour comparaison."""
+    buffer = ""
+    count = 0
+    for chunk in chunks:
+        buffer += chunk.decode("utf-8")
+        while "\n" in buffer:
+            _, buffer = buffer.split("\n", 1)
+            count += 1
+    return count
+
+
+def _decoder_split(decoder, chunks):
+    count = 0
+    for chunk in chunks:
+        decoder.feed(chunk)
+        while decoder.next_message() is not None:
+            count += 1
+    return count
+
+
+@benchmark("tcp.framing")
+def bench_tcp_framing(quick):
+    """Découpage d'une rafale (str/split historique vs LineDecoder/FrameDecoder) et trames de déplacement."""
+    from framing import LineDecoder, FrameDecoder, FRAME_OBJECT, encode_frame, pack_move
+    nb_messages = 5000 if quick else 50000
+    message = json.dumps({"action": "move", "parameters": [{"id_party": 1}, {"id_player": 2}, {"move": "01"}]})
+    lines = (message + "\n").encode("utf-8") * nb_messages
+    frames = encode_frame(FRAME_OBJECT, message.encode("utf-8")) * nb_messages
+    # Rafale reçue en gros blocs, comme un client pipeliné
+    chunk = 65536
+    line_chunks = [lines[i:i + chunk] for i in range(0, len(lines), chunk)]
+    frame_chunks = [frames[i:i + chunk] for i in range(0, len(frames), chunk)]
+    results = {}
+    start = time.perf_counter()
+    _legacy_split(line_chunks)
+    results["legacy_split_ms"] = (time.perf_counter() - start) * 1e3
+    start = time.perf_counter()
+    _decoder_split(LineDecoder(max_line=None), line_chunks)
+    results["line_decoder_ms"] = (time.perf_counter() - start) * 1e3
+    start = time.perf_counter()
+    _decoder_split(FrameDecoder(), frame_chunks)
+    results["frame_decoder_ms"] = (time.perf_counter() - start) * 1e3
+    # Un seul gros message (lot de coups) reçu par blocs de 4 Ko : recherche du "\n" répétée
+    big = (json.dumps({"action": "batch", "requests": [json.loads(message)] * (2000 if quick else 20000)})
+           + "\n").encode("utf-8")
+    big_chunks = [big[i:i + 4096] for i in range(0, len(big), 4096)]
+    start = time.perf_counter()
+    _legacy_split(big_chunks)
+    results["legacy_large_message_ms"] = (time.perf_counter() - start) * 1e3
+    start = time.perf_counter()
+    _decoder_split(LineDecoder(max_line=None), big_chunks)
+    results["line_decoder_large_message_ms"] = (time.perf_counter() - start) * 1e3
+    results["json_line_bytes"] = len(message) + 1
+    results["move_frame_bytes"] = len(pack_move(1, 1, 2, (0, 1)))
+    return results
+
+
+def _raise_nofile_limit(needed):
+    """Relève la limite de descripteurs ouverts du processus (Unix) ; retourne la limite obtenue."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < needed:
+        soft = needed if hard == resource.RLIM_INFINITY else min(needed, hard)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (soft, hard))
+    return soft
+
+
+def _rss_kb(pid):
+    """Mémoire résidente (VmRSS) d'un processus en Ko, lue dans /proc (Linux)."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _async_server_process(pipe, nb_connections):
+    """Processus serveur : AsyncTCPServer sur un port libre, arrêté quand le parent écrit dans pipe."""
+    from server_tcp_async import AsyncTCPServer
+    sys.stdout = open(os.devnull, "w")
+    _raise_nofile_limit(nb_connections + 256)
+    manager, players = _prepared_manager()
+
+    async def serve():
+        server = AsyncTCPServer("127.0.0.1", 0, manager=manager, backlog=4096,
+                                limits=Limits.unlimited())
+        port = await server.start()
+        pipe.send((port, list(_action_requests(manager, players).values())))
+        await asyncio.get_running_loop().run_in_executor(None, pipe.recv)
+        await server.shutdown()
+
+    asyncio.run(serve())
+
+
+async def _open_idle_connections(port, nb_connections, batch=500):
+    """Ouvre nb_connections connexions inactives, par lots pour ne pas saturer le backlog."""
+    connections = []
+    for start in range(0, nb_connections, batch):
+        size = min(batch, nb_connections - start)
+        connections.extend(await asyncio.gather(
+            *(asyncio.open_connection("127.0.0.1", port) for _ in range(size))))
+    return connections
+
+
+async def _active_clients(port, requests, nb_clients, duration):
+    """nb_clients clients envoyant des requêtes en boucle pendant duration secondes ; retourne les latences."""
+    samples = []
+    deadline = time.perf_counter() + duration
+    payloads = [(json.dumps(request) + "\n").encode("utf-8") for request in requests]
+
+    async def client(i):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        n = i
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            writer.write(payloads[n % len(payloads)])
+            await reader.readline()
+            samples.append(time.perf_counter() - start)
+            n += 1
+        writer.close()
+
+    await asyncio.gather(*(client(i) for i in range(nb_clients)))
+    return samples
+
+
+@benchmark("tcp_async.loopback")
+def bench_tcp_async_loopback(quick):
+    """Latence de bout en bout du serveur TCP asyncio via un client local (comparable à tcp.loopback)."""
+    from server_tcp_async import AsyncTCPServer
+    manager, players = _prepared_manager()
+    requests = list(_action_requests(manager, players).values())
+    server = AsyncTCPServer("127.0.0.1", 0, manager=manager, limits=Limits.unlimited())
+    loop = asyncio.new_event_loop()
+    port = loop.run_until_complete(server.start())
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    try:
+        samples = _tcp_round_trips(port, requests, 1000 if quick else 10000)
+    finally:
+        asyncio.run_coroutine_threadsafe(server.shutdown(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+    return _latency_summary(samples)
+
+
+@benchmark("tcp_async.idle_connections")
+def bench_tcp_async_idle(quick):
+    """Serveur asyncio dans un processus séparé : 10 000 connexions inactives puis débit de 100 clients actifs."""
+    nb_connections = 1000 if quick else 10000
+    nb_clients = 100
+    _raise_nofile_limit(nb_connections + nb_clients + 256)
+    parent_pipe, child_pipe = multiprocessing.Pipe()
+    process = multiprocessing.Process(target=_async_server_process, args=(child_pipe, nb_connections),
+                                      daemon=True)
+    process.start()
+    try:
+        port, requests = parent_pipe.recv()
+        rss_before = _rss_kb(process.pid)
+
+        async def scenario():
+            start = time.perf_counter()
+            idle = await _open_idle_connections(port, nb_connections)
+            connect_s = time.perf_counter() - start
+            await asyncio.sleep(0.2)  # Laisse le serveur accepter les dernières connexions
+            rss_idle = _rss_kb(process.pid)
+            duration = 1.0 if quick else 5.0
+            samples = await _active_clients(port, requests, nb_clients, duration)
+            for _, writer in idle:
+                writer.close()
+            return connect_s, rss_idle, duration, samples
+
+        connect_s, rss_idle, duration, samples = asyncio.run(scenario())
+    finally:
+        parent_pipe.send("stop")
+        process.join(10)
+        if process.is_alive():
+            process.terminate()
+    result = {
+        "idle_connections": nb_connections,
+        "connect_s": connect_s,
+        "active_clients": nb_clients,
+        "requests_per_s": len(samples) / duration,
+    }
+    if rss_before is not None and rss_idle is not None:
+        result["server_rss_mb"] = rss_idle / 1024
+        result["per_connection_kb"] = (rss_idle - rss_before) / nb_connections
+    result.update(_latency_summary(samples))
+    return result
+
+
+def _multi_requests(port, nb_parties):
+    """Crée des parties via l'action "create" et retourne des requêtes réparties sur chacune."""
+    requests = []
+    with socket.create_connection(("127.0.0.1", port)) as conn:
+        reader = conn.makefile("rb")
+
+        def call(request):
+            conn.sendall((json.dumps(request) + "\n").encode("utf-8"))
+            return json.loads(reader.readline())["response"]
+
+        for i in range(nb_parties):
+            id_party = call({"action": "create", "parameters": {"name": f"bench{i}", "seed": i}})["id_party"]
+            id_player = call({"action": "subscribe", "parameters": {"player": "bench", "id_party": id_party}})["id_player"]
+            requests.append({"action": "party_status", "parameters": {"id_party": id_party, "id_player": id_player}})
+            requests.append({"action": "gameboard_status", "parameters": {"id_party": id_party, "id_player": id_player}})
+    return requests
+
+
+@benchmark("tcp_multi.throughput")
+def bench_tcp_multi(quick):
+    """Débit de 100 clients sur le serveur multi-processus : 1 worker puis un par cœur (au moins 2)."""
+    from server_tcp_multi import MultiProcessTCPServer
+    nb_clients = 100
+    duration = 1.0 if quick else 5.0
+    results = {"cpu_count": os.cpu_count()}
+    for workers in (1, max(2, os.cpu_count() or 1)):
+        server = MultiProcessTCPServer("127.0.0.1", 0, workers=workers, limits=Limits.unlimited(),
+                                       log_level="CRITICAL")
+        port = server.start()
+        try:
+            requests = _multi_requests(port, 4 * workers)
+            samples = asyncio.run(_active_clients(port, requests, nb_clients, duration))
+        finally:
+            server.stop()
+        results[f"workers_{workers}_per_s"] = len(samples) / duration
+        results[f"workers_{workers}_p99_us"] = _latency_summary(samples)["p99_us"]
+    return results
+
+
+@benchmark("http.loopback")
+def bench_http_loopback(quick):
+    """Latence de bout en bout du serveur HTTP (Flask, connexions persistantes) via un client local."""
+    from werkzeug.serving import make_server, WSGIRequestHandler
+    import server_http
+    manager, players = _prepared_manager()
+    shared_manager, protocol_version = server_http.manager, WSGIRequestHandler.protocol_version
+    server_http.manager = manager
+    WSGIRequestHandler.protocol_version = "HTTP/1.1"
+    id_party, id_player, move = _movable_player(manager, players)
+    body = json.dumps({"player_id": id_player, "game_id": id_party, "move": move})
+    # Lot de 100 déplacements (/moves/batch) : latence par requête, à diviser par 100 par déplacement
+    batch_body = json.dumps([{"player_id": id_player, "game_id": id_party, "move": move}] * 100)
+    headers = {"Content-Type": "application/json"}
+    nb_requests = 300 if quick else 3000
+    results = {}
+    server = make_server("127.0.0.1", 0, server_http.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        # État d'une partie : complet (200) puis revalidé par son ETag (304)
+        conn = http.client.HTTPConnection("127.0.0.1", server.server_port)
+        conn.request("GET", f"/status/{id_party}")
+        response = conn.getresponse()
+        response.read()
+        conn.close()
+        conditional = dict(headers, **{"If-None-Match": response.getheader("ETag")})
+        for label, method, path, payload, request_headers in (
+                ("list", "GET", "/list", None, headers),
+                ("move", "POST", "/move", body, headers),
+                ("moves_batch100", "POST", "/moves/batch", batch_body, headers),
+                ("status", "GET", f"/status/{id_party}", None, headers),
+                ("status_304", "GET", f"/status/{id_party}", None, conditional)):
+            conn = http.client.HTTPConnection("127.0.0.1", server.server_port)
+            samples = []
+            for _ in range(nb_requests):
+                start = time.perf_counter()
+                conn.request(method, path, body=payload, headers=request_headers)
+                conn.getresponse().read()
+                samples.append(time.perf_counter() - start)
+            conn.close()
+            for key, value in _latency_summary(samples).items():
+                results[f"{label}_{key}"] = value
+    finally:
+        server.shutdown()
+        server_http.manager, WSGIRequestHandler.protocol_version = shared_manager, protocol_version
+    return results
+
+
+@benchmark("http.flask_vs_asgi")
+def bench_http_servers(quick):
+    """Charge de 50 clients sur server_http (Flask) et server_asgi (uvicorn), sans et avec 200 long-polls."""
+    results = {}
+    for kind in HTTP_SERVERS:
+        for key, value in measure_http(kind, 50, 1.0 if quick else 5.0, 200).items():
+            results[f"{kind}_{key}"] = value
+    return results
+
+
+# --- Routines SQL ---
+
+# Schéma minimal de la variante SQLite (mêmes colonnes que 1_wv_schema.sql)
+_SQLITE_SCHEMA = """
+create table obstacles (id_party int, id_obstacle int, position_col text, position_row text);
+create table players_play (id_players_in_parties int, id_turn int, start_time timestamp, end_time timestamp,
+    action varchar(10), origin_position_col text, origin_position_row text,
+    target_position_col text, target_position_row text);
+"""
+
+
+def _sqlite_complete_tour(conn, tour_id, party_id):
+    """Équivalent SQLite de la procédure COMPLETE_TOUR (wv_procs.sql)."""
+    targets = conn.execute(
+        "SELECT target_position_row, target_position_col, COUNT(*) FROM players_play "
+        "WHERE id_turn = ? GROUP BY target_position_row, target_position_col", (tour_id,)).fetchall()
+    for row, col, count in targets:
+        if count == 1:
+            conn.execute(
+                "UPDATE players_play SET origin_position_row = target_position_row, "
+                "origin_position_col = target_position_col "
+                "WHERE id_turn = ? AND target_position_row = ? AND target_position_col = ?",
+                (tour_id, row, col))
+
+
+def _sqlite_random_position(conn, party_id):
+    """Équivalent SQLite de la fonction random_position (wv_funcs.sql)."""
+    while True:
+        row = str(random.randrange(10))
+        col = str(random.randrange(10))
+        taken = conn.execute(
+            "SELECT EXISTS (SELECT 1 FROM players_play WHERE origin_position_row = ? AND origin_position_col = ?) "
+            "OR EXISTS (SELECT 1 FROM obstacles WHERE id_party = ? AND position_row = ? AND position_col = ?)",
+            (row, col, party_id, row, col)).fetchone()[0]
+        if not taken:
+            return int(row), int(col)
+
+
+def _seed_rows(nb_players, nb_turns, party_id):
+    """
+    Lignes de players_play et d'obstacles de test : un tour par joueur et par tour de jeu.
+    Les positions restent dans la moitié haute du plateau et les obstacles dans la moitié
+    basse, pour que random_position trouve toujours une case libre.
+    """
+    rnd = random.Random(0)
+    plays = [(player, turn, None, None, "move", str(rnd.randrange(10)), str(rnd.randrange(5)),
+              str(rnd.randrange(10)), str(rnd.randrange(5)))
+             for turn in range(1, nb_turns + 1) for player in range(nb_players)]
+    obstacles = [(party_id, i, str(i), str(5 + i % 5)) for i in range(10)]
+    return plays, obstacles
+
+
+def _bench_sql_postgres(url, nb_calls):
+    """COMPLETE_TOUR et random_position sur Postgres, dans une transaction annulée."""
+    import psycopg2
+    party_id = 999999
+    plays, obstacles = _seed_rows(20, nb_calls, party_id)
+    conn = psycopg2.connect(url)
+    try:
+        cur = conn.cursor()
+        cur.executemany("INSERT INTO players_play VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)",
+                        [(p, t + party_id, *rest) for p, t, *rest in plays])
+        cur.executemany("INSERT INTO obstacles VALUES (%s, %s, %s, %s)", obstacles)
+        tour = iter(range(party_id + 1, party_id + nb_calls + 1))
+        complete_us = _per_call_us(lambda: cur.execute("CALL COMPLETE_TOUR(%s, %s)", (next(tour), party_id)),
+                                   nb_calls)
+        random_us = _per_call_us(lambda: (cur.execute("SELECT * FROM random_position(%s)", (party_id,)),
+                                          cur.fetchall()), nb_calls)
+    finally:
+        conn.rollback()
+        conn.close()
+    return {"backend": "postgres", "complete_tour_us": complete_us, "random_position_us": random_us}
+
+
+def _bench_sql_sqlite(nb_calls):
+    """COMPLETE_TOUR et random_position réécrits pour une base SQLite en mémoire."""
+    party_id = 1
+    plays, obstacles = _seed_rows(20, nb_calls, party_id)
+    conn = sqlite3.connect(":memory:")
+    conn.executescript(_SQLITE_SCHEMA)
+    conn.executemany("INSERT INTO players_play VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", plays)
+    conn.executemany("INSERT INTO obstacles VALUES (?, ?, ?, ?)", obstacles)
+    tour = iter(range(1, nb_calls + 1))
+    complete_us = _per_call_us(lambda: _sqlite_complete_tour(conn, next(tour), party_id), nb_calls)
+    random.seed(0)
+    random_us = _per_call_us(lambda: _sqlite_random_position(conn, party_id), nb_calls)
+    conn.close()
+    return {"backend": "sqlite", "complete_tour_us": complete_us, "random_position_us": random_us}
+
+
+@benchmark("sql.routines")
+def bench_sql_routines(quick):
+    """
+    COMPLETE_TOUR et random_position sur le Postgres local (variable DATABASE_URL)
+    si psycopg2 et la base sont disponibles, sinon sur une variante SQLite en mémoire.
+    """
+    nb_calls = 50 if quick else 500
+    url = os.environ.get("DATABASE_URL")
+    if url:
+        try:
+            return _bench_sql_postgres(url, nb_calls)
+        except Exception as e:
+            print(f"Postgres indisponible ({e}), variante SQLite utilisée", file=sys.stderr)
+    return _bench_sql_sqlite(nb_calls)
+
+
+# --- Exécution ---
+
+def _metadata():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+
+
+def run_benchmarks(prefixes=None, quick=False):
+    """Exécute les benchmarks dont le nom commence par l'un des préfixes (tous si None)."""
+    results = {}
+    for name, func in BENCHMARKS.items():
+        if prefixes and not any(name.startswith(prefix) for prefix in prefixes):
+            continue
+        print(f"[bench] {name}...", file=sys.stderr, flush=True)
+        try:
+            # Les serveurs écrivent sur la sortie standard, réservée au rapport JSON
+            with _quiet():
+                results[name] = func(quick)
+        except Exception as e:
+            results[name] = {"error": str(e)}
+    return {"meta": _metadata(), "results": results}
+
+
+def format_comparison(baseline, current):
+    """Tableau des mesures communes à deux résultats, avec le rapport nouveau / référence."""
+    lines = [f"{'mesure':<56}{'référence':>14}{'actuel':>14}{'rapport':>10}"]
+    for name, metrics in current["results"].items():
+        for key, value in metrics.items():
+            before = baseline["results"].get(name, {}).get(key)
+            if isinstance(value, (int, float)) and isinstance(before, (int, float)) and before:
+                lines.append(f"{name + '.' + key:<56}{before:>14,.2f}{value:>14,.2f}{value / before:>9.2f}x")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Suite de benchmarks avec résultats JSON")
+    parser.add_argument("--only", nargs="+", help="préfixes des benchmarks à exécuter")
+    parser.add_argument("--quick", action="store_true", help="mesures courtes (vérification rapide)")
+    parser.add_argument("--output", help="fichier JSON de résultats (sortie standard par défaut)")
+    parser.add_argument("--compare", help="fichier JSON de référence à comparer")
+    parser.add_argument("--list", action="store_true", help="liste les benchmarks disponibles")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, func in BENCHMARKS.items():
+            print(f"{name:<28}{(func.__doc__ or '').strip().splitlines()[0]}")
+        return
+    report = run_benchmarks(args.only, args.quick)
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            print(format_comparison(json.load(f), report), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
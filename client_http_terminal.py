@@ -30,15 +30,19 @@ class HTTPClient:
         self.timeout = timeout
         self.last_response = None
         self.history = []  # Historique complet des réponses
+        self.cached = {}   # endpoint -> (ETag, dernière réponse), pour les requêtes conditionnelles
 
-    def _send_request(self, method, endpoint, data=None):
+    def _send_request(self, method, endpoint, data=None, conditional=False):
         url = f"{self.base_url}{endpoint}"
         logging.info(f"Envoi d'une requête {method} à {url} avec data={data}")
         try:
             if method.upper() == "POST":
                 response = requests.post(url, json=data, timeout=self.timeout)
             elif method.upper() == "GET":
-                response = requests.get(url, timeout=self.timeout)
+                headers = {}
+                if conditional and endpoint in self.cached:
+                    headers["If-None-Match"] = self.cached[endpoint][0]
+                response = requests.get(url, timeout=self.timeout, headers=headers)
             else:
                 raise ValueError(f"Méthode HTTP non supportée: {method}")
         except requests.exceptions.RequestException as e:
@@ -47,6 +51,9 @@ class HTTPClient:
             return None
         
         logging.info(f"Code de réponse: {response.status_code}")
+        if response.status_code == 304:
+            # Rien n'a changé depuis la dernière réponse : on la réutilise
+            return self.cached[endpoint][1]
         try:
             result = response.json()
         except json.JSONDecodeError:
@@ -57,6 +64,8 @@ class HTTPClient:
         
         self.last_response = result
         self.history.append(result)
+        if conditional and "ETag" in response.headers:
+            self.cached[endpoint] = (response.headers["ETag"], result)
         logging.info(f"Réponse reçue: {result}")
         return result
 
@@ -72,6 +81,24 @@ class HTTPClient:
         """
         return self._send_request("GET", "/status")
 
+    def party_status(self, id_party):
+        """
+        Envoie une requête GET conditionnelle pour l'état d'une partie : tant que la
+        partie n'a pas changé, le serveur répond 304 et la réponse précédente est réutilisée.
+        """
+        return self._send_request("GET", f"/status/{id_party}", conditional=True)
+
+    def wait_changes(self, id_party, since, timeout=30):
+        """
+        Long-poll : attend le prochain changement de la partie après la version since
+        et retourne les changements manqués (response["version"] sert d'argument suivant).
+        """
+        saved, self.timeout = self.timeout, timeout + self.timeout  # La réponse peut tarder timeout secondes
+        try:
+            return self._send_request("GET", f"/wait?id_party={id_party}&since={since}&timeout={timeout}")
+        finally:
+            self.timeout = saved
+
     def print_history(self):
         """
         Affiche l'historique complet des réponses.
@@ -3,6 +3,7 @@ from tkinter import ttk, simpledialog
 import socket
 import json
 import threading
+from framing import LineDecoder
 from tkinter import messagebox  # Optionnel pour les pop-ups
 
 class TCPClientApp:
@@ -25,7 +26,7 @@ class TCPClientApp:
         self.client_socket = None
         self.receive_thread = None
         self.running = False
-        self.receive_buffer = ""
+        self.receive_buffer = LineDecoder(max_line=None)
         
         self.create_widgets()
         
@@ -60,6 +61,7 @@ class TCPClientApp:
         ttk.Button(actions_frame, text="État du tour", command=self.send_party_status).pack(side=tk.LEFT, padx=5)
         ttk.Button(actions_frame, text="État du plateau", command=self.send_gameboard_status).pack(side=tk.LEFT, padx=5)
         ttk.Button(actions_frame, text="Déplacer", command=self.send_move).pack(side=tk.LEFT, padx=5)
+        ttk.Button(actions_frame, text="Suivre", command=self.send_watch).pack(side=tk.LEFT, padx=5)
         
         # Cadre des logs
         log_frame = ttk.LabelFrame(self.root, text="Logs")
@@ -118,17 +120,21 @@ class TCPClientApp:
             self.log(f"Erreur lors de l'envoi : {e}")
 
     def listen_server(self):
-        self.receive_buffer = ""
+        # Tampon d'octets : une ligne n'est décodée qu'une fois complète
+        self.receive_buffer = LineDecoder(max_line=None)
         while self.running and self.client_socket:
             try:
-                data = self.client_socket.recv(4096)
+                data = self.client_socket.recv(65536)
                 if not data:
                     self.log("La connexion a été fermée par le serveur.")
                     self.disconnect()
                     break
-                self.receive_buffer += data.decode('utf-8')
-                while "\n" in self.receive_buffer:
-                    message, self.receive_buffer = self.receive_buffer.split("\n", 1)
+                self.receive_buffer.feed(data)
+                while True:
+                    line = self.receive_buffer.next_message()
+                    if line is None:
+                        break
+                    message = line.decode('utf-8', errors='replace')
                     self.log(f"Réponse reçue : {message}")
                     try:
                         response_json = json.loads(message)
@@ -158,6 +164,20 @@ class TCPClientApp:
     
     # Vérifie la réponse pour voir si c'est une notification à afficher
     def check_for_notification(self, response):
+        # Notifications poussées par le serveur après un "watch" (sans status)
+        event = response.get("event")
+        if event == "round_start":
+            self.notify(f"Partie {response['id_party']} : début du tour {response['round_in_progress']}")
+            return
+        if event == "move_resolved":
+            self.notify(f"Partie {response['id_party']} : tour {response['round']} résolu, {response['moves']}")
+            return
+        if event == "game_over":
+            self.notify(f"Partie {response['id_party']} terminée au tour {response['round']}")
+            return
+        if event == "watch_overflow":
+            self.notify("Notifications interrompues (client trop lent) : relancez Suivre")
+            return
         # Ici, vous pouvez définir votre logique pour déterminer si la réponse contient une notification
         # Par exemple, si l'action est "party_status" et que l'état du tour change, on peut notifier l'utilisateur.
         if response.get("status") == "OK":
@@ -242,6 +262,15 @@ class TCPClientApp:
         self.request_text.set(json.dumps(request))
         self.send_request()
 
+    def send_watch(self):
+        id_party = simpledialog.askinteger("Suivre", "Entrez l'ID de la partie:")
+        if id_party is None:
+            self.log("Abonnement annulé.")
+            return
+        request = {"action": "watch", "parameters": [{"id_party": id_party}]}
+        self.request_text.set(json.dumps(request))
+        self.send_request()
+
     def on_close(self):
         self.disconnect()
         self.root.destroy()
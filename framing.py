@@ -0,0 +1,210 @@
+"""
+Découpage des messages du protocole TCP, côté serveur comme côté client.
+
+Deux formats coexistent sur une connexion :
+  - le mode texte historique : un objet JSON par ligne, terminé par "\\n" ;
+  - le mode binaire, négocié par l'action "binary" : des trames préfixées par leur
+    longueur (4 octets, big-endian), dont le premier octet donne le type de contenu.
+
+Les décodeurs accumulent les octets reçus dans un bytearray et ne décodent un
+message qu'une fois complet : un caractère UTF-8 coupé entre deux recv() ne pose
+plus de problème, et le coût reste linéaire quelle que soit la taille des rafales.
+"""
+import struct
+
+import json_codec
+
+try:
+    import msgpack
+except ImportError:  # Dépendance optionnelle : codec "json" uniquement
+    msgpack = None
+
+# Types de trame (premier octet du contenu)
+FRAME_OBJECT = 0  # Objet encodé avec le codec négocié (msgpack ou json)
+FRAME_MOVE = 1    # Déplacement compact : MOVE_STRUCT
+FRAME_JSON = 2    # Objet JSON UTF-8 (notifications, sérialisées une fois pour tous les abonnés)
+
+_LENGTH = struct.Struct(">I")
+# Déplacement compact : id de requête, id_party, id_player, dr, dc
+MOVE_STRUCT = struct.Struct(">IIIbb")
+
+DEFAULT_MAX_MESSAGE = 1 << 20
+# En dessous, copier la tranche du bytearray coûte moins cher que créer une memoryview
+_SMALL_FRAME = 4096
+
+
+class MessageTooLong(ValueError):
+    """Ligne ou trame dépassant la taille maximale autorisée."""
+
+
+class LineDecoder:
+    """Décodeur incrémental du mode texte : restitue les lignes complètes, sans le "\\n"."""
+    __slots__ = ("max_line", "_buffer", "_start", "_scanned")
+
+    def __init__(self, max_line=DEFAULT_MAX_MESSAGE):
+        self.max_line = max_line
+        self._buffer = bytearray()
+        self._start = 0    # Début du prochain message dans le tampon
+        self._scanned = 0  # Position jusqu'à laquelle on sait qu'il n'y a pas de "\n"
+
+    def feed(self, data):
+        """Ajoute des octets reçus. Les messages déjà lus sont retirés du tampon en une fois."""
+        if self._start:
+            del self._buffer[:self._start]
+            self._scanned -= self._start
+            self._start = 0
+        self._buffer += data
+
+    def next_message(self):
+        """
+        Retourne la prochaine ligne complète (bytes), ou None s'il faut plus de données.
+
+        :raises MessageTooLong: si la ligne en cours dépasse max_line octets.
+        """
+        buffer = self._buffer
+        end = buffer.find(b"\n", max(self._start, self._scanned))
+        if end < 0:
+            self._scanned = len(buffer)
+            if self.max_line is not None and len(buffer) - self._start > self.max_line:
+                raise MessageTooLong("Message trop long")
+            return None
+        line = bytes(buffer[self._start:end])
+        self._start = self._scanned = end + 1
+        return line
+
+    def remaining(self):
+        """Octets reçus non encore consommés (passage au mode binaire)."""
+        return bytes(self._buffer[self._start:])
+
+    def buffered(self):
+        """Nombre d'octets reçus non consommés : non nul si un message est commencé."""
+        return len(self._buffer) - self._start
+
+
+class FrameDecoder:
+    """Décodeur incrémental du mode binaire : restitue les trames (type, contenu)."""
+    __slots__ = ("max_frame", "_buffer", "_start")
+
+    def __init__(self, max_frame=DEFAULT_MAX_MESSAGE):
+        self.max_frame = max_frame
+        self._buffer = bytearray()
+        self._start = 0
+
+    def feed(self, data):
+        if self._start:
+            del self._buffer[:self._start]
+            self._start = 0
+        self._buffer += data
+
+    def next_message(self):
+        """
+        Retourne la prochaine trame complète sous la forme (type, contenu), ou None.
+
+        :raises MessageTooLong: si la longueur annoncée dépasse max_frame.
+        :raises ValueError: si la trame est vide (type absent).
+        """
+        buffer = self._buffer
+        start = self._start
+        if len(buffer) - start < 4:
+            return None
+        length, = _LENGTH.unpack_from(buffer, start)
+        if length > self.max_frame:
+            raise MessageTooLong("Message trop long")
+        if not length:
+            raise ValueError("Trame vide")
+        end = start + 4 + length
+        if len(buffer) < end:
+            return None
+        if length <= _SMALL_FRAME:
+            frame = (buffer[start + 4], bytes(buffer[start + 5:end]))
+        else:
+            # Grande trame : une seule copie, via une vue sur le tampon
+            view = memoryview(buffer)
+            try:
+                frame = (buffer[start + 4], bytes(view[start + 5:end]))
+            finally:
+                view.release()  # Sans quoi le bytearray ne peut plus être redimensionné
+        self._start = end
+        return frame
+
+    def remaining(self):
+        return bytes(self._buffer[self._start:])
+
+    def buffered(self):
+        return len(self._buffer) - self._start
+
+
+def encode_frame(frame_type, payload):
+    """Trame complète : longueur, type, contenu."""
+    return _LENGTH.pack(len(payload) + 1) + bytes((frame_type,)) + payload
+
+
+def available_codecs():
+    return ("msgpack", "json") if msgpack is not None else ("json",)
+
+
+def encode_object(codec, obj):
+    if codec == "msgpack":
+        return msgpack.packb(obj)
+    return json_codec.dumps(obj)
+
+
+def decode_object(codec, payload):
+    """
+    :raises ValueError: si le contenu est mal formé.
+    """
+    try:
+        if codec == "msgpack":
+            # strict_map_key=False : les identifiants numériques servent de clés
+            return msgpack.unpackb(payload, strict_map_key=False)
+        return json_codec.loads(payload)
+    except (ValueError, TypeError) as e:  # Erreurs msgpack comprises (sous-classes de ValueError)
+        raise ValueError(f"Trame invalide: {str(e) or e.__class__.__name__}") from e
+
+
+def encode_message(codec, obj):
+    """Message prêt à envoyer : ligne JSON en mode texte (codec None), trame sinon."""
+    if codec is None:
+        return json_codec.dumps_line(obj)
+    return encode_frame(FRAME_OBJECT, encode_object(codec, obj))
+
+
+def encode_events(codec, events):
+    """Notifications sérialisées (lignes JSON) prêtes à envoyer dans le mode de la connexion."""
+    if codec is None:
+        return b"".join(events)
+    return b"".join(encode_frame(FRAME_JSON, event) for event in events)
+
+
+def pack_move(request_id, id_party, id_player, move_vector):
+    """Trame FRAME_MOVE d'un déplacement (dr, dc)."""
+    return encode_frame(FRAME_MOVE, MOVE_STRUCT.pack(request_id, id_party, id_player, *move_vector))
+
+
+def unpack_move(payload):
+    """
+    Requête "move" équivalente à une trame FRAME_MOVE.
+
+    :raises ValueError: si la taille du contenu ne correspond pas.
+    """
+    if len(payload) != MOVE_STRUCT.size:
+        raise ValueError("Trame de déplacement invalide")
+    request_id, id_party, id_player, dr, dc = MOVE_STRUCT.unpack(payload)
+    return {"action": "move", "id": request_id,
+            "parameters": {"id_party": id_party, "id_player": id_player, "move": (dr, dc)}}
+
+
+def decode_frame(codec, frame):
+    """
+    Requête portée par une trame (type, contenu) reçue par le serveur.
+
+    :raises ValueError: si le type est inconnu ou le contenu mal formé.
+    """
+    frame_type, payload = frame
+    if frame_type == FRAME_OBJECT:
+        return decode_object(codec, payload)
+    if frame_type == FRAME_MOVE:
+        return unpack_move(payload)
+    if frame_type == FRAME_JSON:
+        return decode_object("json", payload)
+    raise ValueError(f"Type de trame inconnu : {frame_type}")
@@ -1,4 +1,7 @@
 import random
+from array import array
+
+from sparse_board import SparseCells
 
 # Constantes globales définissant les contenus du plateau
 EMPTY = 0       # Case vide
@@ -6,37 +9,709 @@ VILLAGER = 1    # Villageois
 WOLF = 2        # Loup
 OBSTACLE = 3    # Obstacle
 
+# Codes de résultat d'un déplacement
+MOVE_OK = 0            # Déplacement effectué
+MOVE_COLLISION = 1     # Déplacement effectué sur le rôle opposé : fin de partie
+MOVE_BAD_VECTOR = 2    # Vecteur mal formé
+MOVE_DIAGONAL = 3      # Déplacement diagonal interdit
+MOVE_OUT_OF_BOARD = 4  # Destination hors du plateau
+MOVE_OBSTACLE = 5      # Destination occupée par un obstacle
+MOVE_OCCUPIED = 6      # Destination occupée par le même type
+MOVE_GAME_OVER = 7     # Partie déjà terminée
+MOVE_CONFLICT = 8      # Plusieurs joueurs visent la même case pendant le tour
+MOVE_BAD_POSITION = 9  # Position de départ mal formée
+
+# Directions unitaires, dans l'ordre des colonnes de la table de déplacements
+DIRECTIONS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+# Vecteur unitaire (tuple ou chaîne) -> indice de direction
+_DIRECTION_INDEX = {vector: i for i, vector in enumerate(DIRECTIONS)}
+_DIRECTION_INDEX.update({"10": 1, "01": 3})
+# Sentinelles de la table de déplacements
+_OUT_OF_BOARD = -1
+_BLOCKED = -2
+_BLOCKED_MESSAGES = {
+    _OUT_OF_BOARD: "Déplacement invalide : Hors du plateau",
+    _BLOCKED: "Déplacement invalide : La case destination contient un obstacle",
+}
+
+# Messages des codes de déplacement, construits seulement à la demande (move_message)
+_MOVE_MESSAGES = {
+    MOVE_OK: "Déplacement valide",
+    MOVE_COLLISION: "Collision avec le rôle opposé : fin de partie",
+    MOVE_BAD_VECTOR: "Le vecteur de déplacement doit être une chaîne de 2 caractères ou un tuple de 2 entiers",
+    MOVE_DIAGONAL: "Déplacement invalide : déplacements diagonaux interdits",
+    MOVE_OUT_OF_BOARD: _BLOCKED_MESSAGES[_OUT_OF_BOARD],
+    MOVE_OBSTACLE: _BLOCKED_MESSAGES[_BLOCKED],
+    MOVE_OCCUPIED: "Déplacement impossible : la case est déjà occupée par le même type.",
+    MOVE_GAME_OVER: "La partie est terminée",
+    MOVE_CONFLICT: "Déplacement impossible : plusieurs joueurs visent la même case",
+    MOVE_BAD_POSITION: "Position invalide : la position doit être un tuple de 2 entiers",
+}
+
+# Tuples (row, col) partagés par toutes les parties de mêmes dimensions
+_POSITION_TUPLES = {}
+
+# Journal des coups : un entier 64 bits par enregistrement, composé de
+# case de départ (27 bits), case d'arrivée (27 bits), anciens contenus de ces deux cases
+# (2 bits chacun), valeur écrite à l'arrivée (2 bits) et drapeaux (3 bits).
+_LOG_CELL_BITS = 27
+_LOG_CELL_MASK = (1 << _LOG_CELL_BITS) - 1
+LOG_NO_CELL = _LOG_CELL_MASK  # Pas de case (placement initial, tour sans déplacement)
+LOG_TURN_END = 1              # Dernier enregistrement d'un tour (le tour a été incrémenté)
+LOG_WAS_OVER = 2              # La partie était déjà terminée avant ce tour
+LOG_PLACE = 4                 # Placement d'un joueur, hors tour
+
+
+def pack_log_record(src, dst, src_prev, dst_prev, value, flags):
+    """Assemble un enregistrement du journal des coups en un entier 64 bits."""
+    return src | dst << 27 | src_prev << 54 | dst_prev << 56 | value << 58 | flags << 60
+
+
+def unpack_log_record(record):
+    """
+    Décompose un enregistrement du journal des coups en
+    (case de départ, case d'arrivée, ancien contenu départ, ancien contenu arrivée, valeur, drapeaux).
+    """
+    return (record & _LOG_CELL_MASK, (record >> 27) & _LOG_CELL_MASK,
+            (record >> 54) & 3, (record >> 56) & 3, (record >> 58) & 3, record >> 60)
+
+
+# Table de traduction ne conservant que les obstacles (clé de disposition)
+_OBSTACLES_ONLY = bytes(OBSTACLE if value == OBSTACLE else EMPTY for value in range(256))
+
+# Masques de décalage des bitboards, partagés par dimensions : (plein, sans 1re colonne, sans dernière colonne)
+_SHIFT_MASKS = {}
+
+# Cache des chaînes déjà analysées : chaîne -> (dr, dc) ou message d'erreur
+_VECTOR_CACHE = {}
+_VECTOR_CACHE_SIZE = 1024
+
+
+def _parse_move_vector_uncached(move_vector):
+    """
+    Analyse un vecteur de déplacement et retourne (dr, dc),
+    ou le message d'erreur correspondant s'il est mal formé.
+    """
+    if isinstance(move_vector, str):
+        if len(move_vector) != 2:
+            return "Le vecteur de déplacement doit être une chaîne de 2 caractères"
+        try:
+            return (int(move_vector[0]), int(move_vector[1]))
+        except ValueError:
+            return "Les composantes du vecteur doivent être des nombres entiers"
+    elif isinstance(move_vector, tuple) and len(move_vector) == 2:
+        return move_vector
+    return "Le vecteur de déplacement doit être une chaîne de 2 caractères ou un tuple de 2 entiers"
+
+
+def _lookup_move_vector(move_vector):
+    """
+    Version sans exception de parse_move_vector : retourne (dr, dc) ou le message
+    d'erreur. L'analyse des chaînes est mise en cache.
+    """
+    if move_vector.__class__ is tuple and len(move_vector) == 2:
+        return move_vector
+    if move_vector.__class__ is str:
+        parsed = _VECTOR_CACHE.get(move_vector)
+        if parsed is None:
+            parsed = _parse_move_vector_uncached(move_vector)
+            if len(_VECTOR_CACHE) < _VECTOR_CACHE_SIZE:
+                _VECTOR_CACHE[move_vector] = parsed
+        return parsed
+    return _parse_move_vector_uncached(move_vector)
+
+
+def parse_move_vector(move_vector):
+    """
+    Retourne le tuple (dr, dc) d'un vecteur de déplacement ("01" ou (0, 1)).
+    L'analyse des chaînes est mise en cache.
+
+    :raises ValueError: si le vecteur est mal formé.
+    """
+    parsed = _lookup_move_vector(move_vector)
+    if parsed.__class__ is str:
+        raise ValueError(parsed)
+    return parsed
+
+
+def move_message(code, move_vector=None):
+    """
+    Retourne le message lisible d'un code MOVE_*. Pour MOVE_BAD_VECTOR, le vecteur
+    fautif permet de préciser l'erreur.
+    """
+    if code == MOVE_BAD_VECTOR and move_vector is not None:
+        parsed = _lookup_move_vector(move_vector)
+        if parsed.__class__ is str:
+            return parsed
+        return "Les composantes du vecteur doivent être des nombres entiers"
+    return _MOVE_MESSAGES[code]
+
+
+def mask_to_bitstring(mask, size):
+    """
+    Convertit un masque de bits en chaîne "0"/"1" d'une case par caractère,
+    dans l'ordre r * cols + c (format visible_cells de gameboard_status).
+    """
+    return format(mask, f"0{size}b")[::-1] if size else ""
+
+
+def bitstring_to_mask(bitstring):
+    """
+    Convertit une chaîne "0"/"1" au format visible_cells en masque de bits.
+
+    :raises ValueError: si la chaîne contient d'autres caractères que 0 et 1.
+    """
+    return int(bitstring[::-1], 2) if bitstring else 0
+
+
+class _RowView:
+    """
+    Vue d'une ligne du plateau compact, pour conserver l'accès historique board[r][c].
+    """
+    __slots__ = ("_game", "_row")
+
+    def __init__(self, game, row):
+        self._game = game
+        self._row = row
+
+    def _index(self, col):
+        cols = self._game.cols
+        if col < 0:
+            col += cols
+        if not 0 <= col < cols:
+            raise IndexError("Indice de colonne hors du plateau")
+        return self._row * cols + col
+
+    def __getitem__(self, col):
+        return self._game.cells[self._index(col)]
+
+    def __setitem__(self, col, value):
+        self._game.set_cell(self._index(col), value)
+
+    def __len__(self):
+        return self._game.cols
+
+    def __iter__(self):
+        start = self._row * self._game.cols
+        return iter(self._game.cells[start:start + self._game.cols])
+
+
+class _BoardView:
+    """
+    Vue ligne par ligne du plateau compact (board[r][c], itération sur les lignes).
+    """
+    __slots__ = ("_game",)
+
+    def __init__(self, game):
+        self._game = game
+
+    def __getitem__(self, row):
+        rows = self._game.rows
+        if row < 0:
+            row += rows
+        if not 0 <= row < rows:
+            raise IndexError("Indice de ligne hors du plateau")
+        return _RowView(self._game, row)
+
+    def __len__(self):
+        return self._game.rows
+
+    def __iter__(self):
+        return (_RowView(self._game, r) for r in range(self._game.rows))
+
+
+class _PositionTuples:
+    """
+    Remplaçant de la liste partagée _POSITION_TUPLES pour les plateaux creux :
+    la position (row, col) d'une case est calculée à la demande.
+    """
+    __slots__ = ("cols",)
+
+    def __init__(self, cols):
+        self.cols = cols
+
+    def __getitem__(self, cell):
+        return divmod(cell, self.cols)
+
+
+class _ComputedMovesTable:
+    """
+    Table de déplacements des plateaux creux, calculée à la demande : mêmes lectures
+    table[cell * 4 + direction] (et tranches) que la table précalculée, sans mémoire
+    proportionnelle à la surface.
+    """
+    __slots__ = ("_game",)
+
+    def __init__(self, game):
+        self._game = game
+
+    def __len__(self):
+        return 4 * self._game.rows * self._game.cols
+
+    def __getitem__(self, index):
+        if index.__class__ is slice:
+            return [self[i] for i in range(*index.indices(len(self)))]
+        game = self._game
+        rows, cols = game.rows, game.cols
+        dr, dc = DIRECTIONS[index & 3]
+        r, c = divmod(index >> 2, cols)
+        new_r = r + dr
+        new_c = c + dc
+        if new_r < 0 or new_r >= rows or new_c < 0 or new_c >= cols:
+            return _OUT_OF_BOARD
+        new_cell = new_r * cols + new_c
+        return _BLOCKED if game.cells[new_cell] == OBSTACLE else new_cell
+
+
 class Game:
-    def __init__(self, rows, cols, num_obstacles, max_turns):
+    __slots__ = ("rows", "cols", "cells", "board", "positions", "occupants",
+                 "game_over", "turn", "max_turns", "_moves_table", "_layout_key", "_positions", "masks",
+                 "seed", "rng", "log", "_captured", "_log_ids")
+
+    def __init__(self, rows, cols, num_obstacles, max_turns, bitboard=False, connected=False, seed=None,
+                 sparse=False):
         """
         Initialise un nouveau plateau de jeu avec des dimensions données 
         et place aléatoirement un nombre défini d'obstacles.
         
+        Le plateau est stocké dans un unique bytearray indexé par r * cols + c ;
+        self.board reste disponible comme vue board[r][c].
+        
         :param rows: Nombre de lignes du plateau.
         :param cols: Nombre de colonnes du plateau.
         :param num_obstacles: Nombre d'obstacles à placer.
         :param max_turns: Nombre maximum de tours autorisés avant de terminer la partie.
+        :param bitboard: Si True, maintient en plus un masque de bits par contenu de case
+                         (vide, villageois, loup, obstacle), le bit r * cols + c étant la case.
+        :param connected: Si True, les cases libres restantes forment une seule région connexe.
+        :param seed: Graine du générateur aléatoire propre à la partie ; tirée au hasard si None.
+                     (seed, log) suffisent à rejouer la partie, voir Game.replay.
+        :param sparse: Si True, le plateau est stocké par blocs creux (sparse_board.SparseCells)
+                       et la table de déplacements est calculée à la demande : la mémoire
+                       dépend du nombre de cases occupées, pas de la surface (grandes arènes).
+        :raises ValueError: si le plateau dépasse la taille adressable par le journal des coups,
+                            ou si le mode bitboard est demandé sur un plateau creux.
         """
+        if rows * cols >= LOG_NO_CELL:
+            raise ValueError("Plateau trop grand")
+        if sparse and bitboard:
+            raise ValueError("Le mode bitboard n'est pas disponible sur un plateau creux")
         self.rows = rows
         self.cols = cols
         # Création du plateau : toutes les cases sont initialement vides (EMPTY)
-        self.board = [[EMPTY for _ in range(cols)] for _ in range(rows)]
-        self.place_obstacles(num_obstacles)
+        self.cells = SparseCells(rows * cols) if sparse else bytearray(rows * cols)
+        self.board = _BoardView(self)
+        # Index des pièces : id joueur -> case, et case -> id joueur
+        self.positions = {}
+        self.occupants = {}
+        # Table (case, direction) -> case destination, construite après les obstacles
+        self._moves_table = None
+        self._layout_key = None
+        self._positions = _PositionTuples(cols) if sparse else _POSITION_TUPLES.get((rows, cols))
+        if self._positions is None:
+            self._positions = [divmod(cell, cols) for cell in range(rows * cols)]
+            _POSITION_TUPLES[(rows, cols)] = self._positions
+        # Masques de bits indexés par contenu de case (mode bitboard uniquement)
+        self.masks = [(1 << (rows * cols)) - 1, 0, 0, 0] if bitboard else None
+        # Générateur aléatoire propre à la partie, et journal des coups (append-only)
+        self.seed = seed if seed is not None else random.getrandbits(64)
+        self.rng = random.Random(self.seed)
+        self.log = array("Q")
+        self._captured = {}  # indice d'enregistrement -> id du joueur éliminé
+        self._log_ids = {}   # indice d'enregistrement de placement -> id du joueur placé
+        self.place_obstacles(num_obstacles, connected)
         self.game_over = False  # Indique la fin de la partie
         self.turn = 0         # Compteur de tours
         self.max_turns = max_turns  # Nombre maximum de tours avant fin de partie
 
-    def place_obstacles(self, num_obstacles):
+    def set_cell(self, cell, value):
+        """
+        Écrit directement le contenu d'une case (index r * cols + c).
+        Un joueur indexé sur cette case est retiré de l'index s'il est écrasé.
+        """
+        player_id = self.occupants.pop(cell, None)
+        if player_id is not None:
+            del self.positions[player_id]
+        old_value = self.cells[cell]
+        if value == OBSTACLE or old_value == OBSTACLE:
+            self._moves_table = None
+            self._layout_key = None
+        if self.masks is not None:
+            bit = 1 << cell
+            self.masks[old_value] &= ~bit
+            self.masks[value] |= bit
+        self.cells[cell] = value
+
+    def place_player(self, player_id, position, player_role):
+        """
+        Place un joueur identifié sur le plateau et l'ajoute à l'index des pièces.
+        
+        :param player_id: identifiant du joueur (clé de l'index).
+        :param position: tuple (row, col) de la case de départ.
+        :param player_role: "villager" ou "wolf".
+        :raises ValueError: si la case est hors du plateau ou déjà occupée.
+        """
+        r, c = position
+        if r < 0 or r >= self.rows or c < 0 or c >= self.cols:
+            raise ValueError("Position invalide : Hors du plateau")
+        cell = r * self.cols + c
+        if self.cells[cell] != EMPTY:
+            raise ValueError("Position invalide : la case est déjà occupée")
+        value = VILLAGER if player_role == "villager" else WOLF
+        old_cell = self.positions.get(player_id)
+        if old_cell is not None:
+            old_value = self.cells[old_cell]
+            self.set_cell(old_cell, EMPTY)
+        else:
+            old_cell, old_value = LOG_NO_CELL, EMPTY
+        self.set_cell(cell, value)
+        self.positions[player_id] = cell
+        self.occupants[cell] = player_id
+        self._log_ids[len(self.log)] = player_id
+        self.log.append(pack_log_record(old_cell, cell, old_value, EMPTY, value, LOG_PLACE))
+
+    def find_player(self, player_id):
+        """
+        Retourne la position (row, col) d'un joueur indexé, ou None, en O(1).
+        """
+        cell = self.positions.get(player_id)
+        if cell is None:
+            return None
+        return divmod(cell, self.cols)
+
+    def pieces(self, player_role):
+        """
+        Retourne les positions des joueurs indexés ayant le rôle donné,
+        sans parcourir le plateau.
+        """
+        value = VILLAGER if player_role == "villager" else WOLF
+        cells = self.cells
+        cols = self.cols
+        return [divmod(cell, cols) for cell in self.positions.values() if cells[cell] == value]
+
+    def place_obstacles(self, num_obstacles, connected=False):
+        """
+        Place aléatoirement num_obstacles obstacles (OBSTACLE) sur les cases vides,
+        par tirage sans remise en O(rows * cols), quelle que soit la densité
+        (en O(num_obstacles) sur un plateau creux peu dense, sauf avec connected).
+        
+        :param num_obstacles: Nombre d'obstacles à placer.
+        :param connected: Si True, garantit que les cases non obstacles restent connexes.
+        :raises ValueError: si les cases vides ne suffisent pas, ou si la connexité
+                            ne peut pas être garantie.
+        """
+        if connected:
+            chosen = self._connected_obstacle_cells(num_obstacles)
+        elif self.cells.__class__ is SparseCells:
+            chosen = self._sparse_obstacle_cells(num_obstacles)
+        else:
+            free = [cell for cell, value in enumerate(self.cells) if value == EMPTY]
+            if num_obstacles > len(free):
+                raise ValueError("Nombre d'obstacles supérieur au nombre de cases libres")
+            chosen = self.rng.sample(free, num_obstacles)
+        for cell in chosen:
+            self.cells[cell] = OBSTACLE
+        self._build_moves_table()
+        if self.masks is not None:
+            self.masks = self._build_masks()
+
+    def _sparse_obstacle_cells(self, num_obstacles):
+        """
+        Tirage des obstacles d'un plateau creux par rejet, en O(num_obstacles) tant que
+        le plateau reste peu dense, sans liste des cases libres.
+        """
+        cells = self.cells
+        size = len(cells)
+        free = size - cells.filled
+        if num_obstacles > free:
+            raise ValueError("Nombre d'obstacles supérieur au nombre de cases libres")
+        if 2 * num_obstacles > free:
+            # Plateau dense : le rejet deviendrait coûteux, tirage sur la liste des cases libres
+            return self.rng.sample([cell for cell, value in enumerate(cells) if value == EMPTY], num_obstacles)
+        chosen = set()
+        randrange = self.rng.randrange
+        while len(chosen) < num_obstacles:
+            cell = randrange(size)
+            if cells[cell] == EMPTY:
+                chosen.add(cell)
+        return chosen
+
+    def _connected_obstacle_cells(self, num_obstacles):
+        """
+        Choisit num_obstacles cases vides dont le retrait laisse les autres cases
+        non obstacles connexes.
+        
+        Un arbre couvrant aléatoire des cases non obstacles est construit par Kruskal
+        (arêtes mélangées, union-find) ; retirer une feuille d'un arbre ne le déconnecte
+        jamais, on retire donc des feuilles vides tirées au hasard, en O(rows * cols).
+        """
+        rows, cols, cells = self.rows, self.cols, self.cells
+        size = rows * cols
+        nodes = [cell for cell in range(size) if cells[cell] != OBSTACLE]
+        edges = []
+        for cell in nodes:
+            if cell % cols != cols - 1 and cells[cell + 1] != OBSTACLE:
+                edges.append((cell, cell + 1))
+            if cell + cols < size and cells[cell + cols] != OBSTACLE:
+                edges.append((cell, cell + cols))
+        self.rng.shuffle(edges)
+
+        # Union-find (union par taille, compression par division de chemin)
+        parent = list(range(size))
+        weight = [1] * size
+
+        def find(cell):
+            while parent[cell] != cell:
+                parent[cell] = parent[parent[cell]]
+                cell = parent[cell]
+            return cell
+
+        tree = {cell: [] for cell in nodes}
+        components = len(nodes)
+        for a, b in edges:
+            root_a = find(a)
+            root_b = find(b)
+            if root_a == root_b:
+                continue
+            if weight[root_a] < weight[root_b]:
+                root_a, root_b = root_b, root_a
+            parent[root_b] = root_a
+            weight[root_a] += weight[root_b]
+            tree[a].append(b)
+            tree[b].append(a)
+            components -= 1
+        if components > 1:
+            raise ValueError("Les cases libres du plateau ne sont pas connexes")
+
+        degree = {cell: len(neighbours) for cell, neighbours in tree.items()}
+        leaves = [cell for cell in nodes if degree[cell] <= 1 and cells[cell] == EMPTY]
+        removed = set()
+        chosen = []
+        while len(chosen) < num_obstacles:
+            if not leaves:
+                raise ValueError("Impossible de placer autant d'obstacles sans séparer les cases libres")
+            i = self.rng.randrange(len(leaves))
+            leaves[i], leaves[-1] = leaves[-1], leaves[i]
+            leaf = leaves.pop()
+            removed.add(leaf)
+            chosen.append(leaf)
+            for neighbour in tree[leaf]:
+                if neighbour not in removed:
+                    degree[neighbour] -= 1
+                    if degree[neighbour] == 1 and cells[neighbour] == EMPTY:
+                        leaves.append(neighbour)
+        return chosen
+
+    def _build_moves_table(self):
+        """
+        Précalcule, pour chaque case et chaque direction unitaire, la case destination
+        (ou une sentinelle hors plateau / obstacle). Les obstacles ne bougeant plus
+        après place_obstacles, la validation d'un déplacement devient une seule lecture.
+        """
+        rows, cols, cells = self.rows, self.cols, self.cells
+        if cells.__class__ is SparseCells:
+            self._moves_table = _ComputedMovesTable(self)
+            self._layout_key = None
+            return self._moves_table
+        # Type d'entier le plus compact capable de contenir un index de case
+        size = rows * cols
+        typecode = "b" if size <= 127 else "h" if size <= 32767 else "i"
+        table = array(typecode, [_OUT_OF_BOARD]) * (4 * size)
+        i = 0
+        for r in range(rows):
+            for c in range(cols):
+                for dr, dc in DIRECTIONS:
+                    new_r = r + dr
+                    new_c = c + dc
+                    if 0 <= new_r < rows and 0 <= new_c < cols:
+                        new_cell = new_r * cols + new_c
+                        table[i] = _BLOCKED if cells[new_cell] == OBSTACLE else new_cell
+                    i += 1
+        self._moves_table = table
+        self._layout_key = None
+        return table
+
+    def layout_key(self):
+        """
+        Retourne une clé hachable identifiant la disposition des obstacles, calculée
+        une fois par disposition (deux parties de même disposition ont la même clé).
+        """
+        key = self._layout_key
+        if key is None:
+            if self.cells.__class__ is SparseCells:
+                obstacles = tuple(cell for cell, value in self.cells.items() if value == OBSTACLE)
+                key = self._layout_key = (self.rows, self.cols, obstacles)
+            else:
+                key = self._layout_key = (self.rows, self.cols, bytes(self.cells).translate(_OBSTACLES_ONLY))
+        return key
+
+    def moves_table(self):
+        """
+        Retourne la table de déplacements : l'entrée cell * 4 + direction contient la case
+        destination, ou une valeur négative (hors plateau ou obstacle).
+        """
+        table = self._moves_table
+        if table is None:
+            table = self._build_moves_table()
+        return table
+
+    def neighbours(self, cell):
         """
-        Place aléatoirement num_obstacles obstacles (OBSTACLE) sur le plateau.
+        Retourne les déplacements unitaires possibles depuis cell (ni hors plateau,
+        ni obstacle), sous la forme de couples (indice dans DIRECTIONS, case destination).
         """
-        count = 0
-        while count < num_obstacles:
-            r = random.randrange(self.rows)
-            c = random.randrange(self.cols)
-            if self.board[r][c] == EMPTY:
-                self.board[r][c] = OBSTACLE
-                count += 1
+        table = self._moves_table
+        if table is None:
+            table = self._build_moves_table()
+        start = cell * 4
+        return [(direction, new_cell) for direction, new_cell in enumerate(table[start:start + 4])
+                if new_cell >= 0]
+
+    def _unit_target(self, current_position, move_vector):
+        """
+        Chemin rapide commun aux validations : vecteur unitaire connu (chaîne ou tuple
+        d'entiers) depuis une position (row, col) entière sur le plateau, résolu par une
+        seule lecture dans la table de déplacements.
+
+        :return: case destination, ou sentinelle négative (_OUT_OF_BOARD, _BLOCKED) ;
+                 None si le chemin rapide ne s'applique pas (le cas général décide alors).
+        """
+        try:
+            direction = _DIRECTION_INDEX.get(move_vector)
+            if direction is None:
+                return None
+            # (0.0, 1) a le même hachage que (0, 1) : seuls les tuples d'entiers sont acceptés
+            if move_vector.__class__ is tuple and (move_vector[0] + move_vector[1]).__class__ is not int:
+                return None
+            r, c = current_position
+            cols = self.cols
+            if not (0 <= r < self.rows and 0 <= c < cols):
+                return None
+            cell = r * cols + c
+            if cell.__class__ is not int:
+                return None
+        except (TypeError, ValueError):  # Vecteur non hachable, position mal formée
+            return None
+        table = self._moves_table
+        if table is None:
+            table = self._build_moves_table()
+        return table[cell * 4 + direction]
+
+    def _check_move(self, current_position, move_vector, value=EMPTY):
+        """
+        Cœur sans exception de la validation d'un déplacement.
+
+        :param value: contenu de la case du joueur (VILLAGER ou WOLF) pour signaler les
+                      collisions et les cases occupées par le même type ; EMPTY pour ne
+                      vérifier que le plateau (comme is_valid_move).
+        :return: (code MOVE_*, case destination, position destination) ; en cas de refus
+                 la case vaut -1 et la position est la position de départ.
+        """
+        new_cell = self._unit_target(current_position, move_vector)
+        if new_cell is not None:
+            if new_cell < 0:
+                return (MOVE_OUT_OF_BOARD if new_cell == _OUT_OF_BOARD else MOVE_OBSTACLE), -1, current_position
+            new_position = self._positions[new_cell]
+            if value:
+                target = self.cells[new_cell]
+                if target == VILLAGER or target == WOLF:
+                    if target == value:
+                        return MOVE_OCCUPIED, -1, current_position
+                    return MOVE_COLLISION, new_cell, new_position
+            return MOVE_OK, new_cell, new_position
+        parsed = _lookup_move_vector(move_vector)
+        if parsed.__class__ is str:
+            return MOVE_BAD_VECTOR, -1, current_position
+        code, new_cell, new_position = self._check_vector(current_position, parsed)
+        if value and code == MOVE_OK and new_cell >= 0:
+            target = self.cells[new_cell]
+            if target == VILLAGER or target == WOLF:
+                if target == value:
+                    return MOVE_OCCUPIED, -1, current_position
+                return MOVE_COLLISION, new_cell, new_position
+        return code, new_cell, new_position
+
+    def _check_vector(self, current_position, vector):
+        """
+        Vérifie un vecteur (dr, dc) déjà analysé, quelconque (nul, non unitaire, diagonal),
+        sans tenir compte des joueurs : mêmes retours que _check_move.
+        """
+        rows, cols = self.rows, self.cols
+        try:
+            r, c = current_position
+            0 <= r < rows and 0 <= c < cols  # Coordonnées comparables à des entiers
+        except (TypeError, ValueError):
+            return MOVE_BAD_POSITION, -1, current_position
+        try:
+            dr, dc = vector
+            if dr == 0 and dc == 0:
+                on_board = 0 <= r < rows and 0 <= c < cols
+                return MOVE_OK, (r * cols + c if on_board else -1), current_position
+            if dr != 0 and dc != 0:
+                return MOVE_DIAGONAL, -1, current_position
+            new_r = r + dr
+            new_c = c + dc
+            if new_r < 0 or new_r >= rows or new_c < 0 or new_c >= cols:
+                return MOVE_OUT_OF_BOARD, -1, current_position
+            new_cell = new_r * cols + new_c
+            if self.cells[new_cell] == OBSTACLE:
+                return MOVE_OBSTACLE, -1, current_position
+            return MOVE_OK, new_cell, (new_r, new_c)
+        except (TypeError, ValueError):
+            return MOVE_BAD_VECTOR, -1, current_position
+
+    def _target_cell(self, cell, move_vector):
+        """
+        Version sans exception de la validation, par index de case : retourne
+        (code MOVE_*, case destination). En cas de refus, la case destination est la case de départ.
+        """
+        code, new_cell, _ = self._check_move(self._positions[cell], move_vector)
+        return code, (new_cell if code == MOVE_OK else cell)
+
+    def validate_moves(self, moves):
+        """
+        Valide un lot de déplacements en un seul appel, sans lever d'exception ni
+        construire de message : les refus sont des codes MOVE_*, dont le message
+        s'obtient à la demande avec move_message(code, vecteur).
+
+        :param moves: itérable de (position, vecteur, rôle) ; un rôle None ne vérifie
+                      que le plateau (comme is_valid_move), sinon les cases occupées
+                      sont vérifiées comme dans move_player.
+        :return: (codes, destinations) : bytearray des codes (MOVE_OK ou MOVE_COLLISION si
+                 le déplacement est accepté) et liste des positions destination
+                 (position de départ en cas de refus).
+        """
+        codes = bytearray()
+        destinations = []
+        check = self._check_move
+        unit_target = self._unit_target
+        positions = self._positions
+        cells = self.cells
+        for position, move_vector, role in moves:
+            value = EMPTY if role is None else VILLAGER if role == "villager" else WOLF
+            # Chemin rapide (vecteur unitaire, position sur le plateau), le reste via _check_move
+            new_cell = unit_target(position, move_vector)
+            if new_cell is not None:
+                if new_cell < 0:
+                    codes.append(MOVE_OUT_OF_BOARD if new_cell == _OUT_OF_BOARD else MOVE_OBSTACLE)
+                    destinations.append(position)
+                    continue
+                target = cells[new_cell]
+                if value and (target == VILLAGER or target == WOLF):
+                    if target == value:
+                        codes.append(MOVE_OCCUPIED)
+                        destinations.append(position)
+                    else:
+                        codes.append(MOVE_COLLISION)
+                        destinations.append(positions[new_cell])
+                    continue
+                codes.append(MOVE_OK)
+                destinations.append(positions[new_cell])
+                continue
+            code, _, new_position = check(position, move_vector, value)
+            codes.append(code)
+            destinations.append(new_position)
+        return codes, destinations
 
     def is_valid_move(self, current_position, move_vector):
         """
@@ -47,33 +722,19 @@ class Game:
         :return: tuple (new_row, new_col) si le déplacement est valide.
         :raises ValueError: en cas de vecteur invalide, déplacement diagonal ou hors plateau.
         """
-        if isinstance(move_vector, str):
-            if len(move_vector) != 2:
-                raise ValueError("Le vecteur de déplacement doit être une chaîne de 2 caractères")
-            try:
-                dr = int(move_vector[0])
-                dc = int(move_vector[1])
-            except ValueError:
-                raise ValueError("Les composantes du vecteur doivent être des nombres entiers")
-        elif isinstance(move_vector, tuple) and len(move_vector) == 2:
-            dr, dc = move_vector
-        else:
-            raise ValueError("Le vecteur de déplacement doit être une chaîne de 2 caractères ou un tuple de 2 entiers")
+        new_cell = self._unit_target(current_position, move_vector)
+        if new_cell is not None:
+            if new_cell >= 0:
+                return self._positions[new_cell]
+            raise ValueError(_BLOCKED_MESSAGES[new_cell])
 
-        if dr == 0 and dc == 0:
+        vector = parse_move_vector(move_vector)
+        if vector == (0, 0):
             return current_position
-
-        if dr != 0 and dc != 0:
-            raise ValueError("Déplacement invalide : déplacements diagonaux interdits")
-
-        new_r = current_position[0] + dr
-        new_c = current_position[1] + dc
-
-        if new_r < 0 or new_r >= self.rows or new_c < 0 or new_c >= self.cols:
-            raise ValueError("Déplacement invalide : Hors du plateau")
-        if self.board[new_r][new_c] == OBSTACLE:
-            raise ValueError("Déplacement invalide : La case destination contient un obstacle")
-        return (new_r, new_c)
+        code, _, new_position = self._check_vector(current_position, vector)
+        if code != MOVE_OK:
+            raise ValueError(_MOVE_MESSAGES[code])
+        return new_position
 
     def move_player(self, current_position, move_vector, player_role):
         """
@@ -92,21 +753,50 @@ class Game:
         :return: tuple (new_row, new_col) si le déplacement est effectué.
         :raises ValueError: si le déplacement est invalide.
         """
-        try:
-            new_position = self.is_valid_move(current_position, move_vector)
-        except ValueError as e:
-            raise ValueError(f"Déplacement invalide, tour perdu: {e}")
+        new_cell = self._unit_target(current_position, move_vector)
+        if new_cell is not None:
+            if new_cell < 0:
+                raise ValueError(f"Déplacement invalide, tour perdu: {_BLOCKED_MESSAGES[new_cell]}")
+            r, c = current_position
+            old_cell = r * self.cols + c
+            new_position = self._positions[new_cell]
+        else:
+            try:
+                vector = parse_move_vector(move_vector)
+            except ValueError as e:
+                raise ValueError(f"Déplacement invalide, tour perdu: {e}")
+            code, new_cell, new_position = self._check_vector(current_position, vector)
+            if code != MOVE_OK:
+                raise ValueError(f"Déplacement invalide, tour perdu: {move_message(code, move_vector)}")
+            # Case de départ vérifiée avant d'être écrite dans le journal (entiers non signés)
+            r, c = current_position
+            if not (0 <= r < self.rows and 0 <= c < self.cols):
+                raise ValueError("Déplacement invalide, tour perdu: Position de départ hors du plateau")
+            old_cell = r * self.cols + c
+            if old_cell.__class__ is not int:
+                raise ValueError(f"Déplacement invalide, tour perdu: {_MOVE_MESSAGES[MOVE_BAD_POSITION]}")
+            if new_cell < 0:
+                new_cell = old_cell
 
-        r_old, c_old = current_position
-        r_new, c_new = new_position
         expected_value = VILLAGER if player_role == "villager" else WOLF
+        cells = self.cells
+        target = cells[new_cell]
 
         # Si la case cible contient déjà un personnage
-        if self.board[r_new][c_new] in (VILLAGER, WOLF):
+        if target == VILLAGER or target == WOLF:
             # Si la case contient le personnage opposé, collision et fin de partie
-            if self.board[r_new][c_new] != expected_value:
-                self.board[r_old][c_old] = EMPTY
-                self.board[r_new][c_new] = expected_value
+            if target != expected_value:
+                flags = LOG_TURN_END | LOG_WAS_OVER if self.game_over else LOG_TURN_END
+                self.log.append(pack_log_record(old_cell, new_cell, cells[old_cell], target, expected_value, flags))
+                if self.masks is not None:
+                    self._move_masks(old_cell, new_cell, expected_value)
+                cells[old_cell] = EMPTY
+                cells[new_cell] = expected_value
+                if self.occupants:
+                    captured_id = self.occupants.get(new_cell)
+                    if captured_id is not None:
+                        self._captured[len(self.log) - 1] = captured_id
+                    self._reindex(old_cell, new_cell)
                 self.turn += 1
                 self.game_over = True
                 return new_position
@@ -114,20 +804,408 @@ class Game:
                 raise ValueError("Déplacement impossible : la case est déjà occupée par le même type.")
         else:
             # Déplacement normal
-            self.board[r_old][c_old] = EMPTY
-            self.board[r_new][c_new] = expected_value
+            flags = LOG_TURN_END | LOG_WAS_OVER if self.game_over else LOG_TURN_END
+            self.log.append(pack_log_record(old_cell, new_cell, cells[old_cell], target, expected_value, flags))
+            if self.masks is not None:
+                self._move_masks(old_cell, new_cell, expected_value)
+            cells[old_cell] = EMPTY
+            cells[new_cell] = expected_value
+            if self.occupants:
+                self._reindex(old_cell, new_cell)
             self.turn += 1
             # Vérification du nombre maximum de tours
             if self.turn >= self.max_turns:
                 self.game_over = True
             return new_position
 
+    def _reindex(self, old_cell, new_cell):
+        """
+        Met à jour l'index des pièces après un déplacement de old_cell vers new_cell.
+        Un joueur présent sur la case d'arrivée (collision) est retiré de l'index.
+        """
+        occupants = self.occupants
+        player_id = occupants.pop(old_cell, None)
+        captured_id = occupants.pop(new_cell, None)
+        if captured_id is not None:
+            del self.positions[captured_id]
+        if player_id is not None:
+            self.positions[player_id] = new_cell
+            occupants[new_cell] = player_id
+
+    def _move_masks(self, old_cell, new_cell, value):
+        """
+        Reporte sur les masques de bits un déplacement de old_cell vers new_cell.
+        Doit être appelée avant l'écriture dans self.cells.
+        """
+        masks = self.masks
+        old_bit = 1 << old_cell
+        new_bit = 1 << new_cell
+        masks[self.cells[old_cell]] &= ~old_bit
+        masks[EMPTY] |= old_bit
+        masks[EMPTY if new_cell == old_cell else self.cells[new_cell]] &= ~new_bit
+        masks[value] |= new_bit
+
+    def _build_masks(self):
+        """
+        Construit les masques de bits (vide, villageois, loup, obstacle) depuis le plateau.
+        """
+        masks = [0, 0, 0, 0]
+        for cell, value in enumerate(self.cells):
+            masks[value] |= 1 << cell
+        return masks
+
+    def _shift_masks(self):
+        """
+        Retourne les masques (plein, sans 1re colonne, sans dernière colonne)
+        utilisés pour décaler un bitboard sans déborder d'une ligne à l'autre.
+        """
+        key = (self.rows, self.cols)
+        shift_masks = _SHIFT_MASKS.get(key)
+        if shift_masks is None:
+            full = (1 << (self.rows * self.cols)) - 1
+            first_col = 0
+            for r in range(self.rows):
+                first_col |= 1 << (r * self.cols)
+            last_col = first_col << (self.cols - 1)
+            shift_masks = (full, full & ~first_col, full & ~last_col)
+            _SHIFT_MASKS[key] = shift_masks
+        return shift_masks
+
+    def shift_mask(self, mask, direction):
+        """
+        Décale toutes les pièces d'un masque d'une case dans la direction donnée
+        (indice dans DIRECTIONS). Les pièces sortant du plateau disparaissent.
+        """
+        full, not_first_col, not_last_col = self._shift_masks()
+        if direction == 0:
+            return mask >> self.cols
+        if direction == 1:
+            return (mask << self.cols) & full
+        if direction == 2:
+            return (mask & not_first_col) >> 1
+        return (mask & not_last_col) << 1
+
+    def mask(self, value):
+        """
+        Retourne le masque de bits des cases contenant value (EMPTY, VILLAGER, WOLF, OBSTACLE).
+        Hors mode bitboard, le masque est recalculé depuis le plateau.
+        """
+        masks = self.masks if self.masks is not None else self._build_masks()
+        return masks[value]
+
+    def legal_moves(self, player_role):
+        """
+        Calcule en quelques décalages les déplacements unitaires légaux de toutes les
+        pièces d'un rôle.
+
+        :param player_role: "villager" ou "wolf".
+        :return: liste de 4 masques (un par direction de DIRECTIONS) des cases
+                 destination atteignables : ni hors plateau, ni obstacle, ni même type.
+        """
+        masks = self.masks if self.masks is not None else self._build_masks()
+        value = VILLAGER if player_role == "villager" else WOLF
+        allowed = ~(masks[OBSTACLE] | masks[value])
+        return [self.shift_mask(masks[value], d) & allowed for d in range(4)]
+
+    def collisions(self, player_role):
+        """
+        Retourne, par direction, le masque des cases où une pièce du rôle donné
+        entrerait en collision avec le rôle opposé (masque décalé ET masque adverse).
+        """
+        masks = self.masks if self.masks is not None else self._build_masks()
+        value = VILLAGER if player_role == "villager" else WOLF
+        opponent = masks[WOLF if value == VILLAGER else VILLAGER]
+        return [self.shift_mask(masks[value], d) & opponent for d in range(4)]
+
+    def legal_move_list(self, player_role):
+        """
+        Liste les déplacements légaux de chaque pièce d'un rôle, sous la forme
+        ((row, col), (new_row, new_col)), à partir de legal_moves.
+        """
+        positions = self._positions
+        moves = []
+        for direction, destinations in enumerate(self.legal_moves(player_role)):
+            dr, dc = DIRECTIONS[direction]
+            offset = dr * self.cols + dc
+            while destinations:
+                low = destinations & -destinations
+                cell = low.bit_length() - 1
+                moves.append((positions[cell - offset], positions[cell]))
+                destinations ^= low
+        return moves
+
+    def export_bitstring(self, *values):
+        """
+        Exporte au format visible_cells ("010010000") les cases contenant l'une des valeurs
+        données (par défaut toute case non vide).
+        """
+        if not values:
+            values = (VILLAGER, WOLF, OBSTACLE)
+        mask = 0
+        for value in values:
+            mask |= self.mask(value)
+        return mask_to_bitstring(mask, self.rows * self.cols)
+
+    def import_bitstring(self, bitstring, value):
+        """
+        Importe une chaîne au format visible_cells dans la couche value : les cases
+        à "1" prennent la valeur value, les cases à "0" qui l'avaient deviennent vides.
+
+        :raises ValueError: si la longueur ne correspond pas au plateau.
+        """
+        size = self.rows * self.cols
+        if len(bitstring) != size:
+            raise ValueError(f"La chaîne doit contenir {size} cases")
+        mask = bitstring_to_mask(bitstring)
+        current = self.mask(value)
+        changed = mask ^ current
+        while changed:
+            low = changed & -changed
+            cell = low.bit_length() - 1
+            self.set_cell(cell, value if mask & low else EMPTY)
+            changed ^= low
+
+    def resolve_round(self, moves):
+        """
+        Résout un tour complet de déplacements simultanés, comme la procédure SQL
+        COMPLETE_TOUR, en O(nombre de joueurs) :
+          - chaque déplacement est validé (refusé : le joueur reste sur place) ;
+          - les déplacements visant la même case sont tous annulés (MOVE_CONFLICT) ;
+          - un déplacement vers une case dont l'occupant de même type reste sur place
+            est annulé (MOVE_OCCUPIED), ce qui peut en bloquer d'autres en cascade ;
+          - un déplacement vers une case dont l'occupant de rôle opposé reste sur place
+            est une collision : l'occupant est éliminé et la partie se termine ;
+          - un loup et un villageois qui échangent leurs cases se croisent : c'est une
+            collision, le loup prend la case du villageois, qui est éliminé.
+        Deux joueurs de même rôle peuvent échanger leurs cases. Le tour est incrémenté une fois.
+        
+        :param moves: dictionnaire {id joueur: vecteur de déplacement} des joueurs indexés.
+        :return: dictionnaire {id joueur: (code MOVE_*, position finale)} ; la position
+                 d'un joueur éliminé pendant le tour vaut None.
+        :raises ValueError: si un joueur n'est pas sur le plateau.
+        """
+        positions = self._positions
+        cells = self.cells
+        results = {}
+        if self.game_over:
+            for player_id in moves:
+                results[player_id] = (MOVE_GAME_OVER, self.find_player(player_id))
+            return results
+
+        # Validation et regroupement des cases visées en une seule passe
+        plans = {}
+        by_target = {}
+        for player_id, move_vector in moves.items():
+            old_cell = self.positions.get(player_id)
+            if old_cell is None:
+                raise ValueError(f"Joueur inconnu sur le plateau : {player_id}")
+            code, new_cell = self._target_cell(old_cell, move_vector)
+            if code != MOVE_OK or new_cell == old_cell:
+                results[player_id] = (code, positions[old_cell])
+                continue
+            plans[player_id] = (old_cell, new_cell, cells[old_cell])
+            targets = by_target.get(new_cell)
+            if targets is None:
+                by_target[new_cell] = [player_id]
+            else:
+                targets.append(player_id)
+
+        # Conflits : plusieurs joueurs visent la même case
+        moving = {}
+        for new_cell, player_ids in by_target.items():
+            if len(player_ids) == 1:
+                moving[new_cell] = player_ids[0]
+            else:
+                for player_id in player_ids:
+                    results[player_id] = (MOVE_CONFLICT, positions[plans[player_id][0]])
+        leaving = {plans[player_id][0] for player_id in moving.values()}
+
+        # Cases visées dont l'occupant reste sur place : annulation en cascade
+        stack = [new_cell for new_cell in moving
+                 if (cells[new_cell] == VILLAGER or cells[new_cell] == WOLF) and new_cell not in leaving]
+        while stack:
+            new_cell = stack.pop()
+            player_id = moving.get(new_cell)
+            if player_id is None:
+                continue
+            old_cell, _, value = plans[player_id]
+            if cells[new_cell] == value:
+                del moving[new_cell]
+                leaving.discard(old_cell)
+                results[player_id] = (MOVE_OCCUPIED, positions[old_cell])
+                if old_cell in moving:
+                    stack.append(old_cell)
+
+        # Loup et villageois qui se croisent : le villageois reste sur sa case, où le loup le capture
+        for new_cell, player_id in list(moving.items()):
+            old_cell, _, value = plans[player_id]
+            other_id = moving.get(old_cell)
+            if value == WOLF and other_id is not None and plans[other_id][0] == new_cell \
+                    and plans[other_id][2] == VILLAGER:
+                del moving[old_cell]
+                results[other_id] = (MOVE_COLLISION, None)
+
+        # Application : on libère toutes les cases de départ, puis on occupe les arrivées
+        for player_id in moving.values():
+            self.set_cell(plans[player_id][0], EMPTY)
+        collision = False
+        log = self.log
+        for new_cell, player_id in moving.items():
+            old_cell, _, value = plans[player_id]
+            code = MOVE_OK
+            target = cells[new_cell]
+            if target == VILLAGER or target == WOLF:
+                captured_id = self.occupants.get(new_cell)
+                if captured_id is not None:
+                    results[captured_id] = (results.get(captured_id, (MOVE_OK,))[0], None)
+                    self._captured[len(log)] = captured_id
+                code = MOVE_COLLISION
+                collision = True
+            log.append(pack_log_record(old_cell, new_cell, value, target, value, 0))
+            self.set_cell(new_cell, value)
+            self.positions[player_id] = new_cell
+            self.occupants[new_cell] = player_id
+            results[player_id] = (code, positions[new_cell])
+
+        # Le dernier enregistrement du tour porte la fin de tour
+        flags = LOG_TURN_END | LOG_WAS_OVER if self.game_over else LOG_TURN_END
+        if moving:
+            log[-1] |= flags << 60
+        else:
+            log.append(pack_log_record(LOG_NO_CELL, LOG_NO_CELL, EMPTY, EMPTY, EMPTY, flags))
+        self.turn += 1
+        if collision or self.turn >= self.max_turns:
+            self.game_over = True
+        return results
+
+    def snapshot(self):
+        """
+        Retourne un point de restauration en O(1) : la longueur du journal des coups.
+        Seules les opérations journalisées (placements, déplacements, tours) sont annulables.
+        """
+        return len(self.log)
+
+    def undo(self, snapshot=None):
+        """
+        Annule le dernier tour (ou placement) journalisé, ou, si snapshot est donné,
+        tout ce qui a été joué depuis ce point de restauration. Le coût est proportionnel
+        au nombre d'enregistrements annulés, sans copie du plateau.
+
+        :raises ValueError: si le journal est vide ou le point de restauration invalide.
+        """
+        if snapshot is None:
+            if not self.log:
+                raise ValueError("Aucun coup à annuler")
+            self._undo_group()
+            return
+        if snapshot < 0 or snapshot > len(self.log):
+            raise ValueError("Point de restauration invalide")
+        while len(self.log) > snapshot:
+            self._undo_group()
+
+    def _undo_group(self):
+        """
+        Annule le dernier groupe d'enregistrements : un placement, ou tous les
+        déplacements d'un tour (annulés en deux phases comme ils ont été appliqués).
+        """
+        log = self.log
+        end = len(log)
+        start = end - 1
+        while start > 0 and not (log[start - 1] >> 60) & (LOG_TURN_END | LOG_PLACE):
+            start -= 1
+        # Phase 1 : restauration des cases d'arrivée (et des joueurs éliminés)
+        sources = []
+        for index in range(end - 1, start - 1, -1):
+            src, dst, src_prev, dst_prev, _, _ = unpack_log_record(log[index])
+            if dst == LOG_NO_CELL:
+                continue
+            player_id = self.occupants.get(dst)
+            self.set_cell(dst, dst_prev)
+            captured_id = self._captured.pop(index, None)
+            if captured_id is not None:
+                self.positions[captured_id] = dst
+                self.occupants[dst] = captured_id
+            self._log_ids.pop(index, None)
+            sources.append((src, src_prev, player_id))
+        # Phase 2 : restauration des cases de départ
+        for src, src_prev, player_id in sources:
+            if src == LOG_NO_CELL:
+                continue
+            self.set_cell(src, src_prev)
+            if player_id is not None:
+                self.positions[player_id] = src
+                self.occupants[src] = player_id
+        flags = log[end - 1] >> 60
+        del log[start:]
+        if flags & LOG_TURN_END:
+            self.turn -= 1
+            self.game_over = bool(flags & LOG_WAS_OVER)
+
+    @classmethod
+    def replay(cls, rows, cols, num_obstacles, max_turns, seed, log, log_ids=None, **options):
+        """
+        Reconstruit une partie à partir de sa graine et de son journal des coups,
+        sans avoir stocké de plateau : les obstacles sont retirés avec la même graine,
+        puis les enregistrements sont rejoués.
+
+        :param log: journal des coups (Game.log) de la partie d'origine.
+        :param log_ids: {indice d'enregistrement: id joueur} des placements, pour
+                        reconstruire aussi l'index des pièces (facultatif).
+        :param options: autres paramètres de Game (bitboard, connected).
+        """
+        game = cls(rows, cols, num_obstacles, max_turns, seed=seed, **options)
+        log_ids = log_ids or {}
+        group = []
+        for index, record in enumerate(log):
+            group.append((index, record))
+            if (record >> 60) & (LOG_TURN_END | LOG_PLACE):
+                game._apply_group(group, log_ids)
+                group = []
+        return game
+
+    def _apply_group(self, group, log_ids):
+        """
+        Rejoue un groupe d'enregistrements (placement ou tour complet) en deux phases :
+        libération des cases de départ, puis occupation des cases d'arrivée.
+        """
+        movers = []
+        for index, record in group:
+            src, dst, _, _, value, _ = unpack_log_record(record)
+            player_id = log_ids.get(index)
+            if src != LOG_NO_CELL:
+                moved_id = self.occupants.get(src)
+                if moved_id is not None:
+                    player_id = moved_id
+                self.set_cell(src, EMPTY)
+            movers.append((dst, value, player_id))
+        collision = False
+        for (index, record), (dst, value, player_id) in zip(group, movers):
+            if dst != LOG_NO_CELL:
+                target = self.cells[dst]
+                if target == VILLAGER or target == WOLF:
+                    collision = collision or target != value
+                    captured_id = self.occupants.get(dst)
+                    if captured_id is not None:
+                        self._captured[len(self.log)] = captured_id
+                self.set_cell(dst, value)
+                if player_id is not None:
+                    self.positions[player_id] = dst
+                    self.occupants[dst] = player_id
+                    if index in log_ids:
+                        self._log_ids[len(self.log)] = player_id
+            self.log.append(record)
+        if (group[-1][1] >> 60) & LOG_TURN_END:
+            self.turn += 1
+            if collision or self.turn >= self.max_turns:
+                self.game_over = True
+
     def display_board(self):
         """
         Affiche le plateau de jeu dans le terminal (pour débogage), ainsi que le numéro de tour.
         """
         mapping = {EMPTY: ".", VILLAGER: "V", WOLF: "W", OBSTACLE: "X"}
-        for row in self.board:
+        for r in range(self.rows):
+            row = self.cells[r * self.cols:(r + 1) * self.cols]
             print(" ".join(mapping[cell] for cell in row))
         print(f"Tour: {self.turn}\n")
 
@@ -0,0 +1,436 @@
+import itertools
+import threading
+import time
+from collections import OrderedDict
+
+from game_engine import Game, EMPTY, OBSTACLE
+from party_events import (ChangeLog, EventHub, EVENT_PLAYER_JOINED, EVENT_ROUND_START,
+                          EVENT_MOVE_RESOLVED, EVENT_GAME_OVER)
+from party_listing import OpenPartyListing
+
+# Rôles disponibles et valeurs par défaut d'une partie
+ROLES = ("villager", "wolf")
+DEFAULT_PARTY = {
+    "rows": 10,
+    "cols": 10,
+    "num_obstacles": 10,
+    "max_turns": 30,
+    "roles_quotas": {"villager": 3, "wolf": 1},
+}
+# Taille du plateau acceptée (lignes et colonnes), comme le formulaire create_game.html
+MIN_BOARD_SIDE = 2
+MAX_BOARD_SIDE = 10
+
+
+class Party:
+    """
+    Une partie hébergée par le GameManager : le moteur (Game), ses joueurs et les
+    déplacements en attente du tour en cours. Toute lecture ou modification se fait
+    sous party.lock, propre à la partie.
+
+    version augmente à chaque changement visible de l'état (inscription, tour résolu) :
+    deux lectures de même version retournent le même état.
+    """
+    __slots__ = ("id_party", "title", "game", "lock", "roles_quotas", "players",
+                 "pending", "started", "finished_at", "version")
+
+    def __init__(self, id_party, title, game, roles_quotas):
+        self.id_party = id_party
+        self.title = title
+        self.game = game
+        self.lock = threading.Lock()
+        self.roles_quotas = dict(roles_quotas)
+        self.players = {}   # id_player -> (pseudo, rôle)
+        self.pending = {}   # id_player -> vecteur de déplacement du tour en cours
+        self.started = False
+        self.finished_at = None
+        self.version = 0
+
+    def is_full(self):
+        return len(self.players) >= sum(self.roles_quotas.values())
+
+    def free_role(self):
+        """Retourne le rôle ayant le plus de places libres, ou None si la partie est complète."""
+        counts = {role: 0 for role in self.roles_quotas}
+        for _, role in self.players.values():
+            counts[role] += 1
+        role = max(self.roles_quotas, key=lambda r: self.roles_quotas[r] - counts[r])
+        return role if counts[role] < self.roles_quotas[role] else None
+
+
+class GameManager:
+    def __init__(self, max_finished=1024, id_offset=0, id_stride=1, max_board_side=MAX_BOARD_SIDE):
+        """
+        Héberge en mémoire de nombreuses parties simultanées, indexées par id_party.
+
+        Le verrou du registre ne protège que l'ajout, le changement d'état et l'éviction
+        des parties (opérations courtes) ; les coups d'une partie ne prennent que le
+        verrou de cette partie, deux parties ne se bloquent donc jamais entre elles.
+        Ordre des verrous : verrou de partie, puis verrou du registre.
+
+        Les événements des parties (inscription, début de tour, tour résolu, fin de
+        partie) sont publiés sous le verrou de la partie, donc dans l'ordre du jeu :
+        dans self.events pour les abonnés TCP, et dans self.changes (un changement
+        par version de la partie) pour les clients HTTP.
+
+        :param max_finished: nombre de parties terminées conservées (consultables)
+                             avant éviction des plus anciennes.
+        :param id_offset, id_stride: les identifiants attribués sont 1 + id_offset + k * id_stride ;
+                                     plusieurs GameManager (un par processus) se partagent
+                                     ainsi l'espace des identifiants sans collision.
+        :param max_board_side: nombre maximum de lignes et de colonnes d'un plateau.
+        """
+        self.max_finished = max_finished
+        self.max_board_side = max_board_side
+        self._parties = {}              # id_party -> Party
+        self._started = set()           # parties commencées, non terminées
+        self._finished = OrderedDict()  # id_party -> date de fin, de la plus ancienne à la plus récente
+        self._lock = threading.Lock()
+        self._party_ids = itertools.count(1 + id_offset, id_stride)
+        self._player_ids = itertools.count(1 + id_offset, id_stride)
+        self.events = EventHub()
+        self.changes = ChangeLog()
+        self.listing = OpenPartyListing()  # Parties ouvertes non commencées, réponses "list" en cache
+
+    # --- Registre ---
+
+    def create_party(self, title, rows=None, cols=None, num_obstacles=None, max_turns=None,
+                     roles_quotas=None, seed=None):
+        """
+        Crée une partie ouverte et retourne son identifiant.
+
+        :param roles_quotas: {rôle: nombre maximum de joueurs}.
+        :raises ValueError: si les paramètres de la partie sont invalides.
+        """
+        if not title:
+            raise ValueError("Le nom de la partie est requis.")
+        # Paramètres vérifiés avant toute allocation : un plateau géant serait construit
+        # (et sa connexité vérifiée) avant d'être refusé
+        rows = _integer(rows or DEFAULT_PARTY["rows"], "rows", MIN_BOARD_SIDE, self.max_board_side)
+        cols = _integer(cols or DEFAULT_PARTY["cols"], "cols", MIN_BOARD_SIDE, self.max_board_side)
+        if num_obstacles is None:
+            num_obstacles = DEFAULT_PARTY["num_obstacles"]
+        num_obstacles = _integer(num_obstacles, "nb_obstacles", 0)
+        max_turns = _integer(max_turns or DEFAULT_PARTY["max_turns"], "nb_rounds", 1)
+        roles_quotas = roles_quotas or DEFAULT_PARTY["roles_quotas"]
+        if (not isinstance(roles_quotas, dict) or any(role not in ROLES for role in roles_quotas)
+                or any(not _is_integer(quota) or quota < 1 for quota in roles_quotas.values())):
+            raise ValueError("Quotas de rôles invalides")
+        if num_obstacles + sum(roles_quotas.values()) > rows * cols:
+            raise ValueError("Plateau trop petit pour les obstacles et les joueurs")
+        game = Game(rows, cols, num_obstacles, max_turns, connected=True, seed=seed)
+        id_party = next(self._party_ids)
+        party = Party(id_party, title, game, roles_quotas)
+        self.changes.open(id_party)
+        self.listing.add(party)  # Avant l'enregistrement : aucune inscription ne peut la précéder
+        with self._lock:
+            self._parties[id_party] = party
+        return id_party
+
+    def get_party(self, id_party):
+        """
+        Retourne la partie id_party (lecture sans verrou).
+
+        :raises ValueError: si la partie n'existe pas (ou a été évincée).
+        """
+        party = self._parties.get(id_party)
+        if party is None:
+            raise ValueError(f"Partie inconnue : {id_party}")
+        return party
+
+    def list_open(self):
+        """Identifiants des parties ouvertes non commencées, par ordre de création."""
+        return self.listing.ids()
+
+    def list_started(self):
+        """Identifiants des parties en cours."""
+        with self._lock:
+            return sorted(self._started)
+
+    def __len__(self):
+        return len(self._parties)
+
+    def evict_finished(self, older_than=None):
+        """
+        Retire du registre les parties terminées depuis plus de older_than secondes
+        (toutes si None) et retourne le nombre de parties évincées.
+        """
+        limit = time.monotonic() - older_than if older_than is not None else None
+        evicted = 0
+        with self._lock:
+            while self._finished:
+                id_party, finished_at = next(iter(self._finished.items()))
+                if limit is not None and finished_at > limit:
+                    break
+                del self._finished[id_party]
+                del self._parties[id_party]
+                self.changes.discard(id_party)
+                evicted += 1
+        return evicted
+
+    def _mark_started(self, party):
+        party.started = True
+        self.listing.remove(party.id_party)
+        with self._lock:
+            self._started.add(party.id_party)
+
+    def _mark_finished(self, party):
+        party.finished_at = time.monotonic()
+        self.listing.remove(party.id_party)
+        with self._lock:
+            self._started.discard(party.id_party)
+            self._finished[party.id_party] = party.finished_at
+            while len(self._finished) > self.max_finished:
+                id_party, _ = self._finished.popitem(last=False)
+                del self._parties[id_party]
+                self.changes.discard(id_party)
+
+    # --- Actions des joueurs ---
+
+    def subscribe(self, id_party, player):
+        """
+        Inscrit un joueur dans une partie ouverte, lui attribue un rôle selon les quotas
+        et une case libre. La partie démarre dès que tous les quotas sont remplis.
+
+        :return: {"role": rôle, "id_player": identifiant du joueur}.
+        :raises ValueError: si la partie est inconnue, déjà commencée ou complète.
+        """
+        party = self.get_party(id_party)
+        with party.lock:
+            if party.started or party.finished_at is not None:
+                raise ValueError("La partie a déjà commencé")
+            role = party.free_role()
+            if role is None:
+                raise ValueError("La partie est complète")
+            game = party.game
+            free = [cell for cell, value in enumerate(game.cells) if value == EMPTY]
+            cell = game.rng.choice(free)
+            id_player = next(self._player_ids)
+            game.place_player(id_player, divmod(cell, game.cols), role)
+            party.players[id_player] = (player, role)
+            party.version += 1
+            events = [{"event": EVENT_PLAYER_JOINED, "id_party": id_party, "id_player": id_player,
+                       "player": player, "role": role}]
+            if party.is_full():
+                self._mark_started(party)
+                events.append(self._round_start_event(party))
+            else:
+                self.listing.update(party)
+            self._publish(party, events)
+        return {"role": role, "id_player": id_player}
+
+    def _player(self, party, id_player):
+        if id_player not in party.players:
+            raise ValueError(f"Joueur {id_player} inconnu dans la partie {party.id_party}")
+        return party.players[id_player]
+
+    def move(self, id_party, id_player, move_vector):
+        """
+        Enregistre le déplacement d'un joueur pour le tour en cours. Le tour est résolu
+        (Game.resolve_round) dès que tous les joueurs encore en jeu ont joué.
+
+        :return: {"round_in_progress": tour, "move": {"next_position": {"row", "col"}}},
+                 next_position étant la destination demandée si le tour est en attente.
+        :raises ValueError: si la partie n'a pas commencé ou si le déplacement est invalide.
+        """
+        party = self.get_party(id_party)
+        with party.lock:
+            return self._move(party, id_player, move_vector)
+
+    def move_many(self, id_party, moves):
+        """
+        Enregistre plusieurs déplacements d'une même partie sous une seule prise de son
+        verrou, dans l'ordre donné ; un déplacement refusé n'empêche pas les suivants.
+
+        :param moves: liste de (id_player, vecteur de déplacement).
+        :return: pour chaque déplacement, le résultat de move ou l'exception ValueError levée.
+        :raises ValueError: si la partie n'existe pas.
+        """
+        party = self.get_party(id_party)
+        results = []
+        with party.lock:
+            for id_player, move_vector in moves:
+                try:
+                    results.append(self._move(party, id_player, move_vector))
+                except ValueError as e:
+                    results.append(e)
+        return results
+
+    def _move(self, party, id_player, move_vector):
+        """Corps de move, appelé sous party.lock."""
+        self._player(party, id_player)
+        game = party.game
+        if not party.started:
+            raise ValueError("La partie n'a pas encore commencé")
+        if game.game_over:
+            raise ValueError("La partie est terminée")
+        position = game.find_player(id_player)
+        if position is None:
+            raise ValueError("Le joueur a été éliminé")
+        row, col = game.is_valid_move(position, move_vector)
+        party.pending[id_player] = move_vector
+        if len(party.pending) >= len(game.positions):
+            results = game.resolve_round(party.pending)
+            party.pending = {}
+            party.version += 1
+            code, new_position = results[id_player]
+            if new_position is not None:
+                row, col = new_position
+            if game.game_over:
+                self._mark_finished(party)
+            self._publish_round(party, results)
+        return {"round_in_progress": game.turn, "move": {"next_position": {"row": row, "col": col}}}
+
+    # --- Événements (appelés sous party.lock) ---
+
+    def _publish(self, party, events):
+        """Publie les événements d'un changement de version, aux abonnés TCP puis dans l'historique."""
+        id_party = party.id_party
+        for event in events:
+            self.events.publish(id_party, event)
+        finished = party.game.game_over
+        self.changes.record(id_party, party.version, events, finished)
+        if finished:
+            self.events.drop_party(id_party)
+
+    @staticmethod
+    def _round_start_event(party):
+        return {"event": EVENT_ROUND_START, "id_party": party.id_party, "round_in_progress": party.game.turn}
+
+    def _publish_round(self, party, results):
+        """Publie le tour qui vient d'être résolu, puis le début du suivant ou la fin de partie."""
+        game = party.game
+        moves = {}
+        for id_player, (code, position) in results.items():
+            moves[id_player] = {"code": code, "next_position":
+                                None if position is None else {"row": position[0], "col": position[1]}}
+        events = [{"event": EVENT_MOVE_RESOLVED, "id_party": party.id_party, "round": game.turn - 1,
+                   "moves": moves}]
+        if game.game_over:
+            alive = {id_player: party.players[id_player][1] for id_player in game.positions}
+            events.append({"event": EVENT_GAME_OVER, "id_party": party.id_party, "round": game.turn,
+                           "alive": alive})
+        else:
+            events.append(self._round_start_event(party))
+        self._publish(party, events)
+
+    def party_version(self, id_party):
+        """
+        Version courante de la partie (lecture sans verrou), pour les requêtes conditionnelles.
+
+        :raises ValueError: si la partie n'existe pas.
+        """
+        return self.get_party(id_party).version
+
+    def party_state(self, id_party):
+        """
+        État complet d'une partie : plateau (une chaîne par ligne, une valeur de case
+        par caractère), tour, fin de partie et joueurs, avec la version correspondante.
+
+        :raises ValueError: si la partie n'existe pas.
+        """
+        party = self.get_party(id_party)
+        with party.lock:
+            game = party.game
+            cells = bytes(game.cells)
+            cols = game.cols
+            players = {}
+            for id_player, (player, role) in party.players.items():
+                position = game.find_player(id_player)
+                players[id_player] = {"player": player, "role": role, "position":
+                                      None if position is None else {"row": position[0], "col": position[1]}}
+            return {
+                "id_party": id_party,
+                "title": party.title,
+                "version": party.version,
+                "started": party.started,
+                "game_over": game.game_over,
+                "round_in_progress": game.turn,
+                "max_rounds": game.max_turns,
+                "board": ["".join(map(str, cells[r * cols:(r + 1) * cols])) for r in range(game.rows)],
+                "players": players,
+            }
+
+    def party_status(self, id_party, id_player):
+        """État du tour pour un joueur, au format de l'action party_status."""
+        party = self.get_party(id_party)
+        with party.lock:
+            _, role = self._player(party, id_player)
+            game = party.game
+            position = game.find_player(id_player)
+            status = {
+                "id_party": id_party,
+                "id_player": id_player,
+                "role": role,
+                "started": party.started,
+                "finished": game.game_over,
+                "alive": position is not None,
+                "round_in_progress": game.turn,
+                "move": {"next_position": None},
+            }
+            if position is not None:
+                status["move"]["next_position"] = {"row": position[0], "col": position[1]}
+            return status
+
+    def gameboard_status(self, id_party, id_player, radius=1):
+        """
+        Cases visibles par un joueur : le carré de côté 2 * radius + 1 centré sur lui,
+        ligne par ligne, une case par caractère ; les cases hors plateau sont vues comme
+        des obstacles.
+
+        :return: {"visible_cells": "1" pour une case occupée, "0" pour une case vide
+                  (format historique, "010010000"), "cells": valeur de chaque case
+                  (game_engine : EMPTY, VILLAGER, WOLF, OBSTACLE)}.
+        """
+        party = self.get_party(id_party)
+        with party.lock:
+            self._player(party, id_player)
+            game = party.game
+            position = game.find_player(id_player)
+            if position is None:
+                raise ValueError("Le joueur a été éliminé")
+            row, col = position
+            rows, cols, cells = game.rows, game.cols, game.cells
+            outside = str(OBSTACLE)
+            visible = []
+            contents = []
+            for r in range(row - radius, row + radius + 1):
+                for c in range(col - radius, col + radius + 1):
+                    if 0 <= r < rows and 0 <= c < cols:
+                        value = cells[r * cols + c]
+                        visible.append("0" if value == EMPTY else "1")
+                        contents.append(str(value))
+                    else:
+                        visible.append("1")
+                        contents.append(outside)
+            return {"visible_cells": "".join(visible), "cells": "".join(contents)}
+
+
+def _is_integer(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _integer(value, name, minimum, maximum=None):
+    """
+    :raises ValueError: si value n'est pas un entier (JSON) compris entre minimum et maximum.
+    """
+    if not _is_integer(value):
+        raise ValueError(f"Le paramètre '{name}' doit être un entier.")
+    if value < minimum or (maximum is not None and value > maximum):
+        bounds = f"compris entre {minimum} et {maximum}" if maximum is not None else f"au moins égal à {minimum}"
+        raise ValueError(f"Le paramètre '{name}' doit être {bounds}.")
+    return value
+
+
+_default_manager = None
+_default_manager_lock = threading.Lock()
+
+
+def get_manager():
+    """Retourne le GameManager partagé par les serveurs TCP et HTTP du processus."""
+    global _default_manager
+    if _default_manager is None:
+        with _default_manager_lock:
+            if _default_manager is None:
+                _default_manager = GameManager()
+    return _default_manager
@@ -0,0 +1,165 @@
+"""
+Limites des serveurs TCP : nombre de connexions, délais d'inactivité et de lecture,
+débit de requêtes par connexion et de déplacements par joueur (seaux à jetons).
+
+Une requête au-delà d'une limite reçoit immédiatement une réponse KO au lieu d'être
+mise en attente ; chaque refus est compté, les compteurs sont exposés par l'action
+"stats" pour dimensionner les limites.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+# Actions soumises à la limite par joueur
+PLAYER_LIMITED_ACTIONS = frozenset(("move",))
+# Seaux par joueur conservés (les moins récemment utilisés sont oubliés au-delà)
+MAX_PLAYER_BUCKETS = 100000
+
+
+class TokenBucket:
+    """Seau à jetons : rate jetons par seconde, au plus capacity jetons accumulés."""
+    __slots__ = ("rate", "capacity", "tokens", "stamp")
+
+    def __init__(self, rate, capacity, now=None):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.stamp = time.monotonic() if now is None else now
+
+    def consume(self, now, amount=1):
+        """Retire amount jetons si possible ; retourne False (sans rien retirer) sinon."""
+        tokens = self.tokens + (now - self.stamp) * self.rate
+        if tokens > self.capacity:
+            tokens = self.capacity
+        self.stamp = now
+        if tokens < amount:
+            self.tokens = tokens
+            return False
+        self.tokens = tokens - amount
+        return True
+
+
+class Limits:
+    """Limites d'un serveur TCP ; None désactive la limite correspondante."""
+    __slots__ = ("max_connections", "idle_timeout", "read_timeout", "connection_rate",
+                 "connection_burst", "player_rate", "player_burst")
+
+    def __init__(self, max_connections=4096, idle_timeout=600.0, read_timeout=30.0,
+                 connection_rate=200.0, connection_burst=400, player_rate=20.0, player_burst=40):
+        """
+        :param max_connections: connexions simultanées acceptées.
+        :param idle_timeout: secondes sans requête avant fermeture de la connexion ; une
+                             connexion qui suit des parties (watch) n'est jamais inactive.
+        :param read_timeout: secondes pour recevoir la fin d'un message commencé.
+        :param connection_rate: requêtes par seconde et par connexion (burst : rafale tolérée).
+        :param player_rate: déplacements par seconde et par joueur (player_burst : rafale tolérée).
+        """
+        self.max_connections = max_connections
+        self.idle_timeout = idle_timeout
+        self.read_timeout = read_timeout
+        self.connection_rate = connection_rate
+        self.connection_burst = connection_burst
+        self.player_rate = player_rate
+        self.player_burst = player_burst
+
+    @classmethod
+    def unlimited(cls):
+        return cls(None, None, None, None, None, None, None)
+
+
+class Governor:
+    """Applique les Limits d'un serveur et tient ses compteurs (thread-safe)."""
+
+    def __init__(self, limits=None):
+        self.limits = limits if limits is not None else Limits()
+        self._lock = threading.Lock()
+        self._player_buckets = OrderedDict()  # (id_party, id_player) -> TokenBucket
+        self.counters = {
+            "connections_open": 0,
+            "connections_total": 0,
+            "connections_refused": 0,
+            "idle_timeouts": 0,
+            "read_timeouts": 0,
+            "requests": 0,
+            "rate_limited_connection": 0,
+            "rate_limited_player": 0,
+            "pipeline_refused": 0,
+        }
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+
+    # --- Connexions ---
+
+    def open_connection(self):
+        """Réserve une place de connexion ; retourne False si le maximum est atteint."""
+        limit = self.limits.max_connections
+        with self._lock:
+            if limit is not None and self.counters["connections_open"] >= limit:
+                self.counters["connections_refused"] += 1
+                return False
+            self.counters["connections_open"] += 1
+            self.counters["connections_total"] += 1
+            return True
+
+    def close_connection(self):
+        with self._lock:
+            self.counters["connections_open"] -= 1
+
+    def connection_bucket(self):
+        """Seau de la connexion, à conserver dans son état ; None si le débit n'est pas limité."""
+        limits = self.limits
+        if limits.connection_rate is None:
+            return None
+        return TokenBucket(limits.connection_rate, limits.connection_burst)
+
+    def timeout_for(self, partial, watching=False):
+        """
+        Délai de lecture applicable : read_timeout si un message est commencé, sinon
+        idle_timeout, sauf pour une connexion qui suit des parties (elle reçoit des
+        notifications sans avoir de requête à envoyer).
+        """
+        if partial:
+            return self.limits.read_timeout
+        return None if watching else self.limits.idle_timeout
+
+    # --- Requêtes ---
+
+    def allow_request(self, action, params, bucket):
+        """
+        Décompte une requête ; retourne le message du refus si elle dépasse une limite,
+        None si elle est acceptée.
+
+        :param bucket: seau de la connexion (None : pas de limite par connexion).
+        """
+        now = time.monotonic()
+        with self._lock:
+            counters = self.counters
+            counters["requests"] += 1
+            if bucket is not None and not bucket.consume(now):
+                counters["rate_limited_connection"] += 1
+                return "Limite de requêtes de la connexion dépassée"
+            if action in PLAYER_LIMITED_ACTIONS and self.limits.player_rate is not None:
+                # Identifiants normalisés : "3" et 3 désignent le même joueur
+                key = (str(params.get("id_party")), str(params.get("id_player")))
+                player_bucket = self._player_buckets.get(key)
+                if player_bucket is None:
+                    player_bucket = TokenBucket(self.limits.player_rate, self.limits.player_burst, now)
+                    self._player_buckets[key] = player_bucket
+                    if len(self._player_buckets) > MAX_PLAYER_BUCKETS:
+                        self._player_buckets.popitem(last=False)
+                else:
+                    self._player_buckets.move_to_end(key)
+                if not player_bucket.consume(now):
+                    counters["rate_limited_player"] += 1
+                    return "Limite de déplacements du joueur dépassée"
+        return None
+
+    def stats(self):
+        """Compteurs et limites courants."""
+        with self._lock:
+            counters = dict(self.counters)
+            counters["player_buckets"] = len(self._player_buckets)
+        limits = {name: getattr(self.limits, name) for name in Limits.__slots__}
+        return {"counters": counters, "limits": limits}
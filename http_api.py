@@ -0,0 +1,225 @@
+"""
+Traitement des requêtes du serveur HTTP, indépendant du framework : server_http (Flask,
+WSGI) et server_asgi (ASGI) n'en sont que des adaptateurs et répondent à l'identique,
+à une exception près : sous Flask, chaque /wait ou /events en attente occupe un thread,
+leur nombre y est donc borné (server_http.MAX_WAITERS, 503 au-delà) ; server_asgi les
+attend sans thread ni CPU et convient seul à de nombreux abonnés.
+
+Chaque fonction reçoit le GameManager et les données de la requête déjà décodées, et
+retourne le contenu de la réponse ; une requête invalide lève ValueError (réponse 400
+{"status": "KO", "error": message} dans les deux serveurs).
+"""
+import logging
+import os
+
+import json_codec
+from party_listing import QUERY_PARAMETERS
+
+# Déplacements acceptés par requête /moves/batch
+MAX_BATCH_MOVES = 10000
+# Durée maximale d'attente de /wait ; intervalle des commentaires de maintien du flux /events
+MAX_WAIT = 60.0
+SSE_KEEPALIVE = 15.0
+
+WELCOME = {"message": "Bienvenue sur le serveur HTTP du jeu Les Loups 🐺"}
+
+# Préfixe des ETag propre à ce processus : après un redémarrage, les identifiants et
+# versions de parties repartent de zéro et ne doivent pas valider d'anciens ETag
+_ETAG_PREFIX = os.urandom(4).hex()
+
+
+def party_etag(id_party, version):
+    return f"{_ETAG_PREFIX}-{id_party}-{version}"
+
+
+def start_party(manager, data):
+    """/start : crée une partie à partir de {"name", "rows", "cols", "nb_obstacles", "nb_rounds", "roles_quotas"}."""
+    if not isinstance(data, dict):
+        raise ValueError("Un objet JSON est attendu.")
+    game_name = data.get("name")
+    if not game_name:
+        raise ValueError("Le nom de la partie est requis.")
+    logging.info(f"Démarrage d'une partie : {game_name}")
+    id_party = manager.create_party(
+        game_name,
+        rows=data.get("rows"),
+        cols=data.get("cols"),
+        num_obstacles=data.get("nb_obstacles"),
+        max_turns=data.get("nb_rounds"),
+        roles_quotas=data.get("roles_quotas"),
+    )
+    return {"status": "OK", "admin_response": f"Partie '{game_name}' créée avec succès.",
+            "id_party": id_party}
+
+
+def parse_move(data):
+    """
+    Valide un déplacement {"player_id", "game_id", "move"} ("move" : chaîne de 2 chiffres).
+
+    :return: (game_id, player_id, (row, col)).
+    :raises ValueError: si un champ manque ou est mal formé.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Un déplacement doit être un objet JSON.")
+    for field in ("player_id", "game_id", "move"):
+        if field not in data:
+            raise ValueError(f"Le champ '{field}' est requis.")
+    player_id = int(data.get("player_id"))
+    game_id = int(data.get("game_id"))
+    move_str = data.get("move")
+    if not (isinstance(move_str, str) and len(move_str) == 2):
+        raise ValueError("Le paramètre move doit être une chaîne de 2 caractères.")
+    return game_id, player_id, (int(move_str[0]), int(move_str[1]))
+
+
+def move(manager, data):
+    """/move : un déplacement."""
+    game_id, player_id, (row, col) = parse_move(data)
+    logging.debug(f"Demande de déplacement: player_id={player_id}, game_id={game_id}, move={data['move']}")
+    result = manager.move(game_id, player_id, (row, col))
+    return {"status": "OK", "move": {"row": row, "col": col}, "result": result}
+
+
+def moves_batch(manager, data):
+    """
+    /moves/batch : une liste (ou {"moves": liste}) de déplacements au format de /move,
+    éventuellement de plusieurs parties. Les déplacements sont regroupés par partie et
+    chaque groupe est appliqué sous une seule prise du verrou de la partie, dans l'ordre
+    du lot ; le résultat de chaque déplacement est rendu dans l'ordre, au format de /move.
+    """
+    moves = data.get("moves") if isinstance(data, dict) else data
+    if not isinstance(moves, list):
+        raise ValueError("Une liste de déplacements est requise.")
+    if len(moves) > MAX_BATCH_MOVES:
+        raise ValueError(f"Au plus {MAX_BATCH_MOVES} déplacements par lot.")
+    results = [None] * len(moves)
+    groups = {}  # game_id -> [(indice dans le lot, player_id, (row, col))]
+    for index, item in enumerate(moves):
+        try:
+            game_id, player_id, vector = parse_move(item)
+        except (ValueError, TypeError) as e:
+            results[index] = {"status": "KO", "error": str(e)}
+            continue
+        groups.setdefault(game_id, []).append((index, player_id, vector))
+    for game_id, group in groups.items():
+        try:
+            outcomes = manager.move_many(game_id, [(player_id, vector) for _, player_id, vector in group])
+        except ValueError as e:  # Partie inconnue : tout le groupe est refusé
+            outcomes = [e] * len(group)
+        for (index, _, (row, col)), outcome in zip(group, outcomes):
+            if isinstance(outcome, ValueError):
+                results[index] = {"status": "KO", "error": str(outcome)}
+            else:
+                results[index] = {"status": "OK", "move": {"row": row, "col": col}, "result": outcome}
+    logging.debug(f"Lot de {len(moves)} déplacements sur {len(groups)} parties")
+    return {"status": "OK", "results": results}
+
+
+def server_status(manager):
+    """/status : nombre de parties hébergées, ouvertes et en cours."""
+    return {"status": "OK",
+            "response": {"parties": {"hosted": len(manager),
+                                     "open": len(manager.listing),
+                                     "started": len(manager.list_started())}}}
+
+
+def etag_matches(if_none_match, etag):
+    """
+    Comparaison faible (RFC 9110) de l'en-tête If-None-Match avec etag : "*", "etag"
+    ou W/"etag" dans la liste désignent la version courante.
+    """
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == f'"{etag}"':
+            return True
+    return False
+
+
+def party_status(manager, id_party, if_none_match=None):
+    """
+    /status/<id_party> : état de la partie et son ETag.
+
+    :param if_none_match: valeur de l'en-tête If-None-Match de la requête (ou None).
+    :return: (etag, corps JSON en bytes, ou None pour une réponse 304).
+    :raises ValueError: si la partie n'existe pas.
+    """
+    etag = party_etag(id_party, manager.party_version(id_party))
+    if etag_matches(if_none_match, etag):
+        # Ni verrou ni sérialisation : seule la version a été lue
+        return etag, None
+    state = manager.party_state(id_party)
+    # Version lue avec l'état : l'ETag correspond toujours au contenu envoyé
+    return party_etag(id_party, state["version"]), json_codec.dumps({"status": "OK", "response": state})
+
+
+def list_open(manager, args):
+    """
+    /list : parties ouvertes non commencées, par ordre de création. Paramètres facultatifs :
+    offset et limit (page), min_free (places libres minimum), rows et cols (taille du plateau).
+
+    :return: corps JSON (bytes), assemblé autour de la réponse déjà sérialisée par la liste.
+    """
+    _, encoded = manager.listing.query(**{name: args[name] for name in QUERY_PARAMETERS if name in args})
+    return b'{"status":"OK","response":' + encoded + b"}"
+
+
+def subscribe(manager, data):
+    """/subscribe : inscrit {"player"} dans la partie {"id_party"}."""
+    if not isinstance(data, dict):
+        raise ValueError("Un objet JSON est attendu.")
+    for field in ("player", "id_party"):
+        if field not in data:
+            raise ValueError(f"Le champ '{field}' est requis.")
+    player = data.get("player")
+    id_party = data.get("id_party")
+    logging.info(f"Demande d'inscription: {player} dans la partie {id_party}")
+    return {"status": "OK", "response": manager.subscribe(int(id_party), player)}
+
+
+def wait_parameters(args):
+    """
+    Paramètres de /wait : id_party, since (0 par défaut), timeout en secondes (30 par défaut).
+
+    :return: (id_party, since, timeout).
+    :raises ValueError: si id_party manque ou si un paramètre n'est pas un nombre.
+    """
+    if "id_party" not in args:
+        raise ValueError("Le paramètre 'id_party' est requis.")
+    return (int(args["id_party"]), int(args.get("since", 0)),
+            min(float(args.get("timeout", 30)), MAX_WAIT))
+
+
+def changes_body(manager, id_party, version, changes, finished):
+    """
+    Corps de réponse de /wait : les changements déjà sérialisés sont concaténés tels
+    quels ; si l'historique ne suffit plus (changes None), l'état complet les remplace.
+    """
+    if changes is None:
+        return json_codec.dumps({"status": "OK", "response": {
+            "version": version, "finished": finished, "changes": None, "state": manager.party_state(id_party)}})
+    return b"".join((b'{"status":"OK","response":{"version":', str(version).encode(),
+                     b',"finished":', b"true" if finished else b"false",
+                     b',"changes":[', b",".join(change.encoded() for change in changes), b"]}}"))
+
+
+def sse_messages(manager, id_party, changes):
+    """
+    Messages Server-Sent Events d'une reprise : un message "change" par version (champ
+    id = version, pour la reprise automatique via Last-Event-ID), ou un message "state"
+    complet si le client est trop en retard (changes None).
+
+    :return: (messages en bytes, dernière version envoyée ou None).
+    """
+    if changes is None:
+        state = manager.party_state(id_party)
+        return (b"".join((b"id: ", str(state["version"]).encode(), b"\nevent: state\ndata: ",
+                          json_codec.dumps(state), b"\n\n")), state["version"])
+    if not changes:
+        return b"", None
+    return (b"".join(b"".join((b"id: ", str(change.version).encode(), b"\nevent: change\ndata: ",
+                               change.encoded(), b"\n\n")) for change in changes), changes[-1].version)
+
+
+SSE_KEEPALIVE_MESSAGE = b": keepalive\n\n"  # Commentaire SSE : détecte les clients partis
@@ -0,0 +1,41 @@
+"""
+Sérialisation JSON du protocole TCP : orjson s'il est installé (nettement plus rapide),
+sinon le module json de la bibliothèque standard. Les deux produisent et lisent des bytes
+UTF-8 ; orjson écrit un JSON compact (sans espaces), accepté par tous les clients.
+"""
+import json
+
+try:
+    import orjson
+except ImportError:  # Dépendance optionnelle
+    orjson = None
+
+# Erreur de décodage commune aux deux implémentations (orjson.JSONDecodeError en hérite)
+JSONDecodeError = json.JSONDecodeError
+
+if orjson is not None:
+    BACKEND = "orjson"
+    # Clés non textuelles (identifiants de joueurs des notifications) converties en chaînes
+    _OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj):
+        """Sérialise obj en bytes UTF-8."""
+        return orjson.dumps(obj, option=_OPTIONS)
+
+    def dumps_line(obj):
+        """Sérialise obj en une ligne du protocole texte (terminée par "\\n")."""
+        return orjson.dumps(obj, option=_OPTIONS | orjson.OPT_APPEND_NEWLINE)
+
+    loads = orjson.loads
+else:
+    BACKEND = "json"
+
+    def dumps(obj):
+        """Sérialise obj en bytes UTF-8."""
+        return json.dumps(obj).encode("utf-8")
+
+    def dumps_line(obj):
+        """Sérialise obj en une ligne du protocole texte (terminée par "\\n")."""
+        return (json.dumps(obj) + "\n").encode("utf-8")
+
+    loads = json.loads
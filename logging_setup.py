@@ -0,0 +1,66 @@
+"""
+Journalisation des serveurs sans écriture synchrone sur la console.
+
+setup_logging() remplace les handlers du logger racine par un QueueHandler : le thread
+qui journalise ne fait que déposer l'enregistrement dans une file, un QueueListener
+(thread dédié) se charge de l'écriture. Les messages par requête sont au niveau DEBUG ;
+au niveau par défaut (INFO) ils ne sont même pas formatés.
+
+Le niveau se choisit à l'appel, par la variable d'environnement WOLF_LOG_LEVEL, ou à
+chaud avec set_level().
+"""
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+
+LOG_FORMAT = "[%(asctime)s] %(levelname)s: %(message)s"
+
+_listener = None
+_listener_pid = None  # Un processus issu d'un fork n'hérite pas du thread du listener
+
+
+def setup_logging(level=None, stream=None):
+    """
+    Installe la journalisation par file d'attente (idempotent).
+
+    :param level: niveau ("DEBUG", "INFO"... ou entier) ; par défaut WOLF_LOG_LEVEL, sinon INFO.
+    :param stream: flux de sortie du listener (sys.stdout par défaut).
+    """
+    global _listener, _listener_pid
+    root = logging.getLogger()
+    if _listener is None or _listener_pid != os.getpid():
+        log_queue = queue.SimpleQueue()
+        handler = logging.StreamHandler(stream if stream is not None else sys.stdout)
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        _listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+        _listener.start()
+        _listener_pid = os.getpid()
+        atexit.register(stop_logging)
+        for old in list(root.handlers):
+            root.removeHandler(old)
+        root.addHandler(logging.handlers.QueueHandler(log_queue))
+    set_level(level if level is not None else os.environ.get("WOLF_LOG_LEVEL", "INFO"))
+
+
+def set_level(level):
+    """
+    Change le niveau de journalisation de tous les loggers du processus.
+
+    :raises ValueError: si le niveau est inconnu.
+    """
+    if isinstance(level, str):
+        level = level.upper()
+        if not isinstance(logging.getLevelName(level), int):
+            raise ValueError(f"Niveau de journalisation inconnu : {level}")
+    logging.getLogger().setLevel(level)
+
+
+def stop_logging():
+    """Vide la file et arrête le listener (appelé automatiquement à la sortie)."""
+    global _listener
+    if _listener is not None and _listener_pid == os.getpid():
+        _listener.stop()
+        _listener = None
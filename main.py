@@ -1,8 +1,13 @@
 import tkinter as tk
 from tkinter import messagebox
-from game_engine import Game, EMPTY, VILLAGER, WOLF, OBSTACLE
+from game_engine import Game, EMPTY, VILLAGER, WOLF, OBSTACLE, MOVE_COLLISION
+from npc import NPCPolicy
 import sys
 
+# Identifiants des pièces dans l'index du plateau
+PLAYER_ID = "player"
+NPC_ID = "npc"
+
 class GameGUI:
     def __init__(self, master, game, cell_size=80):
         self.master = master
@@ -61,15 +66,31 @@ class GameGUI:
             return "gray"
     
     def move_player(self):
-        """Tente le déplacement du joueur en utilisant le vecteur saisi."""
+        """
+        Joue un tour : déplacement du joueur avec le vecteur saisi, puis réponse du NPC,
+        résolus simultanément.
+        """
         move_vector = self.move_entry.get().strip()
+        moves = {}
         try:
-            new_pos = self.game.move_player(self.player_position, move_vector, self.player_role)
-            self.player_position = new_pos
-            self.message_label.config(text=f"Déplacement réussi vers {new_pos}")
+            self.game.is_valid_move(self.player_position, move_vector)
+            moves[PLAYER_ID] = move_vector
         except Exception as e:
             messagebox.showerror("Erreur de déplacement", str(e))
             self.message_label.config(text="Déplacement invalide, tour perdu.")
+        npc_position = self.game.find_player(NPC_ID)
+        if npc_position is not None:
+            moves[NPC_ID] = self.npc_policy.choose_move(self.game, npc_position, self.player_position)
+        results = self.game.resolve_round(moves)
+        if PLAYER_ID in moves:
+            code, new_pos = results[PLAYER_ID]
+            if new_pos is not None and code <= MOVE_COLLISION:
+                self.message_label.config(text=f"Déplacement réussi vers {new_pos}")
+            else:
+                self.message_label.config(text="Déplacement impossible, tour perdu.")
+        player_position = self.game.find_player(PLAYER_ID)
+        if player_position is not None:
+            self.player_position = player_position
         self.draw_board()
         if self.game.game_over:
             self.move_button.config(state="disabled")
@@ -79,8 +100,11 @@ class GameGUI:
         """Configure les positions initiales et le rôle du joueur dans l'interface."""
         self.player_position = player_pos
         self.player_role = player_role
-        # Mise à jour du plateau pour positionner le joueur
-        self.game.board[player_pos[0]][player_pos[1]] = VILLAGER if player_role == "villager" else WOLF
+        # Le NPC poursuit le joueur s'il est loup, le fuit s'il est villageois
+        self.npc_policy = NPCPolicy("villager" if player_role == "wolf" else "wolf")
+        # Mise à jour du plateau pour positionner le joueur (s'il n'est pas déjà placé)
+        if self.game.find_player(PLAYER_ID) is None:
+            self.game.place_player(PLAYER_ID, player_pos, player_role)
         self.draw_board()
 
 def main():
@@ -103,15 +127,18 @@ def main():
         print("Nombre de tours invalide.")
         sys.exit(1)
     
-    # Initialiser la partie avec un plateau de 5x5, 3 obstacles, et le nombre maximum de tours choisi
-    game = Game(rows=5, cols=5, num_obstacles=3, max_turns=max_turns)
+    # Initialiser la partie avec un plateau de 5x5 et le nombre maximum de tours choisi
+    game = Game(rows=5, cols=5, num_obstacles=0, max_turns=max_turns)
     
     # Positions initiales
     player_pos = (0, 0)
     npc_pos = (game.rows - 1, game.cols - 1)
     
-    # Mise à jour du plateau pour le NPC (le NPC reste statique)
-    game.board[npc_pos[0]][npc_pos[1]] = VILLAGER if npc_role == "villager" else WOLF
+    # Mise à jour du plateau pour le joueur et le NPC (déplacé par npc.NPCPolicy à chaque tour)
+    game.place_player(PLAYER_ID, player_pos, player_role)
+    game.place_player(NPC_ID, npc_pos, npc_role)
+    # 3 obstacles, sans jamais isoler le joueur du NPC
+    game.place_obstacles(3, connected=True)
     
     print("Plateau initial:")
     game.display_board()
@@ -0,0 +1,119 @@
+import threading
+from array import array
+from collections import OrderedDict, deque
+
+from game_engine import DIRECTIONS, VILLAGER, WOLF
+
+# Distance d'une case qui ne peut pas atteindre la cible
+UNREACHABLE = 0xFFFF
+
+
+class DistanceFieldCache:
+    """
+    Cache LRU de champs de distances (BFS), partagé entre parties.
+    Les champs sont regroupés par disposition d'obstacles (Game.layout_key) :
+    deux parties de même disposition réutilisent les mêmes champs.
+    """
+    def __init__(self, max_layouts=256):
+        self.max_layouts = max_layouts
+        self._layouts = OrderedDict()  # clé de disposition -> {case cible: distances}
+        self._lock = threading.Lock()
+
+    def field(self, game, target_cell):
+        """
+        Retourne le tableau des distances (en déplacements unitaires) de chaque case
+        vers target_cell, calculé une seule fois par disposition et par cible.
+        """
+        key = game.layout_key()
+        with self._lock:
+            fields = self._layouts.get(key)
+            if fields is None:
+                fields = self._layouts[key] = {}
+                if len(self._layouts) > self.max_layouts:
+                    self._layouts.popitem(last=False)
+            else:
+                self._layouts.move_to_end(key)
+            distances = fields.get(target_cell)
+        if distances is None:
+            distances = self._bfs(game, target_cell)
+            with self._lock:
+                distances = fields.setdefault(target_cell, distances)
+        return distances
+
+    @staticmethod
+    def _bfs(game, target_cell):
+        """
+        Parcours en largeur depuis target_cell. Les déplacements étant symétriques,
+        la distance de la cible à une case est aussi celle de la case à la cible.
+        """
+        distances = array("H", [UNREACHABLE]) * (game.rows * game.cols)
+        distances[target_cell] = 0
+        queue = deque([target_cell])
+        table = game.moves_table()
+        while queue:
+            cell = queue.popleft()
+            next_distance = distances[cell] + 1
+            start = cell * 4
+            for new_cell in table[start:start + 4]:
+                if new_cell >= 0 and distances[new_cell] == UNREACHABLE:
+                    distances[new_cell] = next_distance
+                    queue.append(new_cell)
+        return distances
+
+    def __len__(self):
+        return len(self._layouts)
+
+
+# Cache partagé par défaut entre toutes les politiques
+default_cache = DistanceFieldCache()
+
+
+class NPCPolicy:
+    def __init__(self, npc_role, mode=None, cache=None):
+        """
+        Politique de déplacement d'un NPC : poursuite (plus court chemin vers la cible)
+        ou fuite (case voisine la plus éloignée de la cible).
+
+        :param npc_role: "villager" ou "wolf".
+        :param mode: "pursue" ou "evade" ; par défaut le loup poursuit, le villageois fuit.
+        :param cache: DistanceFieldCache à utiliser (par défaut le cache partagé).
+        """
+        if mode is None:
+            mode = "pursue" if npc_role == "wolf" else "evade"
+        if mode not in ("pursue", "evade"):
+            raise ValueError("Le mode doit être 'pursue' ou 'evade'")
+        self.npc_role = npc_role
+        self.mode = mode
+        self.cache = cache if cache is not None else default_cache
+
+    def choose_move(self, game, npc_position, target_positions):
+        """
+        Choisit le déplacement du NPC vers (ou à l'opposé de) la cible la plus proche.
+        Une fois les champs de distances en cache, le choix coûte quatre lectures
+        par cible.
+
+        :param game: partie en cours (game_engine.Game).
+        :param npc_position: tuple (row, col) du NPC.
+        :param target_positions: position (row, col) de la cible, ou liste de positions.
+        :return: vecteur (dr, dc) ; (0, 0) si le NPC a intérêt à rester sur place.
+        """
+        if isinstance(target_positions, tuple):
+            target_positions = [target_positions]
+        cols = game.cols
+        fields = [self.cache.field(game, r * cols + c) for r, c in target_positions]
+        if not fields:
+            return (0, 0)
+        own_value = VILLAGER if self.npc_role == "villager" else WOLF
+        cells = game.cells
+        npc_cell = npc_position[0] * cols + npc_position[1]
+        best_move = (0, 0)
+        best_distance = min(field[npc_cell] for field in fields)
+        pursue = self.mode == "pursue"
+        for direction, new_cell in game.neighbours(npc_cell):
+            if cells[new_cell] == own_value:
+                continue
+            distance = min(field[new_cell] for field in fields)
+            if (distance < best_distance) if pursue else (distance > best_distance):
+                best_distance = distance
+                best_move = DIRECTIONS[direction]
+        return best_move
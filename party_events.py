@@ -0,0 +1,313 @@
+"""
+Notifications poussées aux clients qui suivent une partie (action "watch").
+
+Le GameManager publie chaque événement (inscription, début de tour, tour résolu, fin
+de partie) une seule fois dans l'EventHub : le message est sérialisé une fois, puis la
+même chaîne d'octets est déposée dans la file de chaque abonné. L'envoi sur le réseau
+est fait par le serveur, hors des verrous de partie.
+
+Les clients HTTP, qui ne gardent pas de connexion ouverte entre deux requêtes, lisent
+les mêmes événements dans un ChangeLog : les derniers changements de chaque partie,
+numérotés par la version de la partie, qu'on peut attendre et reprendre "depuis" une
+version connue.
+"""
+import threading
+from collections import deque
+
+import json_codec
+
+# Types d'événements
+EVENT_PLAYER_JOINED = "player_joined"
+EVENT_ROUND_START = "round_start"
+EVENT_MOVE_RESOLVED = "move_resolved"
+EVENT_GAME_OVER = "game_over"
+EVENT_OVERFLOW = "watch_overflow"
+
+# Événements en attente d'envoi par abonné ; au-delà, l'abonné est décroché
+DEFAULT_QUEUE_SIZE = 256
+# Changements conservés par partie dans le ChangeLog
+DEFAULT_HISTORY = 64
+
+
+def encode_event(event):
+    """Sérialise un événement au format du protocole TCP (JSON terminé par "\\n")."""
+    return json_codec.dumps_line(event)
+
+
+class Watcher:
+    """
+    File bornée des événements à envoyer à un client (une connexion). Un consommateur
+    trop lent ne bloque jamais la partie : quand la file est pleine, l'abonné est
+    décroché de toutes ses parties et reçoit un dernier événement "watch_overflow" ;
+    il peut se réabonner puis se resynchroniser avec party_status.
+    """
+    __slots__ = ("parties", "overflowed", "_queue", "_maxsize", "_condition", "_on_push", "_closed")
+
+    def __init__(self, maxsize=DEFAULT_QUEUE_SIZE, on_push=None):
+        """
+        :param maxsize: nombre maximum d'événements en attente.
+        :param on_push: fonction appelée (sans argument) après chaque dépôt, par le
+                        thread qui publie ; sert à réveiller une boucle asyncio.
+        """
+        self.parties = set()     # Parties suivies
+        self.overflowed = False
+        self._queue = deque()
+        self._maxsize = maxsize
+        self._condition = threading.Condition(threading.Lock())
+        self._on_push = on_push
+        self._closed = False
+
+    def push(self, data):
+        """Dépose un événement sérialisé ; retourne False si la file est pleine."""
+        with self._condition:
+            if self._closed:
+                return True
+            if len(self._queue) >= self._maxsize:
+                return False
+            self._queue.append(data)
+            self._condition.notify()
+        if self._on_push is not None:
+            self._on_push()
+        return True
+
+    def _overflow(self, data):
+        """Remplace le contenu de la file par le seul événement de débordement."""
+        with self._condition:
+            self.overflowed = True
+            self._queue.clear()
+            self._queue.append(data)
+            self._condition.notify()
+        if self._on_push is not None:
+            self._on_push()
+
+    def get(self, timeout=None):
+        """
+        Attend et retire tous les événements en attente.
+
+        :return: la liste des événements sérialisés, ou None si l'abonné est fermé
+                 (ou timeout écoulé).
+        """
+        with self._condition:
+            if not self._queue and not self._closed:
+                self._condition.wait(timeout)
+            return self._take()
+
+    def get_nowait(self):
+        """Comme get, sans attendre : None si la file est vide."""
+        with self._condition:
+            return self._take()
+
+    def _take(self):
+        if not self._queue:
+            return None
+        events = list(self._queue)
+        self._queue.clear()
+        return events
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        if self._on_push is not None:
+            self._on_push()
+
+    @property
+    def closed(self):
+        return self._closed
+
+
+class EventHub:
+    """Abonnés de chaque partie : id_party -> ensemble de Watcher."""
+
+    def __init__(self):
+        self._watchers = {}
+        self._lock = threading.Lock()
+
+    def watch(self, id_party, watcher):
+        with self._lock:
+            self._watchers.setdefault(id_party, set()).add(watcher)
+            watcher.parties.add(id_party)
+            watcher.overflowed = False
+
+    def unwatch(self, id_party, watcher):
+        with self._lock:
+            self._discard(id_party, watcher)
+
+    def unwatch_all(self, watcher):
+        """Retire l'abonné de toutes ses parties (fermeture de la connexion)."""
+        with self._lock:
+            for id_party in list(watcher.parties):
+                self._discard(id_party, watcher)
+
+    def _discard(self, id_party, watcher):
+        watchers = self._watchers.get(id_party)
+        if watchers is not None:
+            watchers.discard(watcher)
+            if not watchers:
+                del self._watchers[id_party]
+        watcher.parties.discard(id_party)
+
+    def drop_party(self, id_party):
+        """Retire tous les abonnés d'une partie (après son dernier événement)."""
+        with self._lock:
+            for watcher in list(self._watchers.get(id_party, ())):
+                self._discard(id_party, watcher)
+
+    def watcher_count(self, id_party):
+        watchers = self._watchers.get(id_party)
+        return len(watchers) if watchers else 0
+
+    def publish(self, id_party, event):
+        """
+        Publie un événement à tous les abonnés de la partie ; il n'est sérialisé
+        qu'une fois, et seulement si la partie a des abonnés.
+
+        :return: nombre d'abonnés ayant reçu l'événement.
+        """
+        watchers = self._watchers.get(id_party)
+        if not watchers:
+            return 0
+        data = encode_event(event)
+        with self._lock:
+            watchers = list(self._watchers.get(id_party, ()))
+        delivered = 0
+        for watcher in watchers:
+            if watcher.push(data):
+                delivered += 1
+            else:
+                self.unwatch_all(watcher)
+                watcher._overflow(encode_event({"event": EVENT_OVERFLOW, "id_party": id_party}))
+        return delivered
+
+
+class Change:
+    """Un changement de version d'une partie : les événements qui l'ont produit."""
+    __slots__ = ("version", "events", "_encoded")
+
+    def __init__(self, version, events):
+        self.version = version
+        self.events = events
+        self._encoded = None
+
+    def encoded(self):
+        """{"version", "events"} en JSON (bytes), sérialisé une seule fois pour tous les lecteurs."""
+        if self._encoded is None:
+            self._encoded = json_codec.dumps({"version": self.version, "events": self.events})
+        return self._encoded
+
+
+class _PartyLog:
+    __slots__ = ("version", "changes", "finished", "closed", "condition", "listeners")
+
+    def __init__(self, history):
+        self.version = 0
+        self.changes = deque(maxlen=history)  # Anneau : les plus anciens changements sont oubliés
+        self.finished = False
+        self.closed = False
+        self.condition = threading.Condition(threading.Lock())
+        self.listeners = set()
+
+
+class ChangeLog:
+    """
+    Derniers changements de chaque partie, et attente du suivant.
+
+    Chaque partie a sa propre condition : un changement ne réveille que les clients
+    qui attendent cette partie, et un client en attente ne consomme pas de CPU. Les
+    serveurs asynchrones s'inscrivent plutôt comme listener (une fonction appelée à
+    chaque changement) et n'occupent ainsi aucun thread pendant l'attente.
+    """
+
+    def __init__(self, history=DEFAULT_HISTORY):
+        self.history = history
+        self._logs = {}  # id_party -> _PartyLog
+        self._lock = threading.Lock()
+
+    def open(self, id_party):
+        with self._lock:
+            self._logs[id_party] = _PartyLog(self.history)
+
+    def discard(self, id_party):
+        """Oublie une partie (évincée) ; les clients en attente sont réveillés."""
+        with self._lock:
+            log = self._logs.pop(id_party, None)
+        if log is not None:
+            with log.condition:
+                log.closed = True
+                log.condition.notify_all()
+            self._notify(log)
+
+    def _log(self, id_party):
+        log = self._logs.get(id_party)
+        if log is None or log.closed:
+            raise ValueError(f"Partie inconnue : {id_party}")
+        return log
+
+    def record(self, id_party, version, events, finished=False):
+        """
+        Enregistre le changement menant la partie à version et réveille ses clients.
+
+        :param finished: True pour le dernier changement de la partie (fin de partie).
+        """
+        log = self._logs.get(id_party)
+        if log is None:
+            return
+        with log.condition:
+            log.changes.append(Change(version, events))
+            log.version = version
+            log.finished = finished
+            log.condition.notify_all()
+        self._notify(log)
+
+    @staticmethod
+    def _notify(log):
+        for listener in list(log.listeners):
+            listener()
+
+    def since(self, id_party, version):
+        """
+        Changements postérieurs à version.
+
+        :return: (version courante, changements, partie terminée) ; changements vaut
+                 None si l'historique ne remonte plus jusqu'à version : le client doit
+                 alors relire l'état complet.
+        :raises ValueError: si la partie n'existe pas.
+        """
+        log = self._log(id_party)
+        with log.condition:
+            return log.version, self._changes(log, version), log.finished
+
+    @staticmethod
+    def _changes(log, version):
+        if version == log.version:
+            return []
+        changes = log.changes
+        if version > log.version or not changes or changes[0].version > version + 1:
+            return None
+        return [change for change in changes if change.version > version]
+
+    def wait(self, id_party, version, timeout=None):
+        """
+        Comme since, après avoir attendu (au plus timeout secondes) un changement
+        postérieur à version. Retourne une liste vide si rien n'a changé entre-temps.
+
+        :raises ValueError: si la partie n'existe pas ou a été oubliée pendant l'attente.
+        """
+        log = self._log(id_party)
+        with log.condition:
+            log.condition.wait_for(lambda: log.version != version or log.finished or log.closed, timeout)
+        return self.since(id_party, version)
+
+    def add_listener(self, id_party, listener):
+        """
+        listener() sera appelé après chaque changement de la partie, par le thread qui
+        l'enregistre (sous le verrou de la partie : il doit seulement réveiller son client).
+
+        :raises ValueError: si la partie n'existe pas.
+        """
+        self._log(id_party).listeners.add(listener)
+
+    def remove_listener(self, id_party, listener):
+        log = self._logs.get(id_party)
+        if log is not None:
+            log.listeners.discard(listener)
@@ -0,0 +1,137 @@
+"""
+Liste des parties ouvertes non commencées, tenue à jour par le GameManager au fil des
+événements qui la modifient (création, inscription, démarrage) au lieu d'être recalculée
+à chaque requête "list".
+
+Les réponses sont mises en cache par requête (filtres et page), sous forme de dict et de
+JSON déjà sérialisé ; le cache est vidé à chaque modification de la liste, et seulement
+dans ce cas : les coups joués dans les parties en cours ne l'invalident jamais. Un filtre
+ne parcourt que les parties ouvertes (et, pour la taille du plateau, seulement celles de
+la bonne taille), jamais l'ensemble des parties hébergées.
+"""
+import threading
+
+import json_codec
+
+# Paramètres de query (filtres et page), tels que reçus des clients TCP et HTTP
+QUERY_PARAMETERS = ("offset", "limit", "min_free", "rows", "cols")
+# Parties par page au plus (limit)
+MAX_PAGE = 1000
+# Requêtes distinctes gardées en cache entre deux modifications
+MAX_CACHED_QUERIES = 256
+_FULL_LIST = (0, None, None, None, None)
+
+
+class OpenPartyListing:
+    """Index des parties ouvertes : résumé de chaque partie, par taille de plateau, et cache des réponses."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}  # id_party -> résumé de la partie
+        self._by_size = {}  # (rows, cols) -> ensemble des id_party ouvertes de cette taille
+        self._cache = {}    # (offset, limit, min_free, rows, cols) -> (contenu, contenu sérialisé)
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def summary(party):
+        players = len(party.players)
+        max_players = sum(party.roles_quotas.values())
+        return {"id_party": party.id_party, "title": party.title, "rows": party.game.rows,
+                "cols": party.game.cols, "players": players, "max_players": max_players,
+                "free_slots": max_players - players}
+
+    # --- Mises à jour (appelées par le GameManager) ---
+
+    def add(self, party):
+        """Nouvelle partie ouverte."""
+        entry = self.summary(party)
+        with self._lock:
+            self._entries[party.id_party] = entry
+            self._by_size.setdefault((entry["rows"], entry["cols"]), set()).add(party.id_party)
+            self._cache.clear()
+
+    def update(self, party):
+        """Inscription dans une partie ouverte (places libres modifiées)."""
+        entry = self.summary(party)
+        with self._lock:
+            if party.id_party in self._entries:
+                self._entries[party.id_party] = entry
+                self._cache.clear()
+
+    def remove(self, id_party):
+        """Partie démarrée (ou terminée) : elle n'est plus ouverte."""
+        with self._lock:
+            entry = self._entries.pop(id_party, None)
+            if entry is None:
+                return
+            size = (entry["rows"], entry["cols"])
+            ids = self._by_size[size]
+            ids.discard(id_party)
+            if not ids:
+                del self._by_size[size]
+            self._cache.clear()
+
+    # --- Lecture ---
+
+    def query(self, offset=0, limit=None, min_free=None, rows=None, cols=None):
+        """
+        Page de la liste des parties ouvertes, par ordre de création (identifiant).
+
+        :param offset, limit: page demandée (limit None : toutes les parties à partir d'offset).
+        :param min_free: ne retenir que les parties ayant au moins min_free places libres.
+        :param rows, cols: ne retenir que les plateaux de cette taille (l'un ou l'autre, ou les deux).
+        :return: (contenu, contenu sérialisé en JSON) ; le contenu est
+                 {"id_parties", "parties" (résumés), "total" (parties retenues), "next_offset"}
+                 et est partagé entre les appelants : il ne doit pas être modifié.
+        :raises ValueError: si un paramètre est invalide.
+        """
+        if offset == 0 and limit is None and min_free is None and rows is None and cols is None:
+            key = _FULL_LIST  # Requête la plus fréquente : rien à valider
+        else:
+            key = (_integer(offset, "offset", 0), None if limit is None else _integer(limit, "limit", 1, MAX_PAGE),
+                   None if min_free is None else _integer(min_free, "min_free", 0),
+                   None if rows is None else _integer(rows, "rows", 1),
+                   None if cols is None else _integer(cols, "cols", 1))
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+        offset, limit, min_free, rows, cols = key
+        with self._lock:
+            if rows is not None or cols is not None:
+                ids = [id_party for (r, c), size_ids in self._by_size.items()
+                       if (rows is None or r == rows) and (cols is None or c == cols) for id_party in size_ids]
+            else:
+                ids = list(self._entries)
+            ids.sort()
+            entries = [self._entries[id_party] for id_party in ids]
+            if min_free is not None:
+                entries = [entry for entry in entries if entry["free_slots"] >= min_free]
+            end = len(entries) if limit is None else offset + limit
+            page = entries[offset:end]
+            content = {"id_parties": [entry["id_party"] for entry in page], "parties": page,
+                       "total": len(entries), "next_offset": end if end < len(entries) else None}
+            cached = (content, json_codec.dumps(content))
+            if len(self._cache) >= MAX_CACHED_QUERIES:
+                self._cache.clear()
+            self._cache[key] = cached
+        return cached
+
+    def ids(self):
+        """Identifiants des parties ouvertes, par ordre de création."""
+        return list(self.query()[0]["id_parties"])
+
+
+def _integer(value, name, minimum, maximum=None):
+    """
+    :raises ValueError: si value n'est pas un entier compris entre minimum et maximum.
+    """
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Le paramètre '{name}' doit être un entier.") from None
+    if value < minimum or (maximum is not None and value > maximum):
+        bounds = f"compris entre {minimum} et {maximum}" if maximum is not None else f"au moins égal à {minimum}"
+        raise ValueError(f"Le paramètre '{name}' doit être {bounds}.")
+    return value
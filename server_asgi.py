@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Serveur HTTP du jeu en ASGI : mêmes routes et mêmes réponses que server_http (Flask),
+le traitement étant partagé dans http_api, sur le même GameManager.
+
+Une requête en cours n'occupe pas de thread : /wait et /events attendent le prochain
+changement de la partie sans thread ni CPU (listener du ChangeLog qui réveille la
+boucle asyncio), ce qui permet de garder ouverts de nombreux long-polls.
+
+Usage : python server_asgi.py [--host 127.0.0.1] [--port 8000]   (nécessite uvicorn)
+   ou : uvicorn server_asgi:app
+"""
+import argparse
+import asyncio
+import logging
+import re
+from urllib.parse import parse_qsl
+
+import http_api
+import json_codec
+from game_manager import get_manager
+from logging_setup import setup_logging
+
+# Taille maximale du corps d'une requête (un lot de déplacements compris)
+MAX_BODY = 4 << 20
+
+_JSON_HEADERS = [(b"content-type", b"application/json")]
+_SSE_HEADERS = [(b"content-type", b"text/event-stream"), (b"cache-control", b"no-cache"),
+                (b"x-accel-buffering", b"no")]
+_PARTY_ROUTE = re.compile(r"^/(status|events)/(\d+)$")
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class GameASGIApp:
+    """Application ASGI (protocole brut, sans framework) exposant les routes de server_http."""
+
+    def __init__(self, manager=None):
+        self.manager = manager if manager is not None else get_manager()
+        # (méthode, chemin) -> coroutine(scope, receive) retournant (statut, corps, en-têtes)
+        self.routes = {
+            ("GET", "/"): self.home,
+            ("POST", "/start"): self.with_body(http_api.start_party),
+            ("POST", "/move"): self.with_body(http_api.move),
+            ("POST", "/moves/batch"): self.with_body(http_api.moves_batch),
+            ("GET", "/status"): self.status,
+            ("GET", "/list"): self.list_games,
+            ("POST", "/subscribe"): self.with_body(http_api.subscribe),
+            ("GET", "/wait"): self.wait_changes,
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self.lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+        path = scope["path"]
+        try:
+            match = _PARTY_ROUTE.match(path)
+            if match is not None:
+                if scope["method"] != "GET":
+                    raise HTTPError(405, "Méthode non autorisée")
+                id_party = int(match.group(2))
+                if match.group(1) == "events":
+                    await self.party_events(scope, receive, send, id_party)
+                    return
+                status, body, headers = self.party_status(scope, id_party)
+            else:
+                handler = self.routes.get((scope["method"], path))
+                if handler is None:
+                    known = any(route_path == path for _, route_path in self.routes)
+                    raise HTTPError(405 if known else 404,
+                                    "Méthode non autorisée" if known else "Ressource inconnue")
+                status, body, headers = await handler(scope, receive)
+        except HTTPError as e:
+            status, body, headers = e.status, self.error(path, e), _JSON_HEADERS
+        except Exception as e:
+            status, body, headers = 400, self.error(path, e), _JSON_HEADERS
+        if status != 304:
+            headers = headers + [(b"content-length", str(len(body)).encode())]
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+    @staticmethod
+    async def lifespan(receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    @staticmethod
+    def error(route, e):
+        logging.error(f"Erreur dans {route}: {e}")
+        return json_codec.dumps({"status": "KO", "error": str(e)})
+
+    @staticmethod
+    async def read_json(receive):
+        """
+        Corps JSON de la requête (quel que soit son Content-Type, comme get_json(force=True)).
+
+        :raises HTTPError: si le corps dépasse MAX_BODY.
+        :raises ValueError: si le corps n'est pas du JSON.
+        """
+        chunks = []
+        size = 0
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                raise ValueError("Client déconnecté")
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > MAX_BODY:
+                raise HTTPError(413, "Corps de requête trop long")
+            chunks.append(chunk)
+            if not message.get("more_body", False):
+                break
+        try:
+            return json_codec.loads(b"".join(chunks))
+        except json_codec.JSONDecodeError as e:
+            raise ValueError(f"JSON invalide: {e}") from e
+
+    def with_body(self, operation):
+        """Route POST : operation(manager, corps JSON) -> dict."""
+        async def handler(scope, receive):
+            data = await self.read_json(receive)
+            return 200, json_codec.dumps(operation(self.manager, data)), _JSON_HEADERS
+        return handler
+
+    async def home(self, scope, receive):
+        return 200, json_codec.dumps(http_api.WELCOME), _JSON_HEADERS
+
+    async def status(self, scope, receive):
+        return 200, json_codec.dumps(http_api.server_status(self.manager)), _JSON_HEADERS
+
+    async def list_games(self, scope, receive):
+        args = dict(parse_qsl(scope.get("query_string", b"").decode("latin-1")))
+        return 200, http_api.list_open(self.manager, args), _JSON_HEADERS
+
+    def party_status(self, scope, id_party):
+        """/status/<id_party> avec ETag ; 304 si If-None-Match désigne la version courante."""
+        try:
+            etag, body = http_api.party_status(self.manager, id_party, _header(scope, b"if-none-match"))
+        except ValueError as e:
+            raise HTTPError(404, str(e)) from e
+        headers = [(b"etag", f'"{etag}"'.encode()), (b"cache-control", b"no-cache")]
+        if body is None:
+            return 304, b"", headers
+        return 200, body, _JSON_HEADERS + headers
+
+    async def wait_changes(self, scope, receive):
+        """/wait : long-poll sans thread (voir server_http.wait_changes)."""
+        args = dict(parse_qsl(scope.get("query_string", b"").decode("latin-1")))
+        id_party, since, timeout = http_api.wait_parameters(args)
+        version, changes, finished = await self.next_change(id_party, since, timeout)
+        return 200, http_api.changes_body(self.manager, id_party, version, changes, finished), _JSON_HEADERS
+
+    async def next_change(self, id_party, version, timeout, disconnected=None):
+        """
+        Équivalent asynchrone de ChangeLog.wait : la coroutine est réveillée par un
+        listener de la partie, sans bloquer la boucle ni occuper de thread.
+
+        :param disconnected: Future terminée quand le client se déconnecte (fin de l'attente).
+        """
+        changes_log = self.manager.changes
+        loop = asyncio.get_running_loop()
+        changed = asyncio.Event()
+
+        def listener():
+            # Appelé par le thread qui modifie la partie (la boucle elle-même, ou un autre thread)
+            loop.call_soon_threadsafe(changed.set)
+
+        changes_log.add_listener(id_party, listener)
+        try:
+            result = changes_log.since(id_party, version)
+            if result[1] == [] and not result[2]:
+                waiters = [asyncio.ensure_future(changed.wait())]
+                if disconnected is not None:
+                    waiters.append(disconnected)
+                await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                waiters[0].cancel()
+                result = changes_log.since(id_party, version)
+            return result
+        finally:
+            changes_log.remove_listener(id_party, listener)
+
+    async def party_events(self, scope, receive, send, id_party):
+        """/events/<id_party> : flux Server-Sent Events (voir server_http.party_events)."""
+        args = dict(parse_qsl(scope.get("query_string", b"").decode("latin-1")))
+        try:
+            version = int(_header(scope, b"last-event-id") or args.get("since", 0))
+            self.manager.changes.since(id_party, version)
+        except ValueError as e:
+            raise HTTPError(404, str(e)) from e
+        await send({"type": "http.response.start", "status": 200, "headers": _SSE_HEADERS})
+
+        async def wait_disconnect():
+            while (await receive())["type"] != "http.disconnect":
+                pass
+
+        disconnected = asyncio.ensure_future(wait_disconnect())
+        try:
+            finished = False
+            while not finished and not disconnected.done():
+                try:
+                    _, changes, finished = await self.next_change(id_party, version, http_api.SSE_KEEPALIVE,
+                                                                  disconnected)
+                except ValueError:  # Partie évincée
+                    break
+                messages, last = http_api.sse_messages(self.manager, id_party, changes)
+                if last is not None:
+                    version = last
+                elif finished or disconnected.done():
+                    continue
+                else:
+                    messages = http_api.SSE_KEEPALIVE_MESSAGE
+                await send({"type": "http.response.body", "body": messages, "more_body": True})
+            await send({"type": "http.response.body", "body": b""})
+        finally:
+            disconnected.cancel()
+
+
+def _header(scope, name):
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+# Application partagée : même GameManager que les serveurs TCP et HTTP du processus
+app = GameASGIApp()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serveur HTTP ASGI du jeu")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--log-level", help="DEBUG pour journaliser chaque requête (défaut : WOLF_LOG_LEVEL ou INFO)")
+    args = parser.parse_args()
+    setup_logging(args.log_level)
+    try:
+        import uvicorn
+    except ImportError:
+        raise SystemExit("uvicorn est requis : pip install uvicorn")
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning", access_log=False)
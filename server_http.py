@@ -1,146 +1,185 @@
 #!/usr/bin/env python3
 
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request
 import logging
 import sys
+import threading
+
+import http_api
+import json_codec
+
+from game_manager import get_manager
+from logging_setup import setup_logging
 
 app = Flask(__name__)
 app.config['JSON_SORT_KEYS'] = False  # Pour conserver l'ordre dans les réponses JSON
 
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="[%(asctime)s] %(levelname)s: %(message)s",
-    handlers=[logging.StreamHandler(sys.stdout)]
-)
+# Même format qu'auparavant, mais écrit par un thread dédié (file d'attente)
+setup_logging()
 
 
 
-def send_to_admin(message):
-   
-    logging.info(f"(Simulé) Envoi à admin_engine: {message}")
-    
-    if message.startswith("CREATE_GAME:"):
-        game_name = message.split(":", 1)[1]
-        return f"Partie '{game_name}' créée avec succès."
-    elif message == "LIST_GAMES":
-        return [1, 2, 3]
-    elif message.startswith("SUBSCRIBE:"):
-        
-        return {"role": "wolf", "id_player": 23}
-    else:
-        return f"Réponse simulée pour {message}"
+# Parties hébergées, partagées avec le serveur TCP lorsqu'ils tournent dans le même processus
+manager = get_manager()
 
-def send_move(player_id, game_id, row, col):
- 
-    logging.info(f"(Simulé) Appel gRPC : player_id={player_id}, game_id={game_id}, move=({row}, {col})")
-    # Simule une réponse du game_engine ; vous pouvez simuler plus d'informations ici.
-    return "OK"
+# Sous WSGI, chaque /wait ou /events en attente occupe un thread du serveur jusqu'au
+# changement suivant (ou au délai) : leur nombre est borné, au-delà la réponse est 503.
+# server_asgi sert les mêmes routes sans thread par attente, pour de nombreux abonnés.
+MAX_WAITERS = 64
+_waiters = threading.BoundedSemaphore(MAX_WAITERS)
+
+
+def json_response(body, status=200):
+    """Réponse JSON ; body est un dict, ou des bytes déjà sérialisés."""
+    if isinstance(body, dict):
+        body = json_codec.dumps(body)
+    return Response(body, status=status, mimetype="application/json")
+
+def error_response(route, e, status=400):
+    logging.error(f"Erreur dans {route}: {e}")
+    return json_response({"status": "KO", "error": str(e)}, status)
+
+def too_many_waiters(route):
+    return error_response(route, f"Trop d'attentes en cours (maximum {MAX_WAITERS}), "
+                                 "utilisez le serveur ASGI (server_asgi)", 503)
 
-# --- Endpoints Flask ---
+# --- Endpoints Flask (le traitement est dans http_api, partagé avec server_asgi) ---
 
 @app.route("/")
 def home():
   
-    return jsonify({"message": "Bienvenue sur le serveur HTTP du jeu Les Loups 🐺"})
+    return json_response(http_api.WELCOME)
 
 @app.route("/start", methods=["POST"])
 def start_game():
  
     try:
-        data = request.get_json(force=True)
-        game_name = data.get("name")
-        if not game_name:
-            raise ValueError("Le nom de la partie est requis.")
-        message = f"CREATE_GAME:{game_name}"
-        logging.info(f"Démarrage d'une partie : {game_name}")
-        response = send_to_admin(message)
-        return jsonify({"status": "OK", "admin_response": response})
+        return json_response(http_api.start_party(manager, request.get_json(force=True)))
     except Exception as e:
-        logging.error(f"Erreur dans /start: {e}")
-        return jsonify({"status": "KO", "error": str(e)}), 400
+        return error_response("/start", e)
 
 @app.route("/move", methods=["POST"])
 def move():
   
     try:
-        data = request.get_json(force=True)
-        for field in ("player_id", "game_id", "move"):
-            if field not in data:
-                raise ValueError(f"Le champ '{field}' est requis.")
-        player_id = int(data.get("player_id"))
-        game_id = int(data.get("game_id"))
-        move_str = data.get("move")
-        if not (isinstance(move_str, str) and len(move_str) == 2):
-            raise ValueError("Le paramètre move doit être une chaîne de 2 caractères.")
-        
-     
-        row = int(move_str[0])
-        col = int(move_str[1])
-        logging.info(f"Demande de déplacement: player_id={player_id}, game_id={game_id}, move={move_str}")
-        result = send_move(player_id, game_id, row, col)
-        status = "OK" if result == "OK" else "KO"
-        return jsonify({
-            "status": status,
-            "move": {"row": row, "col": col},
-            "result": result
-        })
+        return json_response(http_api.move(manager, request.get_json(force=True)))
     except Exception as e:
-        logging.error(f"Erreur dans /move: {e}")
-        return jsonify({"status": "KO", "error": str(e)}), 400
+        return error_response("/move", e)
+
+@app.route("/moves/batch", methods=["POST"])
+def moves_batch():
+    """
+    Enregistre un lot de déplacements, éventuellement de plusieurs parties.
+    Entrée attendue : une liste (ou {"moves": liste}) d'objets au format de /move.
+    """
+    try:
+        return json_response(http_api.moves_batch(manager, request.get_json(force=True)))
+    except Exception as e:
+        return error_response("/moves/batch", e)
 
 @app.route("/status", methods=["GET"])
 def status():
     """
-    Retourne un statut préliminaire statique du serveur.
-    À adapter pour renvoyer des informations réelles sur l'état d'une partie.
+    Retourne le statut du serveur : nombre de parties hébergées, ouvertes et en cours.
+    """
+    try:
+        return json_response(http_api.server_status(manager))
+    except Exception as e:
+        return error_response("/status", e)
+
+@app.route("/status/<int:id_party>", methods=["GET"])
+def party_status(id_party):
+    """
+    Retourne l'état d'une partie (plateau, tour, fin de partie, joueurs) avec un ETag
+    dérivé de sa version. Un client qui renvoie cet ETag dans If-None-Match reçoit
+    304 sans contenu tant que la partie n'a pas changé.
+    """
+    try:
+        etag, body = http_api.party_status(manager, id_party, request.headers.get("If-None-Match"))
+    except Exception as e:
+        return error_response(f"/status/{id_party}", e, 404)
+    response = json_response(body) if body is not None else Response(status=304)
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+@app.route("/wait", methods=["GET"])
+def wait_changes():
+    """
+    Long-poll : attend le prochain changement de la partie id_party postérieur à la
+    version since, puis retourne les changements manqués (événements par version).
+    Paramètres : id_party, since (0 par défaut), timeout en secondes (30 par défaut).
+    Sans changement avant le délai, la liste des changements est vide.
+    L'attente occupe un thread : au plus MAX_WAITERS à la fois (503 au-delà).
+    """
+    if not _waiters.acquire(blocking=False):
+        return too_many_waiters("/wait")
+    try:
+        id_party, since, timeout = http_api.wait_parameters(request.args)
+        version, changes, finished = manager.changes.wait(id_party, since, timeout)
+        return json_response(http_api.changes_body(manager, id_party, version, changes, finished))
+    except Exception as e:
+        return error_response("/wait", e)
+    finally:
+        _waiters.release()
+
+@app.route("/events/<int:id_party>", methods=["GET"])
+def party_events(id_party):
+    """
+    Flux Server-Sent Events des changements d'une partie (voir http_api.sse_messages) ;
+    le flux se termine avec la partie. Chaque flux occupe un thread pendant toute sa
+    durée : au plus MAX_WAITERS à la fois, avec /wait (503 au-delà).
     """
     try:
-        return jsonify({
-            "status": "OK",
-            "message": "Statut du serveur: la partie est en cours ou terminée selon vos actions."
-        })
+        since = int(request.headers.get("Last-Event-ID") or request.args.get("since", 0))
+        manager.changes.since(id_party, since)  # Partie inconnue : erreur avant le début du flux
     except Exception as e:
-        logging.error(f"Erreur dans /status: {e}")
-        return jsonify({"status": "KO", "error": str(e)}), 400
+        return error_response(f"/events/{id_party}", e, 404)
+    if not _waiters.acquire(blocking=False):
+        return too_many_waiters(f"/events/{id_party}")
+
+    def stream(version):
+        finished = False
+        while not finished:
+            try:
+                _, changes, finished = manager.changes.wait(id_party, version, http_api.SSE_KEEPALIVE)
+            except ValueError:  # Partie évincée
+                return
+            messages, last = http_api.sse_messages(manager, id_party, changes)
+            if last is not None:
+                version = last
+                yield messages
+            elif not finished:
+                yield http_api.SSE_KEEPALIVE_MESSAGE
+
+    response = Response(stream(since), mimetype="text/event-stream",
+                        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+    response.call_on_close(_waiters.release)  # Fin du flux ou client parti
+    return response
 
 @app.route("/list", methods=["GET"])
 def list_games():
     """
-    Liste les parties ouvertes non commencées.
-    Utilise send_to_admin pour communiquer avec l'admin_engine (simulé).
+    Liste les parties ouvertes non commencées (filtres et pages : voir http_api.list_open).
     """
     try:
-        message = "LIST_GAMES"
-        logging.info("Requête pour lister les parties ouvertes.")
-        response = send_to_admin(message)
-        return jsonify({"status": "OK", "response": {"id_parties": response}})
+        logging.debug("Requête pour lister les parties ouvertes.")
+        return json_response(http_api.list_open(manager, request.args))
     except Exception as e:
-        logging.error(f"Erreur dans /list: {e}")
-        return jsonify({"status": "KO", "error": str(e)}), 400
+        return error_response("/list", e)
 
 @app.route("/subscribe", methods=["POST"])
 def subscribe():
     """
     Permet à un joueur de s'inscrire à une partie.
     Entrée attendue : JSON contenant "player" et "id_party".
-    Utilise send_to_admin pour communiquer avec l'admin_engine (simulé).
     """
     try:
-        data = request.get_json(force=True)
-        for field in ("player", "id_party"):
-            if field not in data:
-                raise ValueError(f"Le champ '{field}' est requis.")
-        player = data.get("player")
-        id_party = data.get("id_party")
-        message = f"SUBSCRIBE:{player}:{id_party}"
-        logging.info(f"Demande d'inscription: {message}")
-        response = send_to_admin(message)
-        return jsonify({"status": "OK", "response": response})
+        return json_response(http_api.subscribe(manager, request.get_json(force=True)))
     except Exception as e:
-        logging.error(f"Erreur dans /subscribe: {e}")
-        return jsonify({"status": "KO", "error": str(e)}), 400
+        return error_response("/subscribe", e)
 
 if __name__ == "__main__":
     try:
@@ -1,124 +1,431 @@
 #!/usr/bin/env python3
+import logging
 import socket
 import threading
-import json
 import grpc  #
+from concurrent.futures import ThreadPoolExecutor
+
+import json_codec
+from game_manager import get_manager
+from party_events import Watcher
+from party_listing import QUERY_PARAMETERS
+from framing import (LineDecoder, FrameDecoder, MessageTooLong, available_codecs, decode_frame,
+                     encode_message, encode_events)
+from logging_setup import setup_logging
+from governance import Governor
+
+logger = logging.getLogger(__name__)
+
+# Requêtes avec "id" en cours de traitement par connexion ; au-delà, la lecture attend
+MAX_PIPELINE = 64
+# Nombre maximum de sous-requêtes d'une action batch
+MAX_BATCH = 1024
+
+# Table des actions du protocole : nom -> fonction(server, params, client) -> réponse
+ACTIONS = {}
+
+
+def action(name):
+    """Décorateur enregistrant une méthode de TCPServer comme traitement d'une action."""
+    def decorator(func):
+        ACTIONS[name] = func
+        return func
+    return decorator
+
+
+class ClientConnection:
+    """
+    Connexion d'un client au serveur threadé. Réponses et notifications partagent la
+    socket : tout envoi se fait sous send_lock. Au premier "watch", un thread dédié
+    vide la file de notifications (Watcher) du client vers la socket.
+    """
+    def __init__(self, conn, addr, bucket=None):
+        self.conn = conn
+        self.addr = addr
+        self.bucket = bucket  # Seau à jetons de la connexion (governance), None : sans limite
+        self.send_lock = threading.Lock()
+        self.pipeline = threading.BoundedSemaphore(MAX_PIPELINE)
+        self.codec = None  # None : mode texte (JSON par ligne) ; sinon codec du mode binaire
+        self._watcher = None
+        self._watcher_lock = threading.Lock()
+        self._closed = False
+
+    def watcher(self):
+        # Sous verrou : deux watch pipelinés, traités par deux threads de l'exécuteur,
+        # doivent partager le même Watcher
+        with self._watcher_lock:
+            if self._watcher is None:
+                if self._closed:
+                    raise ValueError("Connexion fermée")
+                self._watcher = Watcher()
+                threading.Thread(target=self.push_events, daemon=True).start()
+            return self._watcher
+
+    def watching(self):
+        """True si le client suit au moins une partie (watch)."""
+        return self._watcher is not None and bool(self._watcher.parties)
+
+    def push_events(self):
+        watcher = self._watcher
+        while not watcher.closed:
+            events = watcher.get()
+            if not events:
+                continue
+            try:
+                with self.send_lock:
+                    self.conn.sendall(encode_events(self.codec, events))
+            except OSError:
+                break
+
+    def wait_pipeline(self):
+        """Attend la fin des requêtes pipelinées en cours."""
+        for _ in range(MAX_PIPELINE):
+            self.pipeline.acquire()
+        for _ in range(MAX_PIPELINE):
+            self.pipeline.release()
+
+    def close(self, events):
+        with self._watcher_lock:
+            self._closed = True
+            watcher = self._watcher
+        if watcher is not None:
+            events.unwatch_all(watcher)
+            watcher.close()
+
 
 class TCPServer:
-    def __init__(self, host="0.0.0.0", port=5001):
+    # Les sous-classes peuvent étendre le protocole avec leur propre copie de la table
+    actions = ACTIONS
+    # Sans Governor (serveur construit sans __init__), aucune limite n'est appliquée
+    governor = None
+
+    def __init__(self, host="0.0.0.0", port=5001, manager=None, workers=8, limits=None, backlog=1024):
+        """
+        :param limits: governance.Limits (connexions, délais, débits) ; valeurs par défaut si None.
+        :param backlog: file d'attente des connexions entrantes (listen), comme AsyncTCPServer.
+        """
         self.host = host
         self.port = port
+        # Parties hébergées : par défaut le GameManager partagé avec le serveur HTTP
+        self.manager = manager if manager is not None else get_manager()
+        self.governor = Governor(limits)
+        # Requêtes portant un "id" : traitées en parallèle, réponses dans l'ordre d'achèvement
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tcp-request")
         self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.server_socket.bind((self.host, self.port))
-        self.server_socket.listen(5)
-        print(f"Serveur TCP d'administration démarré sur {self.host}:{self.port}")
+        self.server_socket.listen(backlog)
+        logger.info("Serveur TCP d'administration démarré sur %s:%s", self.host, self.port)
 
     def handle_client(self, conn, addr):
-        print(f"Connexion établie avec {addr}")
-        receive_buffer = ""
+        logger.info("Connexion établie avec %s", addr)
+        client = ClientConnection(conn, addr, self.governor.connection_bucket())
+        # Mode texte : le délimiteur "\n" sépare les messages ; mode binaire : trames
+        decoder = LineDecoder()
         try:
             while True:
-                data = conn.recv(4096)
+                partial = decoder.buffered()
+                conn.settimeout(self.governor.timeout_for(partial, client.watching()))
+                try:
+                    data = conn.recv(65536)
+                except socket.timeout:
+                    if not partial and client.watching():
+                        continue  # watch reçu pendant l'attente (requête pipelinée)
+                    self.governor.count("read_timeouts" if partial else "idle_timeouts")
+                    self.reply(client, {"status": "KO", "response": "Délai dépassé, connexion fermée"})
+                    break
                 if not data:
-                    print(f"Connexion fermée par {addr}")
+                    logger.info("Connexion fermée par %s", addr)
                     break
-                receive_buffer += data.decode("utf-8")
-                # On utilise le délimiteur "\n" pour séparer les messages
-                while "\n" in receive_buffer:
-                    message, receive_buffer = receive_buffer.split("\n", 1)
-                    print(f"Message reçu de {addr}: {message}")
+                decoder.feed(data)
+                while True:
+                    try:
+                        message = decoder.next_message()
+                    except MessageTooLong as e:
+                        self.reply(client, {"status": "KO", "response": str(e)})
+                        return
+                    if message is None:
+                        break
+                    logger.debug("Message reçu de %s: %r", addr, message)
                     try:
-                        request = json.loads(message)
-                    except json.JSONDecodeError as e:
-                        response = {"status": "KO", "response": f"JSON invalide: {e}"}
-                        self.send_response(conn, response)
+                        if client.codec is None:
+                            request = json_codec.loads(message)
+                        else:
+                            request = decode_frame(client.codec, message)
+                    except ValueError as e:
+                        prefix = "JSON invalide: " if client.codec is None else ""
+                        self.reply(client, {"status": "KO", "response": f"{prefix}{e}"})
                         continue
-                    response = self.process_request(request)
-                    self.send_response(conn, response)
+                    if isinstance(request, dict) and request.get("action") == "binary":
+                        # Les requêtes suivantes de la connexion sont des trames
+                        client.wait_pipeline()
+                        response = self.negotiate_binary(request)
+                        self.reply(client, response)
+                        if response["status"] == "OK":
+                            client.codec = response["response"]["codec"]
+                            remaining = decoder.remaining()
+                            decoder = FrameDecoder()
+                            decoder.feed(remaining)
+                        continue
+                    if isinstance(request, dict) and "id" in request:
+                        # Requête identifiée : on lit la suivante sans attendre la réponse
+                        if not client.pipeline.acquire(blocking=False):
+                            self.governor.count("pipeline_refused")
+                            self.reply(client, {"status": "KO", "response": "Trop de requêtes en cours",
+                                                "id": request["id"]})
+                            continue
+                        self.executor.submit(self.answer_pipelined, client, request)
+                        continue
+                    self.reply(client, self.dispatch(request, client))
         except Exception as e:
-            print(f"Erreur avec le client {addr}: {e}")
+            logger.warning("Erreur avec le client %s: %s", addr, e)
         finally:
+            client.close(self.manager.events)
             conn.close()
-            print(f"Connexion terminée avec {addr}")
+            self.governor.close_connection()
+            logger.info("Connexion terminée avec %s", addr)
+
+    def answer_pipelined(self, client, request):
+        """
+        Requête identifiée, traitée par l'exécuteur : une réponse est toujours envoyée,
+        même en cas d'erreur imprévue, sans quoi le client attendrait indéfiniment son "id".
+        """
+        try:
+            try:
+                response = self.dispatch(request, client)
+            except Exception as e:
+                logger.warning("Erreur lors du traitement de la requête %s: %s", request["id"], e)
+                response = {"status": "KO", "response": f"Erreur interne : {e}", "id": request["id"]}
+            self.reply(client, response)
+        finally:
+            client.pipeline.release()
+
+    def reply(self, client, response):
+        with client.send_lock:
+            self.send_response(client.conn, response, client.codec)
 
-    def send_response(self, conn, response):
+    def send_response(self, conn, response, codec=None):
         try:
-            response_str = json.dumps(response) + "\n"
-            conn.sendall(response_str.encode("utf-8"))
-            print(f"Réponse envoyée: {response_str.strip()}")
+            conn.sendall(encode_message(codec, response))
+            logger.debug("Réponse envoyée: %s", response)
         except Exception as e:
-            print(f"Erreur lors de l'envoi de la réponse: {e}")
+            logger.warning("Erreur lors de l'envoi de la réponse: %s", e)
+
+    @staticmethod
+    def negotiate_binary(request):
+        """
+        Action binary : passage de la connexion en trames préfixées par leur longueur
+        (framing). La réponse est encore envoyée en mode texte ; le codec demandé
+        (paramètre "codec", msgpack par défaut s'il est installé) sert ensuite aux
+        trames FRAME_OBJECT dans les deux sens.
+        """
+        codecs = available_codecs()
+        try:
+            codec = TCPServer.merge_parameters(request.get("parameters", [])).get("codec", codecs[0])
+        except ValueError as e:
+            response = {"status": "KO", "response": str(e)}
+        else:
+            if codec not in codecs:
+                response = {"status": "KO", "response": f"Codec non disponible : {codec}"}
+            else:
+                response = {"status": "OK", "response": {"codec": codec}}
+        if "id" in request:
+            response["id"] = request["id"]
+        return response
 
-    def process_request(self, req):
+    def dispatch(self, request, client=None):
+        """
+        Point d'entrée d'une requête décodée : action batch ou requête simple.
+        Le champ optionnel "id" de la requête est recopié dans la réponse, ce qui
+        permet au client d'envoyer plusieurs requêtes sans attendre et d'associer
+        les réponses, éventuellement reçues dans le désordre.
+        """
+        if not isinstance(request, dict):
+            return {"status": "KO", "response": "La requête doit être un objet JSON"}
+        if request.get("action") == "batch":
+            response = self.process_batch(request, client)
+        else:
+            response = self.process_request(request, client)
+        if "id" in request:
+            response["id"] = request["id"]
+        return response
+
+    def process_batch(self, request, client=None):
+        """
+        Action batch : {"action": "batch", "requests": [requête, ...]}. Les sous-requêtes
+        sont traitées dans l'ordre (un bot peut envoyer tous ses coups d'un tour en un
+        aller-retour) ; la réponse contient la liste de leurs réponses, dans le même ordre.
+        """
+        requests = request.get("requests")
+        if not isinstance(requests, list):
+            return {"status": "KO", "response": "Paramètre 'requests' absent ou invalide"}
+        if len(requests) > MAX_BATCH:
+            return {"status": "KO", "response": f"Trop de requêtes dans le lot (maximum {MAX_BATCH})"}
+        responses = []
+        for sub_request in requests:
+            if isinstance(sub_request, dict) and sub_request.get("action") == "batch":
+                response = {"status": "KO", "response": "Lots imbriqués interdits"}
+                if "id" in sub_request:
+                    response["id"] = sub_request["id"]
+            else:
+                response = self.dispatch(sub_request, client)
+            responses.append(response)
+        return {"status": "OK", "response": responses}
+
+    def process_request(self, req, client=None):
         """
         Traite la requête JSON reçue et renvoie une réponse.
         On suppose que req est un dictionnaire avec au moins la clé 'action'
         et éventuellement 'parameters'.
+
+        :param client: connexion à l'origine de la requête, nécessaire aux actions
+                       watch / unwatch (objet exposant watcher()).
         """
-        action = req.get("action")
+        action_name = req.get("action")
         parameters = req.get("parameters", [])
-       
-        print(f"Action demandée: {action} avec paramètres: {parameters}")
-        
-        # Pour l'exemple, voici des réponses simulées pour chaque action
-        if action == "list":
-            # Action : Lister les parties ouvertes non commencées
-            return {"status": "OK", "response": {"id_parties": [1, 2, 3]}}
-        elif action == "subscribe":
-            # Action : Inscription
-            # On attend deux paramètres : player et id_party
-            # Vérification simplifiée :
-            if len(parameters) < 2:
-                return {"status": "KO", "response": "Paramètres insuffisants pour l'inscription"}
-            # Simuler une réponse
-            return {"status": "OK", "response": {"role": "wolf", "id_player": 23}}
-        elif action == "party_status":
-            # Action : Récupérer l'état du tour
-            return {"status": "OK", "response": {"party": {
-                "id_party": 23,
-                "id_player": 12,
-                "started": True,
-                "round_in_progress": 12,
-                "move": {"next_position": {"row": 0, "col": 1}}
-            }}}
-        elif action == "gameboard_status":
-           
-            return {"status": "OK", "response": {"visible_cells": "010010000"}}
-        elif action == "move":
-            
-            if len(parameters) < 3:
-                return {"status": "KO", "response": "Paramètres insuffisants pour le déplacement"}
-            move_value = None
-            for p in parameters:
-                if "move" in p:
-                    move_value = p["move"]
-                    break
-            if not move_value:
-                return {"status": "KO", "response": "Paramètre 'move' absent"}
-            
-            # Ici, appelons le moteur de jeu via gRPC.
-            try:
-             
-                result = {"round_in_progress": 12, "move": {"next_position": {"row": 0, "col": 1}}}
-                return {"status": "OK", "response": result}
-            except Exception as e:
-                return {"status": "KO", "response": f"Erreur gRPC: {e}"}
-        else:
+        logger.debug("Action demandée: %s avec paramètres: %s", action_name, parameters)
+        handler = self.actions.get(action_name) if isinstance(action_name, str) else None
+        if handler is None:
             return {"status": "KO", "response": "Action non reconnue"}
-    
+        try:
+            params = self.merge_parameters(parameters)
+            if self.governor is not None:
+                refusal = self.governor.allow_request(action_name, params, client.bucket if client else None)
+                if refusal is not None:
+                    return {"status": "KO", "response": refusal}
+            return handler(self, params, client)
+        except (ValueError, TypeError) as e:
+            return {"status": "KO", "response": str(e)}
+
+    # --- Actions du protocole ---
+
+    @action("create")
+    def action_create(self, params, client):
+        # Action : création d'une partie (mêmes paramètres que POST /start du serveur HTTP)
+        id_party = self.manager.create_party(
+            params.get("name"),
+            rows=params.get("rows"),
+            cols=params.get("cols"),
+            num_obstacles=params.get("nb_obstacles"),
+            max_turns=params.get("nb_rounds"),
+            roles_quotas=params.get("roles_quotas"),
+            seed=params.get("seed"),
+        )
+        return {"status": "OK", "response": {"id_party": id_party}}
+
+    @action("list")
+    def action_list(self, params, client):
+        # Action : Lister les parties ouvertes non commencées ; filtres et page facultatifs
+        # (offset, limit, min_free, rows, cols). Réponse en cache, partagée : non modifiable
+        filters = {name: params[name] for name in QUERY_PARAMETERS if name in params}
+        return {"status": "OK", "response": self.manager.listing.query(**filters)[0]}
+
+    @action("subscribe")
+    def action_subscribe(self, params, client):
+        # Action : Inscription ; on attend deux paramètres : player et id_party
+        if "player" not in params or "id_party" not in params:
+            return {"status": "KO", "response": "Paramètres insuffisants pour l'inscription"}
+        return {"status": "OK", "response": self.manager.subscribe(int(params["id_party"]), params["player"])}
+
+    @action("party_status")
+    def action_party_status(self, params, client):
+        # Action : Récupérer l'état du tour
+        if "id_party" not in params or "id_player" not in params:
+            return {"status": "KO", "response": "Paramètres insuffisants pour l'état du tour"}
+        party = self.manager.party_status(int(params["id_party"]), int(params["id_player"]))
+        return {"status": "OK", "response": {"party": party}}
+
+    @action("gameboard_status")
+    def action_gameboard_status(self, params, client):
+        if "id_party" not in params or "id_player" not in params:
+            return {"status": "KO", "response": "Paramètres insuffisants pour l'état du plateau"}
+        return {"status": "OK", "response": self.manager.gameboard_status(int(params["id_party"]),
+                                                                          int(params["id_player"]))}
+
+    @action("move")
+    def action_move(self, params, client):
+        if "id_party" not in params or "id_player" not in params:
+            return {"status": "KO", "response": "Paramètres insuffisants pour le déplacement"}
+        move_value = params.get("move")
+        if not move_value:
+            return {"status": "KO", "response": "Paramètre 'move' absent"}
+        if isinstance(move_value, list):
+            # Vecteur [dr, dc] : forme JSON d'un tuple (trames FRAME_MOVE relayées)
+            move_value = tuple(move_value)
+        result = self.manager.move(int(params["id_party"]), int(params["id_player"]), move_value)
+        return {"status": "OK", "response": result}
+
+    @action("watch")
+    def action_watch(self, params, client):
+        # Action : abonnement aux notifications poussées d'une partie
+        return self._watch(params, client, self.manager.events.watch)
+
+    @action("unwatch")
+    def action_unwatch(self, params, client):
+        return self._watch(params, client, self.manager.events.unwatch)
+
+    @action("stats")
+    def action_stats(self, params, client):
+        # Action : compteurs du serveur, pour dimensionner les limites
+        stats = self.governor.stats() if self.governor is not None else {}
+        stats["parties"] = {"hosted": len(self.manager), "open": len(self.manager.listing),
+                            "started": len(self.manager.list_started())}
+        return {"status": "OK", "response": stats}
+
+    def _watch(self, params, client, operation):
+        if "id_party" not in params:
+            return {"status": "KO", "response": "Paramètres insuffisants pour l'abonnement"}
+        if client is None:
+            return {"status": "KO", "response": "Abonnement impossible hors connexion"}
+        id_party = int(params["id_party"])
+        self.manager.get_party(id_party)
+        watcher = client.watcher()
+        operation(id_party, watcher)
+        return {"status": "OK", "response": {"watching": sorted(watcher.parties)}}
+
+    @staticmethod
+    def merge_parameters(parameters):
+        """
+        Fusionne les paramètres d'une requête, donnés sous forme de liste de
+        dictionnaires ({"player": ...}, {"id_party": ...}) ou d'un seul dictionnaire.
+        Des paramètres absents (None) valent une liste vide.
+
+        :raises ValueError: si parameters n'est ni une liste, ni un dictionnaire, ni None.
+        """
+        if isinstance(parameters, dict):
+            return parameters
+        if parameters is None:
+            return {}
+        if not isinstance(parameters, list):
+            raise ValueError("Les paramètres doivent être une liste ou un objet JSON")
+        params = {}
+        for p in parameters:
+            if isinstance(p, dict):
+                params.update(p)
+        return params
+
     def run(self):
         while True:
             try:
                 conn, addr = self.server_socket.accept()
+                if not self.governor.open_connection():
+                    try:
+                        conn.sendall(encode_message(None, {"status": "KO", "response": "Trop de connexions"}))
+                    except OSError as e:
+                        logger.debug("Refus de connexion non transmis à %s: %s", addr, e)
+                    finally:
+                        conn.close()
+                    continue
                 client_thread = threading.Thread(target=self.handle_client, args=(conn, addr), daemon=True)
                 client_thread.start()
             except KeyboardInterrupt:
-                print("Arrêt du serveur.")
+                logger.info("Arrêt du serveur.")
                 self.server_socket.close()
+                self.executor.shutdown(wait=False)
                 break
 
 if __name__ == "__main__":
-    # Initialisation du serveur TCP
+    # Initialisation du serveur TCP ; niveau de journalisation : WOLF_LOG_LEVEL (INFO par défaut)
+    setup_logging()
     HOST = "0.0.0.0"
     PORT = 5001
     server = TCPServer(HOST, PORT)
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Serveur TCP d'administration asyncio : même protocole (JSON délimité par "\n", ou trames
+binaires après l'action "binary") et même traitement (TCPServer.dispatch) que
+server_tcp, sans thread par connexion.
+
+Usage : python server_tcp_async.py [--host 0.0.0.0] [--port 5001] [--backlog 1024]
+"""
+import argparse
+import asyncio
+import logging
+import signal
+import time
+
+import json_codec
+
+from server_tcp import TCPServer
+from game_manager import get_manager
+from party_events import Watcher
+from framing import MessageTooLong, decode_frame, encode_message, encode_events
+from logging_setup import setup_logging
+from governance import Governor
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncClientConnection:
+    """
+    Connexion d'un client au serveur asyncio. Au premier "watch", une tâche dédiée
+    écrit les notifications du Watcher ; la publication peut venir d'un autre thread
+    (serveur HTTP du même processus), le réveil passe donc par call_soon_threadsafe.
+    """
+    def __init__(self, writer, bucket=None, trusted=False):
+        self.writer = writer
+        self.trusted = trusted  # Connexion interne (entre workers) : ni limites ni routage
+        self.bucket = bucket  # Seau à jetons de la connexion (governance), None : sans limite
+        self.codec = None  # None : mode texte ; sinon codec du mode binaire
+        self.waiting_since = None  # Début de l'attente de la requête suivante
+        self.partial_since = None  # Réception du premier octet du message en cours
+        self._watcher = None
+        self._ready = None
+        self._task = None
+
+    def watcher(self):
+        if self._watcher is None:
+            loop = asyncio.get_running_loop()
+            self._ready = asyncio.Event()
+            self._watcher = Watcher(on_push=lambda: loop.call_soon_threadsafe(self._ready.set))
+            self._task = loop.create_task(self.push_events())
+        return self._watcher
+
+    def watching(self):
+        """True si le client suit au moins une partie (watch)."""
+        return self._watcher is not None and bool(self._watcher.parties)
+
+    async def push_events(self):
+        watcher = self._watcher
+        try:
+            while not watcher.closed:
+                await self._ready.wait()
+                self._ready.clear()
+                events = watcher.get_nowait()
+                if events:
+                    self.writer.write(encode_events(self.codec, events))
+                    await self.writer.drain()
+        except ConnectionError:
+            pass
+
+    def close(self, events):
+        if self._watcher is not None:
+            events.unwatch_all(self._watcher)
+            self._watcher.close()
+            self._task.cancel()
+
+
+class AsyncTCPServer(TCPServer):
+    # État de connexion créé pour chaque client (les sous-classes peuvent l'étendre)
+    client_class = AsyncClientConnection
+
+    def __init__(self, host="0.0.0.0", port=5001, manager=None, backlog=1024, max_line=65536,
+                 limits=None):
+        """
+        :param backlog: file d'attente des connexions entrantes (listen).
+        :param max_line: taille maximale d'un message en octets ; au-delà, le client est déconnecté.
+        :param limits: governance.Limits (connexions, délais, débits) ; valeurs par défaut si None.
+        """
+        # Pas d'appel à TCPServer.__init__ : la socket d'écoute est créée par asyncio
+        self.host = host
+        self.port = port
+        self.manager = manager if manager is not None else get_manager()
+        self.backlog = backlog
+        self.max_line = max_line
+        self.governor = Governor(limits)
+        self.server = None
+        self._connections = set()  # Tâches des connexions ouvertes
+        self._idle = {}            # Tâche en attente d'une requête (annulable sans perte) -> connexion
+        self._sweeper = None
+        self._closing = False
+
+    async def start(self, sock=None, reuse_port=None):
+        """
+        Ouvre la socket d'écoute ; retourne le port effectif (utile avec port=0).
+
+        :param sock: socket d'écoute déjà ouverte (pré-fork : partagée entre processus).
+        :param reuse_port: SO_REUSEPORT, pour que plusieurs processus écoutent le même port.
+        """
+        if sock is not None:
+            self.server = await asyncio.start_server(self.handle_client, sock=sock,
+                                                     backlog=self.backlog, limit=self.max_line)
+        else:
+            self.server = await asyncio.start_server(self.handle_client, self.host, self.port,
+                                                     backlog=self.backlog, limit=self.max_line,
+                                                     reuse_port=reuse_port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        limits = self.governor.limits
+        if limits.idle_timeout is not None or limits.read_timeout is not None:
+            self._sweeper = asyncio.get_running_loop().create_task(self._sweep_timeouts())
+        logger.info("Serveur TCP asyncio d'administration démarré sur %s:%s", self.host, self.port)
+        return self.port
+
+    async def handle_client(self, reader, writer, trusted=False):
+        addr = writer.get_extra_info("peername")
+        if not trusted and not self.governor.open_connection():
+            writer.write(encode_message(None, {"status": "KO", "response": "Trop de connexions"}))
+            writer.close()
+            return
+        task = asyncio.current_task()
+        bucket = None if trusted else self.governor.connection_bucket()
+        client = self.client_class(writer, bucket, trusted)
+        self._connections.add(task)
+        try:
+            while not self._closing:
+                client.waiting_since = time.monotonic()
+                self._idle[task] = client
+                try:
+                    message = await self.read_message(reader, client)
+                except MessageTooLong as e:
+                    await self.send_response(writer, {"status": "KO", "response": str(e)}, client.codec)
+                    break
+                finally:
+                    del self._idle[task]
+                    client.partial_since = None
+                if message is None:
+                    break
+                try:
+                    if client.codec is None:
+                        request = json_codec.loads(message)
+                    else:
+                        request = decode_frame(client.codec, message)
+                except ValueError as e:
+                    prefix = "JSON invalide: " if client.codec is None else ""
+                    await self.send_response(writer, {"status": "KO", "response": f"{prefix}{e}"},
+                                             client.codec)
+                    continue
+                if isinstance(request, dict) and request.get("action") == "binary":
+                    response = self.negotiate_binary(request)
+                    await self.send_response(writer, response, client.codec)
+                    if response["status"] == "OK":
+                        client.codec = response["response"]["codec"]
+                    continue
+                # Traitement synchrone sur la boucle : les requêtes d'une connexion sont
+                # lues au fil de l'eau (pipeline), et leur "id" est recopié dans la réponse
+                await self.send_response(writer, await self.dispatch_async(request, client), client.codec)
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        except Exception as e:
+            logger.warning("Erreur avec le client %s: %s", addr, e)
+        finally:
+            self._connections.discard(task)
+            self.close_client(client)
+            writer.close()
+            if not trusted:
+                self.governor.close_connection()
+
+    async def dispatch_async(self, request, client):
+        """Traitement d'une requête ; point d'extension des serveurs qui doivent attendre (relais)."""
+        return self.dispatch(request, client)
+
+    def close_client(self, client):
+        client.close(self.manager.events)
+
+    async def read_message(self, reader, client):
+        """
+        Prochain message de la connexion : ligne sans "\n" en mode texte, trame
+        (type, contenu) en mode binaire ; None en fin de flux.
+
+        :raises MessageTooLong: si le message dépasse max_line octets.
+        :raises ValueError: si une trame est vide (la connexion est alors fermée).
+        """
+        if client.codec is None:
+            try:
+                if self.governor.limits.read_timeout is None:
+                    line = await reader.readline()
+                else:
+                    # Le premier octet marque le début du message : le délai de lecture part de là
+                    line = await reader.read(1)
+                    if line and line != b"\n":
+                        client.partial_since = time.monotonic()
+                        line += await reader.readline()
+            except (asyncio.LimitOverrunError, ValueError):
+                raise MessageTooLong("Message trop long")
+            # Fin de flux : un message sans "\n" final est ignoré, comme dans TCPServer
+            return line[:-1] if line.endswith(b"\n") else None
+        try:
+            length = int.from_bytes(await reader.readexactly(4), "big")
+            client.partial_since = time.monotonic()
+            if length > self.max_line:
+                raise MessageTooLong("Message trop long")
+            if not length:
+                raise ValueError("Trame vide")
+            payload = await reader.readexactly(length)
+        except asyncio.IncompleteReadError:
+            return None
+        return payload[0], payload[1:]
+
+    async def _sweep_timeouts(self):
+        """
+        Ferme les connexions inactives depuis idle_timeout (sauf celles qui suivent des
+        parties), ou dont le message en cours n'est pas terminé après read_timeout. Un seul balayage périodique pour toutes
+        les connexions, plutôt qu'un minuteur par lecture.
+        """
+        limits = self.governor.limits
+        interval = min(t for t in (limits.idle_timeout, limits.read_timeout) if t is not None) / 4
+        while True:
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            for task, client in list(self._idle.items()):
+                if client.trusted:
+                    continue
+                if client.partial_since is not None:
+                    if limits.read_timeout is None or now - client.partial_since <= limits.read_timeout:
+                        continue
+                    counter = "read_timeouts"
+                elif (limits.idle_timeout is None or now - client.waiting_since <= limits.idle_timeout
+                      or client.watching()):
+                    continue
+                else:
+                    counter = "idle_timeouts"
+                self.governor.count(counter)
+                client.writer.write(encode_message(client.codec, {"status": "KO",
+                                                                  "response": "Délai dépassé, connexion fermée"}))
+                task.cancel()
+
+    async def send_response(self, writer, response, codec=None):
+        """
+        Écrit la réponse puis attend que le tampon d'émission redescende sous la limite
+        (drain) : un client qui ne lit pas ses réponses ralentit sa propre connexion
+        au lieu de faire grossir la mémoire du serveur.
+        """
+        writer.write(encode_message(codec, response))
+        await writer.drain()
+
+    async def shutdown(self, timeout=5.0):
+        """
+        Arrêt propre : on cesse d'accepter des connexions, les requêtes en cours
+        se terminent et leurs réponses sont envoyées, puis les connexions restantes
+        sont fermées au bout de timeout secondes.
+        """
+        self._closing = True
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+        if self.server is not None:
+            self.server.close()
+        connections = list(self._connections)
+        if connections:
+            # Les connexions en attente d'une requête sont fermées immédiatement ;
+            # les autres terminent d'envoyer leur réponse avant de s'arrêter
+            for task in list(self._idle):
+                task.cancel()
+            _, pending = await asyncio.wait(connections, timeout=timeout)
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.wait(pending)
+        if self.server is not None:
+            await self.server.wait_closed()
+        logger.info("Arrêt du serveur.")
+
+    async def serve_forever(self):
+        """Démarre le serveur et le fait tourner jusqu'à SIGINT / SIGTERM."""
+        await self.start()
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop.set)
+            except (NotImplementedError, RuntimeError):
+                pass  # Boucle hors du thread principal, ou Windows
+        await stop.wait()
+        await self.shutdown()
+
+    def run(self):
+        asyncio.run(self.serve_forever())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serveur TCP d'administration (asyncio)")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=5001)
+    parser.add_argument("--backlog", type=int, default=1024)
+    parser.add_argument("--log-level", help="DEBUG pour journaliser chaque requête (défaut : WOLF_LOG_LEVEL ou INFO)")
+    args = parser.parse_args()
+    setup_logging(args.log_level)
+    AsyncTCPServer(args.host, args.port, backlog=args.backlog).run()
@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+Serveur TCP d'administration multi-processus : N workers (AsyncTCPServer) écoutent le
+même port grâce à SO_REUSEPORT (ou, à défaut, une socket ouverte avant le fork), le
+noyau répartissant les connexions entre eux.
+
+Chaque partie appartient à un seul worker, celui qui l'a créée : les identifiants sont
+répartis par GameManager(id_offset=index, id_stride=N), le propriétaire de id_party est
+donc (id_party - 1) % N. Une requête reçue par un autre worker lui est relayée par une
+connexion locale (127.0.0.1) ; l'état d'une partie ne vit ainsi que dans un processus
+et reste cohérent sans verrou partagé. "list" et "stats" agrègent tous les workers.
+
+Usage : python server_tcp_multi.py [--host 0.0.0.0] [--port 5001] [--workers N]
+"""
+import argparse
+import asyncio
+import functools
+import itertools
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+
+import json_codec
+from game_manager import GameManager
+from governance import Limits
+from logging_setup import setup_logging
+from party_events import EVENT_OVERFLOW, encode_event
+from server_tcp import MAX_BATCH
+from server_tcp_async import AsyncTCPServer, AsyncClientConnection
+
+logger = logging.getLogger(__name__)
+
+# Actions portant un id_party : traitées par le worker propriétaire de la partie
+PARTY_ACTIONS = frozenset(("subscribe", "party_status", "gameboard_status", "move", "watch", "unwatch"))
+# Actions dont la réponse rassemble celles de tous les workers
+GATHER_ACTIONS = frozenset(("list", "stats"))
+
+
+class PeerLink:
+    """
+    Connexion persistante d'un worker vers un autre : les requêtes relayées portent un
+    id interne, les réponses sont rendues aux appelants qui les attendent. Les lignes
+    "event" (notifications d'un watch relayé) sont passées à on_event, telles quelles.
+    """
+    def __init__(self, host, port, on_event=None):
+        self.host = host
+        self.port = port
+        self.on_event = on_event
+        self.watching = set()  # Parties suivies par ce lien (watch relayé)
+        self._reader = None
+        self._writer = None
+        self._pending = {}  # id interne -> Future de la réponse
+        self._ids = itertools.count(1)
+        self._connect_lock = asyncio.Lock()
+        self._task = None
+
+    async def _connect(self):
+        async with self._connect_lock:
+            if self._writer is None:
+                self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+                self._task = asyncio.get_running_loop().create_task(self._read_responses())
+
+    async def request(self, request):
+        """
+        Relaie une requête et retourne la réponse du worker distant, l'"id" du client
+        éventuel restauré.
+
+        :raises ConnectionError: si le worker distant est injoignable.
+        """
+        await self._connect()
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        self._writer.write(json_codec.dumps_line(dict(request, id=request_id)))
+        await self._writer.drain()
+        response = await future
+        if "id" in request:
+            response["id"] = request["id"]
+        else:
+            response.pop("id", None)
+        return response
+
+    async def _read_responses(self):
+        try:
+            while True:
+                line = await self._reader.readline()
+                if not line.endswith(b"\n"):
+                    break
+                message = json_codec.loads(line)
+                if "event" in message:
+                    if self.on_event is not None:
+                        self.on_event(line)
+                    continue
+                future = self._pending.pop(message.get("id"), None)
+                if future is not None and not future.done():
+                    future.set_result(message)
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            self._writer = None
+            pending, self._pending = self._pending, {}
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Worker injoignable"))
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        if self._task is not None:
+            self._task.cancel()
+
+
+class WorkerClientConnection(AsyncClientConnection):
+    def __init__(self, writer, bucket=None, trusted=False):
+        super().__init__(writer, bucket, trusted)
+        self.relays = {}  # index du worker -> PeerLink dédié aux notifications relayées
+
+    def watching(self):
+        return super().watching() or any(relay.watching for relay in self.relays.values())
+
+
+class WorkerTCPServer(AsyncTCPServer):
+    """Un worker : AsyncTCPServer propriétaire d'une partie des parties, relais vers les autres."""
+    client_class = WorkerClientConnection
+
+    def __init__(self, index, nb_workers, host="0.0.0.0", port=5001, limits=None, **options):
+        manager = GameManager(id_offset=index, id_stride=nb_workers)
+        super().__init__(host, port, manager=manager, limits=limits, **options)
+        self.index = index
+        self.nb_workers = nb_workers
+        self.peers = {}   # index -> (hôte, port) de l'écoute interne des autres workers
+        self._links = {}  # index -> PeerLink partagé par toutes les connexions du worker
+        self.internal = None
+
+    def owner(self, id_party):
+        return (id_party - 1) % self.nb_workers
+
+    async def start_internal(self):
+        """Écoute interne (127.0.0.1) des requêtes relayées par les autres workers ; retourne son port."""
+        self.internal = await asyncio.start_server(functools.partial(self.handle_client, trusted=True),
+                                                   "127.0.0.1", 0, limit=self.max_line)
+        return self.internal.sockets[0].getsockname()[1]
+
+    def _link(self, index):
+        link = self._links.get(index)
+        if link is None:
+            link = self._links[index] = PeerLink(*self.peers[index])
+        return link
+
+    async def dispatch_async(self, request, client):
+        if client.trusted or not isinstance(request, dict) or not isinstance(request.get("action"), str):
+            return self.dispatch(request, client)  # Requête invalide : réponse KO locale
+        action_name = request.get("action")
+        if action_name == "batch":
+            return await self._dispatch_batch(request, client)
+        if action_name in GATHER_ACTIONS:
+            return await self._gather(request, client)
+        if action_name in PARTY_ACTIONS:
+            try:
+                owner = self.owner(int(self.merge_parameters(request.get("parameters", []))["id_party"]))
+            except (KeyError, ValueError, TypeError):
+                owner = self.index  # Requête invalide : la réponse KO est produite localement
+            if owner != self.index:
+                return await self._forward(owner, action_name, request, client)
+        return self.dispatch(request, client)
+
+    async def _forward(self, owner, action_name, request, client):
+        # La limite de la connexion s'applique ici ; celle du joueur chez le propriétaire
+        refusal = self.governor.allow_request(None, {}, client.bucket)
+        if refusal is None:
+            try:
+                if action_name in ("watch", "unwatch"):
+                    return await self._forward_watch(owner, request, client)
+                return await self._link(owner).request(request)
+            except ConnectionError as e:
+                refusal = str(e)
+        response = {"status": "KO", "response": refusal}
+        if "id" in request:
+            response["id"] = request["id"]
+        return response
+
+    async def _forward_watch(self, owner, request, client):
+        """
+        watch / unwatch d'une partie distante : une connexion dédiée au client vers le
+        propriétaire, dont les notifications sont déposées dans la file du client.
+        """
+        relays = client.relays
+        relay = relays.get(owner)
+        if relay is None:
+            watcher = client.watcher()
+
+            def on_event(line):
+                if not watcher.push(line):
+                    # Client trop lent : décroché partout, comme pour une partie locale
+                    self.manager.events.unwatch_all(watcher)
+                    watcher._overflow(encode_event({"event": EVENT_OVERFLOW}))
+                    for other in relays.values():
+                        other.close()
+                    relays.clear()
+
+            relay = relays[owner] = PeerLink(*self.peers[owner], on_event=on_event)
+        response = await relay.request(request)
+        if response.get("status") == "OK":
+            relay.watching = set(response["response"]["watching"])
+            watching = set(client.watcher().parties)
+            for other in relays.values():
+                watching |= other.watching
+            response["response"]["watching"] = sorted(watching)
+        return response
+
+    async def _gather(self, request, client):
+        """list / stats : réponse locale complétée par celles des autres workers."""
+        response = self.dispatch(request, client)  # Valide aussi les paramètres
+        if response["status"] != "OK":
+            return response
+        listing = request["action"] == "list"
+        if listing:
+            # Chaque worker renvoie toutes ses parties retenues ; la page est découpée ici
+            # Copie : merge_parameters rend le dict de la requête du client tel quel
+            params = dict(self.merge_parameters(request.get("parameters", [])))
+            page = {name: params.pop(name) for name in ("offset", "limit") if name in params}
+            request = {"action": "list", "parameters": params}
+            response = self.dispatch(request, client)
+        others = [index for index in self.peers if index != self.index]
+        replies = await asyncio.gather(*(self._link(index).request(request) for index in others),
+                                       return_exceptions=True)
+        replies = [reply["response"] for reply in replies
+                   if not isinstance(reply, Exception) and reply.get("status") == "OK"]
+        if listing:
+            return {"status": "OK", "response": self._merge_listings([response["response"]] + replies, **page)}
+        result = response["response"]
+        for reply in replies:
+            for key, value in reply["counters"].items():
+                result["counters"][key] += value
+            for key, value in reply["parties"].items():
+                result["parties"][key] += value
+        result["workers"] = self.nb_workers
+        return response
+
+    @staticmethod
+    def _merge_listings(listings, offset=0, limit=None):
+        """Réponse "list" rassemblant celles des workers (qui sont en cache : elles ne sont pas modifiées)."""
+        entries = sorted((entry for listing in listings for entry in listing["parties"]),
+                         key=lambda entry: entry["id_party"])
+        offset = int(offset)
+        end = len(entries) if limit is None else offset + int(limit)
+        page = entries[offset:end]
+        return {"id_parties": [entry["id_party"] for entry in page], "parties": page,
+                "total": len(entries), "next_offset": end if end < len(entries) else None}
+
+    async def _dispatch_batch(self, request, client):
+        """Action batch dont les sous-requêtes peuvent viser des parties d'autres workers."""
+        requests = request.get("requests")
+        if not isinstance(requests, list) or len(requests) > MAX_BATCH:
+            return self.dispatch(request, client)  # Réponse KO produite localement
+        responses = []
+        for sub_request in requests:
+            if isinstance(sub_request, dict) and sub_request.get("action") == "batch":
+                response = {"status": "KO", "response": "Lots imbriqués interdits"}
+                if "id" in sub_request:
+                    response["id"] = sub_request["id"]
+            else:
+                response = await self.dispatch_async(sub_request, client)
+            responses.append(response)
+        response = {"status": "OK", "response": responses}
+        if "id" in request:
+            response["id"] = request["id"]
+        return response
+
+    def close_client(self, client):
+        super().close_client(client)
+        for relay in client.relays.values():
+            relay.close()
+
+    async def shutdown(self, timeout=5.0):
+        for link in self._links.values():
+            link.close()
+        if self.internal is not None:
+            self.internal.close()
+        await super().shutdown(timeout)
+
+    async def serve(self, pipe, sock=None):
+        """
+        Vie du worker, pilotée par le processus maître via pipe : écoute interne,
+        réception de la table des workers, écoute publique, puis arrêt sur demande.
+        """
+        loop = asyncio.get_running_loop()
+        pipe.send(await self.start_internal())
+        self.peers = await loop.run_in_executor(None, pipe.recv)
+        await self.start(sock=sock, reuse_port=sock is None)
+        pipe.send("ready")
+        await loop.run_in_executor(None, pipe.recv)
+        await self.shutdown()
+
+
+def _worker_main(index, nb_workers, host, port, limits, pipe, sock, log_level):
+    setup_logging(log_level)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Arrêt décidé par le maître
+    server = WorkerTCPServer(index, nb_workers, host, port, limits=limits)
+    asyncio.run(server.serve(pipe, sock))
+
+
+class MultiProcessTCPServer:
+    def __init__(self, host="0.0.0.0", port=5001, workers=None, limits=None, log_level=None):
+        """
+        :param workers: nombre de processus (par défaut, nombre de cœurs).
+        :param limits: governance.Limits appliquées par chaque worker.
+        """
+        self.host = host
+        self.port = port
+        self.nb_workers = workers or os.cpu_count() or 1
+        self.limits = limits if limits is not None else Limits()
+        self.log_level = log_level
+        self.processes = []
+        self._pipes = []
+
+    def start(self):
+        """Lance les workers et attend qu'ils écoutent ; retourne le port effectif."""
+        reuse_port = hasattr(socket, "SO_REUSEPORT")
+        # IPPROTO_TCP explicite : asyncio n'active TCP_NODELAY que sur les sockets qui l'indiquent
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if reuse_port:
+            # Socket réservant le port (utile avec port=0) ; les workers ouvrent les leurs
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        sock.bind((self.host, self.port))
+        self.port = sock.getsockname()[1]
+        if not reuse_port:
+            # Pré-fork : une seule socket d'écoute, héritée par les workers
+            sock.listen(1024)
+        context = multiprocessing.get_context("fork" if not reuse_port else None)
+        for index in range(self.nb_workers):
+            parent_pipe, child_pipe = context.Pipe()
+            process = context.Process(target=_worker_main, daemon=True,
+                                      args=(index, self.nb_workers, self.host, self.port, self.limits,
+                                            child_pipe, None if reuse_port else sock, self.log_level))
+            process.start()
+            self.processes.append(process)
+            self._pipes.append(parent_pipe)
+        peers = {index: ("127.0.0.1", pipe.recv()) for index, pipe in enumerate(self._pipes)}
+        for pipe in self._pipes:
+            pipe.send(peers)
+        for pipe in self._pipes:
+            pipe.recv()
+        sock.close()
+        logger.info("Serveur TCP d'administration démarré sur %s:%s (%d workers)",
+                    self.host, self.port, self.nb_workers)
+        return self.port
+
+    def stop(self, timeout=5.0):
+        """Arrêt propre de tous les workers (les plus lents sont tués après timeout)."""
+        for pipe in self._pipes:
+            try:
+                pipe.send("stop")
+            except OSError:
+                pass
+        for process in self.processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self.processes, self._pipes = [], []
+        logger.info("Arrêt du serveur.")
+
+    def run(self):
+        """Démarre les workers et les fait tourner jusqu'à SIGINT / SIGTERM."""
+        self.start()
+        stop = []
+        signal.signal(signal.SIGTERM, lambda *_: stop.append(True))
+        try:
+            while not stop:
+                signal.pause()
+        except KeyboardInterrupt:
+            pass
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serveur TCP d'administration multi-processus")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=5001)
+    parser.add_argument("--workers", type=int, help="nombre de processus (défaut : nombre de cœurs)")
+    parser.add_argument("--log-level", help="DEBUG pour journaliser chaque requête (défaut : WOLF_LOG_LEVEL ou INFO)")
+    args = parser.parse_args()
+    setup_logging(args.log_level)
+    MultiProcessTCPServer(args.host, args.port, args.workers, log_level=args.log_level).run()
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Simulation Monte-Carlo de parties en auto-jeu, pour régler max_turns, le nombre
+d'obstacles et les quotas de rôles (roles_quotas).
+
+Chaque configuration est jouée sur un pool de processus ; chaque processus joue ses
+parties une par une et ne renvoie que des agrégats, sa mémoire reste donc constante.
+Les résultats agrégés (taux de victoire, histogramme des durées) sont écrits au fil
+de l'eau sur la sortie standard, une ligne JSON par configuration et par rapport.
+
+Exemple :
+    python simulate.py --rows 10 --cols 10 --obstacles 0 10 20 --max-turns 30 \\
+        --wolves 1 2 --villagers 3 --games 100000 --workers 8
+"""
+import argparse
+import importlib
+import itertools
+import json
+import multiprocessing
+import sys
+import time
+
+from game_engine import Game, DIRECTIONS, MOVE_COLLISION
+from npc import NPCPolicy, DistanceFieldCache
+
+# Registre des politiques : nom -> fonction(game, player_id, player_role, opponents, rng) -> vecteur
+POLICIES = {}
+
+
+def register_policy(name):
+    """Décorateur enregistrant une politique de joueur sous un nom utilisable en ligne de commande."""
+    def decorator(func):
+        POLICIES[name] = func
+        return func
+    return decorator
+
+
+@register_policy("stay")
+def stay_policy(game, player_id, player_role, opponents, rng):
+    """Le joueur ne bouge jamais."""
+    return (0, 0)
+
+
+@register_policy("random")
+def random_policy(game, player_id, player_role, opponents, rng):
+    """Déplacement unitaire légal tiré au hasard (ou sur place s'il n'y en a aucun)."""
+    moves = game.neighbours(game.positions[player_id])
+    if not moves:
+        return (0, 0)
+    return DIRECTIONS[rng.choice(moves)[0]]
+
+
+# Un cache de champs de distances par processus, borné par l'éviction LRU
+_distance_cache = DistanceFieldCache(max_layouts=64)
+_npc_policies = {}
+
+
+def _npc_policy(player_role, mode):
+    key = (player_role, mode)
+    policy = _npc_policies.get(key)
+    if policy is None:
+        policy = _npc_policies[key] = NPCPolicy(player_role, mode, cache=_distance_cache)
+    return policy
+
+
+@register_policy("pursue")
+def pursue_policy(game, player_id, player_role, opponents, rng):
+    """Plus court chemin vers l'adversaire le plus proche."""
+    return _npc_policy(player_role, "pursue").choose_move(game, game.find_player(player_id), opponents)
+
+
+@register_policy("evade")
+def evade_policy(game, player_id, player_role, opponents, rng):
+    """Case voisine la plus éloignée de l'adversaire le plus proche."""
+    return _npc_policy(player_role, "evade").choose_move(game, game.find_player(player_id), opponents)
+
+
+def load_policy(name):
+    """
+    Retourne la politique enregistrée sous ce nom, ou importe "module:fonction".
+
+    :raises ValueError: si la politique est introuvable.
+    """
+    if name in POLICIES:
+        return POLICIES[name]
+    if ":" in name:
+        module_name, _, attr = name.partition(":")
+        return getattr(importlib.import_module(module_name), attr)
+    raise ValueError(f"Politique inconnue : {name} (disponibles : {', '.join(sorted(POLICIES))})")
+
+
+def play_game(config, seed, wolf_policy, villager_policy):
+    """
+    Joue une partie complète et retourne (issue, nombre de tours), l'issue valant
+    "wolf", "villager" (collision gagnante), "draw" (collisions des deux camps
+    dans le même tour), "timeout" (max_turns atteint) ou "invalid" (plateau impossible).
+    """
+    game = Game(config["rows"], config["cols"], 0, config["max_turns"], seed=seed)
+    rng = game.rng
+    roles = {}
+    nb_players = config["wolves"] + config["villagers"]
+    if nb_players > config["rows"] * config["cols"]:
+        return "invalid", 0
+    cells = rng.sample(range(config["rows"] * config["cols"]), nb_players)
+    for player_id, cell in enumerate(cells):
+        roles[player_id] = "wolf" if player_id < config["wolves"] else "villager"
+        game.place_player(player_id, divmod(cell, config["cols"]), roles[player_id])
+    try:
+        game.place_obstacles(config["obstacles"], connected=True)
+    except ValueError:
+        return "invalid", 0
+
+    policies = {"wolf": wolf_policy, "villager": villager_policy}
+    while not game.game_over:
+        wolves = game.pieces("wolf")
+        villagers = game.pieces("villager")
+        moves = {}
+        for player_id in game.positions:
+            role = roles[player_id]
+            opponents = villagers if role == "wolf" else wolves
+            moves[player_id] = policies[role](game, player_id, role, opponents, rng)
+        results = game.resolve_round(moves)
+        winners = {roles[player_id] for player_id, (code, position) in results.items()
+                   if code == MOVE_COLLISION and position is not None}
+        if winners:
+            return (winners.pop() if len(winners) == 1 else "draw"), game.turn
+    return "timeout", game.turn
+
+
+def play_chunk(task):
+    """
+    Joue un lot de parties d'une configuration et retourne uniquement ses agrégats.
+
+    :param task: (indice de configuration, configuration, première graine, nombre de parties,
+                  politique des loups, politique des villageois).
+    """
+    index, config, first_seed, nb_games, wolf_name, villager_name = task
+    wolf_policy = load_policy(wolf_name)
+    villager_policy = load_policy(villager_name)
+    outcomes = {}
+    lengths = [0] * (config["max_turns"] + 1)
+    for seed in range(first_seed, first_seed + nb_games):
+        outcome, turns = play_game(config, seed, wolf_policy, villager_policy)
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+        lengths[turns] += 1
+    return index, nb_games, outcomes, lengths
+
+
+def iter_tasks(configs, games, chunk_size, seed, wolf_policy, villager_policy):
+    """Génère paresseusement les lots de parties de chaque configuration."""
+    for index, config in enumerate(configs):
+        base = seed + index * games
+        for start in range(0, games, chunk_size):
+            yield (index, config, base + start, min(chunk_size, games - start), wolf_policy, villager_policy)
+
+
+def format_report(config, aggregate, done):
+    played = aggregate["games"]
+    rates = {outcome: count / played for outcome, count in sorted(aggregate["outcomes"].items())}
+    return json.dumps({
+        "config": config,
+        "games": played,
+        "done": done,
+        "win_rates": rates,
+        "length_histogram": aggregate["lengths"],
+    })
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulation Monte-Carlo de parties en auto-jeu")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10])
+    parser.add_argument("--cols", type=int, nargs="+", default=[10])
+    parser.add_argument("--obstacles", type=int, nargs="+", default=[10])
+    parser.add_argument("--max-turns", type=int, nargs="+", default=[30])
+    parser.add_argument("--wolves", type=int, nargs="+", default=[1], help="quota maximum de loups")
+    parser.add_argument("--villagers", type=int, nargs="+", default=[3], help="quota maximum de villageois")
+    parser.add_argument("--games", type=int, default=10000, help="parties par configuration")
+    parser.add_argument("--chunk", type=int, default=500, help="parties par lot envoyé à un processus")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--wolf-policy", default="pursue")
+    parser.add_argument("--villager-policy", default="evade")
+    parser.add_argument("--report-every", type=float, default=2.0, help="secondes entre deux rapports")
+    args = parser.parse_args(argv)
+
+    # Vérifie les politiques avant de lancer les processus
+    load_policy(args.wolf_policy)
+    load_policy(args.villager_policy)
+
+    keys = ("rows", "cols", "obstacles", "max_turns", "wolves", "villagers")
+    configs = [dict(zip(keys, values)) for values in itertools.product(
+        args.rows, args.cols, args.obstacles, args.max_turns, args.wolves, args.villagers)]
+    aggregates = [{"games": 0, "outcomes": {}, "lengths": [0] * (config["max_turns"] + 1)}
+                  for config in configs]
+    tasks = iter_tasks(configs, args.games, args.chunk, args.seed, args.wolf_policy, args.villager_policy)
+
+    last_report = time.monotonic()
+    dirty = set()
+    with multiprocessing.Pool(args.workers) as pool:
+        for index, nb_games, outcomes, lengths in pool.imap_unordered(play_chunk, tasks):
+            aggregate = aggregates[index]
+            aggregate["games"] += nb_games
+            for outcome, count in outcomes.items():
+                aggregate["outcomes"][outcome] = aggregate["outcomes"].get(outcome, 0) + count
+            for turns, count in enumerate(lengths):
+                aggregate["lengths"][turns] += count
+            if aggregate["games"] == args.games:
+                dirty.discard(index)
+                print(format_report(configs[index], aggregate, True), flush=True)
+            else:
+                dirty.add(index)
+            if dirty and time.monotonic() - last_report >= args.report_every:
+                for pending in sorted(dirty):
+                    print(format_report(configs[pending], aggregates[pending], False), flush=True)
+                dirty.clear()
+                last_report = time.monotonic()
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except ValueError as e:
+        print(f"Erreur : {e}", file=sys.stderr)
+        sys.exit(1)
+    except KeyboardInterrupt:
+        print("\nArrêt de la simulation.", file=sys.stderr)
+        sys.exit(0)
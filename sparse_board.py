@@ -0,0 +1,82 @@
+"""
+Stockage creux du plateau, pour les grandes arènes presque vides.
+
+Les cases sont regroupées par blocs de CHUNK_SIZE cases consécutives (index r * cols + c) ;
+seuls les blocs contenant au moins une case non vide sont alloués, la mémoire
+est donc proportionnelle au nombre de cases occupées et non à la surface du plateau.
+"""
+
+CHUNK_BITS = 6
+CHUNK_SIZE = 1 << CHUNK_BITS  # Cases par bloc
+_CHUNK_MASK = CHUNK_SIZE - 1
+
+
+class SparseCells:
+    """
+    Remplaçant creux du bytearray Game.cells : mêmes accès cells[i] en lecture et
+    en écriture, une case absente valant 0 (EMPTY).
+    """
+    __slots__ = ("size", "filled", "_chunks", "_counts")
+
+    def __init__(self, size):
+        """
+        :param size: nombre total de cases (rows * cols).
+        """
+        self.size = size
+        self.filled = 0     # Nombre de cases non vides
+        self._chunks = {}   # indice de bloc -> bytearray(CHUNK_SIZE)
+        self._counts = {}   # indice de bloc -> nombre de cases non vides du bloc
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, cell):
+        if cell.__class__ is slice:
+            return bytes(self[i] for i in range(*cell.indices(self.size)))
+        chunk = self._chunks.get(cell >> CHUNK_BITS)
+        if chunk is None:
+            if not 0 <= cell < self.size:
+                raise IndexError("Indice de case hors du plateau")
+            return 0
+        return chunk[cell & _CHUNK_MASK]
+
+    def __setitem__(self, cell, value):
+        if not 0 <= cell < self.size:
+            raise IndexError("Indice de case hors du plateau")
+        key = cell >> CHUNK_BITS
+        chunk = self._chunks.get(key)
+        if chunk is None:
+            if not value:
+                return
+            chunk = self._chunks[key] = bytearray(CHUNK_SIZE)
+            self._counts[key] = 0
+        i = cell & _CHUNK_MASK
+        old_value = chunk[i]
+        chunk[i] = value
+        if not old_value and value:
+            self._counts[key] += 1
+            self.filled += 1
+        elif old_value and not value:
+            self.filled -= 1
+            self._counts[key] -= 1
+            # Bloc redevenu entièrement vide : libéré
+            if not self._counts[key]:
+                del self._chunks[key]
+                del self._counts[key]
+
+    def __iter__(self):
+        """Parcourt toutes les cases, vides comprises (coût proportionnel à la surface)."""
+        for cell in range(self.size):
+            yield self[cell]
+
+    def items(self):
+        """Retourne les couples (case, valeur) des cases non vides, par ordre de case."""
+        result = []
+        for key in sorted(self._chunks):
+            base = key << CHUNK_BITS
+            result.extend((base + i, value) for i, value in enumerate(self._chunks[key]) if value)
+        return result
+
+    def chunk_count(self):
+        """Nombre de blocs alloués."""
+        return len(self._chunks)